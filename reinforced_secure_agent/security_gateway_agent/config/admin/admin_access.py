@@ -0,0 +1,25 @@
+import os
+from typing import List
+
+from fastapi import HTTPException, Request
+
+from config.memory.ip_trie import IpTrie, apply_ip_list
+
+# Gateway 관리 API 중 상태를 바꾸는 요청(ACL 추가 / 삭제, 시그니처 reload)을 허용할 client (.env 또는 환경변수로 조정 가능)
+# IP 또는 CIDR, 쉼표로 구분 (기본값: 같은 host의 Monitoring Agent만 허용)
+GATEWAY_ADMIN_NETWORKS: List[str] = [n.strip() for n in os.getenv(
+    "GATEWAY_ADMIN_NETWORKS", "127.0.0.1/32,::1/128").split(",") if n.strip()]
+
+admin_networks = apply_ip_list(IpTrie(), GATEWAY_ADMIN_NETWORKS)
+
+
+def is_admin_client(client_ip: str) -> bool:
+    return client_ip in admin_networks
+
+
+async def require_admin_client(request: Request) -> None:
+    # router dependency: GATEWAY_ADMIN_NETWORKS 밖의 client는 403
+    client_ip = str(request.client.host) if request.client is not None else ""
+    if not is_admin_client(client_ip):
+        print(f"관리 API 거부: {client_ip} {request.method} {request.url.path}")
+        raise HTTPException(status_code=403, detail="관리 API 접근 권한이 없습니다")
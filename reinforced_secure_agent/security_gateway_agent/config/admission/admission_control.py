@@ -0,0 +1,216 @@
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config.metrics.metrics import get_metrics_registry
+from config.memory.ip_trie import IpTrie, apply_ip_list
+
+# admission control 설정 (.env 또는 환경변수로 조정 가능)
+ADMISSION_CLASSIFY_CONCURRENCY = int(os.getenv("ADMISSION_CLASSIFY_CONCURRENCY", "32"))
+ADMISSION_REVIEW_CONCURRENCY = int(os.getenv("ADMISSION_REVIEW_CONCURRENCY", "8"))
+ADMISSION_QUEUE_MAX = int(os.getenv("ADMISSION_QUEUE_MAX", "256"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2"))      # slot을 기다리는 최대 시간 (초)
+ADMISSION_CLASSIFY_TIMEOUT = float(os.getenv("ADMISSION_CLASSIFY_TIMEOUT", "10"))  # 1차 LLM 호출 최대 시간 (초)
+ADMISSION_REVIEW_TIMEOUT = float(os.getenv("ADMISSION_REVIEW_TIMEOUT", "30"))      # review agent 최대 시간 (초)
+ADMISSION_CLIENT_RATE = float(os.getenv("ADMISSION_CLIENT_RATE", "5"))    # client별 초당 LLM 판단 수
+ADMISSION_CLIENT_BURST = float(os.getenv("ADMISSION_CLIENT_BURST", "20"))
+ADMISSION_MAX_CLIENTS = int(os.getenv("ADMISSION_MAX_CLIENTS", "100000"))
+# 과부하로 판단하지 못한 요청 처리 방식: fail_closed(503) / fail_open(허용) / signature_only(시그니처 결과로만 판단)
+ADMISSION_SHED_POLICY = os.getenv("ADMISSION_SHED_POLICY", "fail_closed").lower()
+
+# 먼저 처리할 client 네트워크 (예: 사내망 / 협력사 CIDR, 비어 있으면 모든 요청이 같은 우선순위)
+# client가 마음대로 붙일 수 있는 header가 아니라 연결의 client IP로 판단
+ADMISSION_PRIORITY_NETWORKS = [n.strip() for n in os.getenv("ADMISSION_PRIORITY_NETWORKS", "").split(",")
+                               if n.strip()]
+
+SHED_POLICIES = ("fail_closed", "fail_open", "signature_only")
+
+# 숫자가 작을수록 먼저 처리
+PRIORITY_KNOWN = 0
+PRIORITY_ANONYMOUS = 1
+PRIORITY_AUDIT = 2  # 이미 전달된 요청의 사후 검사
+
+metrics = get_metrics_registry()
+admission_results = metrics.counter("gateway_admission_total", "tier별 admission 결과", ["tier", "result"])
+queue_wait_seconds = metrics.histogram("gateway_admission_queue_wait_seconds", "LLM slot을 기다린 시간", ["tier"])
+client_throttled = metrics.counter("gateway_admission_client_throttled_total", "client token bucket 초과로 거절된 요청 수")
+shed_results = metrics.counter("gateway_admission_shed_total", "과부하로 shed된 요청 처리 결과", ["policy", "action"])
+
+
+class AdmissionRejected(Exception):
+    # 과부하로 LLM 판단을 받지 못한 경우 (reason: queue_full / queue_timeout / call_timeout)
+    def __init__(self, tier: str, reason: str):
+        super().__init__(f"{tier} tier admission 거절: {reason}")
+        self.tier = tier
+        self.reason = reason
+
+
+priority_networks = apply_ip_list(IpTrie(), ADMISSION_PRIORITY_NETWORKS)
+
+
+def request_priority(client_ip: str) -> int:
+    # ADMISSION_PRIORITY_NETWORKS에 속한 client의 요청을 다른 요청보다 먼저 처리
+    if client_ip in priority_networks:
+        return PRIORITY_KNOWN
+    return PRIORITY_ANONYMOUS
+
+
+# client별 token bucket (오래 안 보인 client부터 정리되는 LRU)
+class ClientRateLimiter:
+
+    def __init__(self, rate: float = ADMISSION_CLIENT_RATE, burst: float = ADMISSION_CLIENT_BURST,
+                 max_clients: int = ADMISSION_MAX_CLIENTS):
+        self._rate = rate
+        self._burst = burst
+        self._max_clients = max_clients
+        # client -> [남은 token, 마지막 갱신 시각]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, client: str, cost: float = 1.0) -> bool:
+        if self._rate <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = [self._burst, now]
+                self._buckets[client] = bucket
+                if len(self._buckets) > self._max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+                bucket[0] = min(self._burst, bucket[0] + (now - bucket[1]) * self._rate)
+                bucket[1] = now
+            if bucket[0] < cost:
+                return False
+            bucket[0] -= cost
+            return True
+
+
+class TierLimiter:
+    """
+    LLM tier 하나의 동시 실행 수 제한.
+
+    - 동시에 concurrency개까지만 실행하고, 나머지는 priority queue에서 기다린다 (같은 priority는 도착 순)
+    - queue_max를 넘거나 queue_timeout 안에 slot을 받지 못하면 AdmissionRejected
+    - 실행 자체도 call_timeout을 넘으면 AdmissionRejected (느린 LLM 응답이 slot을 계속 잡고 있지 않도록)
+    """
+
+    def __init__(self, name: str, concurrency: int, call_timeout: Optional[float],
+                 queue_max: int = ADMISSION_QUEUE_MAX, queue_timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        self.name = name
+        self._concurrency = max(1, concurrency)
+        self._call_timeout = call_timeout
+        self._queue_max = queue_max
+        self._queue_timeout = queue_timeout
+        self._active = 0
+        self._waiting = 0
+        self._queue: list = []  # heap: (priority, 도착 순서, future)
+        self._sequence = itertools.count()
+
+    def stats(self) -> Dict[str, int]:
+        return {"active": self._active, "waiting": self._waiting, "concurrency": self._concurrency}
+
+    async def acquire(self, priority: int = PRIORITY_ANONYMOUS) -> None:
+        if self._active < self._concurrency and not self._waiting:
+            self._active += 1
+            admission_results.inc(tier=self.name, result="admitted")
+            return
+        if self._waiting >= self._queue_max:
+            admission_results.inc(tier=self.name, result="queue_full")
+            raise AdmissionRejected(self.name, "queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), future))
+        self._waiting += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(future, timeout=self._queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            # 취소되는 순간 이미 slot을 넘겨받았다면 돌려준다
+            if future.done() and not future.cancelled():
+                self.release()
+            if isinstance(e, asyncio.TimeoutError):
+                admission_results.inc(tier=self.name, result="queue_timeout")
+                raise AdmissionRejected(self.name, "queue_timeout") from None
+            raise
+        finally:
+            self._waiting -= 1
+            queue_wait_seconds.observe(time.perf_counter() - start, tier=self.name)
+        admission_results.inc(tier=self.name, result="queued")
+
+    def release(self) -> None:
+        # 기다리는 요청이 있으면 slot을 그대로 넘겨주고 (active 유지), 없으면 반납
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    async def run(self, func: Callable[[], Awaitable[Any]], priority: int = PRIORITY_ANONYMOUS) -> Any:
+        await self.acquire(priority)
+        try:
+            return await asyncio.wait_for(func(), timeout=self._call_timeout)
+        except asyncio.TimeoutError:
+            admission_results.inc(tier=self.name, result="call_timeout")
+            raise AdmissionRejected(self.name, "call_timeout") from None
+        finally:
+            self.release()
+
+
+class AdmissionController:
+
+    def __init__(self, shed_policy: str = ADMISSION_SHED_POLICY):
+        if shed_policy not in SHED_POLICIES:
+            print(f"알 수 없는 ADMISSION_SHED_POLICY({shed_policy}), fail_closed로 동작합니다")
+            shed_policy = "fail_closed"
+        self.shed_policy = shed_policy
+        self.client_limiter = ClientRateLimiter()
+        self.tiers: Dict[str, TierLimiter] = {
+            "classify": TierLimiter("classify", ADMISSION_CLASSIFY_CONCURRENCY, ADMISSION_CLASSIFY_TIMEOUT),
+            "review": TierLimiter("review", ADMISSION_REVIEW_CONCURRENCY, ADMISSION_REVIEW_TIMEOUT),
+        }
+
+    def allow_client(self, client: str) -> bool:
+        if self.client_limiter.allow(client):
+            return True
+        client_throttled.inc()
+        return False
+
+    async def run(self, tier: str, func: Callable[[], Awaitable[Any]], priority: int = PRIORITY_ANONYMOUS) -> Any:
+        return await self.tiers[tier].run(func, priority)
+
+    def shed_action(self, matched_signatures: List[str]) -> Optional[str]:
+        """
+        LLM 판단을 받지 못한 요청의 처리 결과. None이면 503으로 거절합니다.
+
+        - fail_closed: None (503)
+        - fail_open: "allow"
+        - signature_only: escalate 시그니처에 걸린 요청은 "block", 아무 시그니처에도 걸리지 않은 요청은 "allow"
+        """
+        if self.shed_policy == "fail_open":
+            action = "allow"
+        elif self.shed_policy == "signature_only":
+            action = "block" if matched_signatures else "allow"
+        else:
+            action = None
+        shed_results.inc(policy=self.shed_policy, action=action or "reject")
+        return action
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: tier.stats() for name, tier in self.tiers.items()}
+
+
+admission_controller = AdmissionController()
+
+
+def get_admission_controller() -> AdmissionController:
+    global admission_controller
+    return admission_controller
@@ -1,7 +1,7 @@
 import os
+import uuid
 
 from dotenv import load_dotenv
-from langchain_openai import AzureChatOpenAI
 from langgraph.prebuilt import create_react_agent
 
 from config.tools.tools import *
@@ -11,18 +11,17 @@ from config.tools.tools import *
 dotenv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env')
 load_dotenv(dotenv_path)
 
-# Azure OpenAI 설정
-env_api_key = os.getenv("AZURE_OPENAI_API_KEY")
-openai_api_base = os.getenv("AZURE_OPENAI_API_ENDPOINT")
-deployment_name = os.getenv("DEPLOYMENT_NAME")
+# LLM_DEPLOYMENTS 등 pool 설정은 import 시점에 읽으므로 .env를 불러온 뒤에 import
+from config.llm.llm_pool import build_llm_pool
 
 # Prompt & 모델 설정
-llm = AzureChatOpenAI(
-    openai_api_key=env_api_key,
-    azure_endpoint=openai_api_base,
-    deployment_name=deployment_name,
-    openai_api_version="2024-02-15-preview"
-)
+# 요청 처리 경로에서 호출되므로 client timeout / 재시도를 짧게 제한 (장애 판단은 circuit breaker가 담당)
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "10"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+
+# Azure OpenAI deployment pool (LLM_DEPLOYMENTS가 비어 있으면 DEPLOYMENT_NAME 하나)
+# client 재시도(LLM_MAX_RETRIES) 후에도 실패하면 pool이 다른 deployment로 failover
+llm = build_llm_pool(timeout=LLM_REQUEST_TIMEOUT, max_retries=LLM_MAX_RETRIES)
 
 # rate_limit_check_tool
 tools = [suspicious_pattern_detector, think_aloud, web_search_tool, base64_decode_tool, unicode_decode_tool,
@@ -35,4 +34,20 @@ config = {
     }
 }
 
+# review agent 실행 제한 (.env 또는 환경변수로 조정 가능)
+REVIEW_MAX_ITERATIONS = int(os.getenv("REVIEW_MAX_ITERATIONS", "4"))   # ReAct (LLM -> tool) 반복 최대 횟수
+REVIEW_TIMEOUT = float(os.getenv("REVIEW_TIMEOUT", "20"))              # review 한 건의 최대 시간 (초)
+REVIEW_FALLBACK_ACTION = os.getenv("REVIEW_FALLBACK_ACTION", "block")  # 제한에 걸렸을 때의 판정
+
+
+def build_review_config() -> dict:
+    # 요청마다 새 thread (다른 요청의 대화 기록이 섞이거나 쌓이지 않도록)
+    return {
+        'configurable': {
+            'thread_id': f'review-{uuid.uuid4().hex}'
+        },
+        # agent node + tool node가 한 번의 ReAct 반복이므로 2배 + 마지막 응답
+        'recursion_limit': REVIEW_MAX_ITERATIONS * 2 + 1
+    }
+
 agent_graph = create_react_agent(model=llm, tools=tools)
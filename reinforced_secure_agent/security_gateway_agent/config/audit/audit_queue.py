@@ -0,0 +1,163 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from config.metrics.metrics import get_metrics_registry
+
+# allow-then-audit 설정 (.env 또는 환경변수로 조정 가능)
+AUDIT_MODE = os.getenv("AUDIT_MODE", "false").lower() == "true"
+AUDIT_METHODS = tuple(m.strip().upper() for m in os.getenv("AUDIT_METHODS", "GET,HEAD").split(",") if m.strip())
+# 먼저 전달해도 되는 정적 / 조회 경로 (반드시 지정, 비어 있으면 AUDIT_MODE=true여도 사후 검사 대상 없음)
+AUDIT_PATH_PREFIXES = tuple(p.strip() for p in os.getenv("AUDIT_PATH_PREFIXES", "").split(",") if p.strip())
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "1000"))
+AUDIT_WORKERS = int(os.getenv("AUDIT_WORKERS", "4"))
+# 사후 block 이벤트를 기록하는 로그 파일 (Message Queue가 tail로 수집)
+GATEWAY_EVENT_LOG = os.getenv("GATEWAY_EVENT_LOG", os.path.join("logs", "gateway_events.log"))
+
+metrics = get_metrics_registry()
+audit_results = metrics.counter("gateway_audit_total", "사후 검사 queue 처리 결과", ["result"])
+audit_lag_seconds = metrics.histogram("gateway_audit_lag_seconds", "요청 전달부터 사후 판단 완료까지 걸린 시간")
+
+
+class AuditItem(NamedTuple):
+    fingerprint: str
+    str_full_context: str
+    # LLM을 쓸 수 없을 때 local fallback이 필드별로 다시 검사할 원본 context
+    full_context: Dict[str, Any]
+    client_ip: str
+    method: str
+    path: str
+    enqueued_at: float
+    # 같은 fingerprint로 queue에 있는 동안 들어온 다른 client (사후 block 시 모두 Black List에 추가)
+    client_ips: Tuple[str, ...] = ()
+
+
+if AUDIT_MODE and not AUDIT_PATH_PREFIXES:
+    print("AUDIT_MODE=true이지만 AUDIT_PATH_PREFIXES가 비어 있어 사후 검사 대상이 없습니다.")
+
+
+def is_audit_candidate(full_context: Dict[str, Any], matched_signatures: Sequence[str] = ()) -> bool:
+    # AUDIT_PATH_PREFIXES 경로의 body가 없는 조회성 요청만 먼저 전달하고 나중에 검사
+    # (escalate 시그니처에 걸린 요청은 전달 전에 판단)
+    if not AUDIT_MODE or not AUDIT_PATH_PREFIXES or matched_signatures:
+        return False
+    if full_context.get("method") not in AUDIT_METHODS or full_context.get("body"):
+        return False
+    return str(full_context.get("path", "")).startswith(AUDIT_PATH_PREFIXES)
+
+
+def record_gateway_event(event: Dict[str, Any]) -> None:
+    # JSON 한 줄 단위로 기록 (Message Queue의 .log tail 수집 대상)
+    event = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), **event}
+    print(f"gateway event: {event}")
+    try:
+        directory = os.path.dirname(GATEWAY_EVENT_LOG)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(GATEWAY_EVENT_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"gateway event 기록 실패: {e}")
+
+
+class AuditQueue:
+    """
+    먼저 upstream으로 전달한 요청을 background에서 LLM으로 다시 판단하는 queue.
+
+    - 크기가 제한되어 있고, 가득 차면 가장 오래된 항목을 버린다 (drop-oldest)
+    - 같은 fingerprint가 이미 queue에 있으면 다시 넣지 않고 client IP만 기록한다 (사후 block은 모든 client에 적용)
+    - AUDIT_WORKERS개의 worker task가 handler(item)를 호출
+    """
+
+    def __init__(self, max_size: int = AUDIT_QUEUE_SIZE, workers: int = AUDIT_WORKERS):
+        self._items: Deque[AuditItem] = deque()
+        # queue에 있는 fingerprint -> 그 요청을 보낸 client IP
+        self._queued: Dict[str, Set[str]] = {}
+        self._max_size = max_size
+        self._workers = workers
+        self._event: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.processed = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def submit(self, item: AuditItem) -> bool:
+        clients = self._queued.get(item.fingerprint)
+        if clients is not None:
+            clients.add(item.client_ip)
+            audit_results.inc(result="duplicate")
+            return False
+        if len(self._items) >= self._max_size:
+            oldest = self._items.popleft()
+            self._queued.pop(oldest.fingerprint, None)
+            self.dropped += 1
+            audit_results.inc(result="dropped")
+        self._items.append(item)
+        self._queued[item.fingerprint] = {item.client_ip}
+        self.enqueued += 1
+        audit_results.inc(result="enqueued")
+        if self._event is not None:
+            self._event.set()
+        return True
+
+    def start(self, handler: Callable[[AuditItem], Awaitable[None]]) -> None:
+        if self._tasks:
+            return
+        self._event = asyncio.Event()
+        if self._items:
+            self._event.set()
+        self._tasks = [asyncio.ensure_future(self._worker(handler)) for _ in range(self._workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, handler: Callable[[AuditItem], Awaitable[None]]) -> None:
+        while True:
+            if not self._items:
+                self._event.clear()
+                await self._event.wait()
+                continue
+            item = self._items.popleft()
+            clients = self._queued.pop(item.fingerprint, set())
+            item = item._replace(client_ips=tuple(sorted(clients | {item.client_ip})))
+            try:
+                await handler(item)
+                self.processed += 1
+                audit_results.inc(result="processed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                audit_results.inc(result="failed")
+                print(f"사후 검사 실패 ({item.method} {item.path}): {e}")
+            finally:
+                audit_lag_seconds.observe(time.time() - item.enqueued_at)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._items),
+            "max_size": self._max_size,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+
+audit_queue = AuditQueue()
+
+
+def get_audit_queue() -> AuditQueue:
+    global audit_queue
+    return audit_queue
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from http.cookies import SimpleCookie
+from typing import Optional, Dict, Any
+
+# 캐시 설정 (.env 또는 환경변수로 조정 가능)
+VERDICT_CACHE_TTL = float(os.getenv("VERDICT_CACHE_TTL", "300"))  # 초 단위
+VERDICT_CACHE_MAX_ENTRIES = int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "10000"))
+VERDICT_CACHE_MAX_BYTES = int(os.getenv("VERDICT_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# 캐시 가능한 판정 결과
+CACHEABLE_VERDICTS = ("allow", "block", "review")
+
+# 요청마다 값이 바뀌어서 fingerprint에 넣으면 안 되는 Header
+VOLATILE_HEADERS = {
+    "date", "content-length", "connection", "keep-alive", "host",
+    "x-request-id", "x-correlation-id", "traceparent", "tracestate",
+    "x-forwarded-for", "x-real-ip", "x-forwarded-port", "forwarded",
+    "if-none-match", "if-modified-since", "cache-control", "pragma",
+    "postman-token", "sec-fetch-site", "sec-fetch-mode", "sec-fetch-dest",
+}
+
+# 이름으로 봤을 때 세션/시간 값인 파라미터 (값이 토큰 형태일 때만 치환)
+# key를 _ - . / camelCase 경계로 나눈 조각 단위로 비교 (inside, tokenizer 같은 이름은 해당하지 않음)
+VOLATILE_KEY_SEGMENTS = {"session", "sessionid", "sess", "sessid", "sid", "token", "csrf", "xsrf", "nonce",
+                         "timestamp"}
+VOLATILE_KEYS = {"ts", "t", "_"}
+KEY_SEGMENT_PATTERN = re.compile(r"[_\-.]+|(?<=[a-z0-9])(?=[A-Z])")
+# 세션 cookie 이름 (PHPSESSID, JSESSIONID, ASP.NET_SessionId 등)
+SESSION_COOKIE_PATTERN = re.compile(r"(?i)sess(?:ion)?_?id$")
+
+# 공격 payload를 담을 수 없는 토큰 형태의 값 (따옴표, 꺾쇠, 공백 등이 없어야 함)
+TOKEN_VALUE_PATTERN = re.compile(r"^[A-Za-z0-9._\-]{1,256}$")
+
+# 어떤 위치에 있든 의미 없이 바뀌는 값 (UUID, epoch, ISO 시각)
+UUID_PATTERN = re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b")
+EPOCH_PATTERN = re.compile(r"\b1\d{9}(\d{3})?\b")
+ISO_TIME_PATTERN = re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:?\d{2})?\b")
+
+# entry 하나 당 대략적인 고정 overhead (OrderedDict node, tuple, float 등)
+ENTRY_OVERHEAD_BYTES = 200
+
+
+def _normalize_value(value: str) -> str:
+    value = UUID_PATTERN.sub("<uuid>", value)
+    value = ISO_TIME_PATTERN.sub("<time>", value)
+    value = EPOCH_PATTERN.sub("<epoch>", value)
+    return value
+
+
+def _is_volatile_key(key: str) -> bool:
+    if key.lower() in VOLATILE_KEYS:
+        return True
+    return any(segment.lower() in VOLATILE_KEY_SEGMENTS for segment in KEY_SEGMENT_PATTERN.split(key))
+
+
+def _normalize_pair(key: str, value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _normalize_pair(k, v) for k, v in sorted(value.items())}
+    if isinstance(value, list):
+        return [_normalize_pair(key, v) for v in value]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # JSON 숫자로 들어온 timestamp / epoch 값도 문자열과 같은 규칙으로 처리
+        if _is_volatile_key(key):
+            return "<volatile>"
+        normalized = _normalize_value(str(value))
+        return value if normalized == str(value) else normalized
+    if not isinstance(value, str):
+        return value
+    if _is_volatile_key(key) and TOKEN_VALUE_PATTERN.match(value):
+        return "<volatile>"
+    return _normalize_value(value)
+
+
+def _normalize_cookie(raw_cookie: str) -> str:
+    # 세션 / token cookie의 토큰 형태 값은 key만 남기고, 그 외 cookie 값은 fingerprint에 그대로 둔다
+    cookie = SimpleCookie()
+    try:
+        cookie.load(raw_cookie)
+    except Exception:
+        return _normalize_value(raw_cookie)
+    if not cookie:
+        return _normalize_value(raw_cookie)
+    parts = []
+    for name in sorted(cookie.keys()):
+        value = cookie[name].value
+        is_session = SESSION_COOKIE_PATTERN.search(name) or _is_volatile_key(name)
+        parts.append(f"{name}=" + ("<volatile>" if is_session and TOKEN_VALUE_PATTERN.match(value)
+                                   else _normalize_value(value)))
+    return "; ".join(parts)
+
+
+def _normalize_body(body: str) -> Any:
+    if not body:
+        return ""
+    try:
+        parsed = json.loads(body)
+    except ValueError:
+        return _normalize_value(body)
+    return _normalize_pair("", parsed)
+
+
+def build_request_fingerprint(full_context: Dict[str, Any]) -> str:
+    """
+    요청의 method, path, parameter 구조, body를 정규화해서 fingerprint(sha256)를 만듭니다.
+    타임스탬프, 세션 ID 등 요청마다 바뀌는 값은 제거하고, 공격 payload가 될 수 있는 값은 그대로 유지합니다.
+
+    Args:
+        full_context (Dict[str, Any]): secure_agent_gateway에서 만든 요청 context
+
+    Returns:
+        str: 정규화된 요청의 sha256 hex digest
+    """
+    headers = {}
+    for name, value in full_context.get("headers", {}).items():
+        name = name.lower()
+        if name in VOLATILE_HEADERS:
+            continue
+        headers[name] = _normalize_cookie(value) if name == "cookie" else _normalize_value(value)
+
+    query_params = {k: _normalize_pair(k, v) for k, v in full_context.get("query_params", {}).items()}
+
+    canonical = {
+        "method": full_context.get("method", "").upper(),
+        "path": _normalize_value(full_context.get("path", "")),
+        "query_params": query_params,
+        "headers": headers,
+        "body": _normalize_body(full_context.get("body", "")),
+    }
+    canonical_str = json.dumps(canonical, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical_str.encode("utf-8")).hexdigest()
+
+
+# Fingerprint 기준으로 allow / block / review 판정을 저장하는 TTL + LRU 캐시
+class VerdictCache:
+
+    def __init__(self, ttl: float = VERDICT_CACHE_TTL, max_entries: int = VERDICT_CACHE_MAX_ENTRIES,
+                 max_bytes: int = VERDICT_CACHE_MAX_BYTES):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # fingerprint -> (verdict, expire_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, fingerprint: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            verdict, expire_at, size = entry
+            if expire_at <= time.monotonic():
+                self._remove(fingerprint)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            # LRU: 최근 사용한 entry를 뒤로 보낸다
+            self._entries.move_to_end(fingerprint)
+            self.hits += 1
+            return verdict
+
+    def put(self, fingerprint: str, verdict: str, ttl: Optional[float] = None) -> None:
+        if verdict not in CACHEABLE_VERDICTS:
+            return
+
+        size = len(fingerprint) + len(verdict) + ENTRY_OVERHEAD_BYTES
+        expire_at = time.monotonic() + (self._ttl if ttl is None else ttl)
+
+        with self._lock:
+            if fingerprint in self._entries:
+                self._remove(fingerprint)
+            self._entries[fingerprint] = (verdict, expire_at, size)
+            self._bytes += size
+
+            # 개수 또는 메모리 한도를 넘으면 가장 오래 안 쓴 entry부터 제거
+            while self._entries and (len(self._entries) > self._max_entries or self._bytes > self._max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, fingerprint: str) -> None:
+        with self._lock:
+            if fingerprint in self._entries:
+                self._remove(fingerprint)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, fingerprint: str) -> None:
+        _, _, size = self._entries.pop(fingerprint)
+        self._bytes -= size
+
+
+verdict_cache = VerdictCache()
+
+
+def get_verdict_cache() -> VerdictCache:
+    global verdict_cache
+    return verdict_cache
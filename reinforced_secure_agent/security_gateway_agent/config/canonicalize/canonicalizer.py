@@ -0,0 +1,223 @@
+import base64
+import binascii
+import html
+import os
+import re
+from typing import Callable, Dict, List, Optional, Any
+from urllib.parse import unquote_plus
+
+# 디코딩 한도 설정 (.env 또는 환경변수로 조정 가능)
+CANONICALIZE_MAX_DEPTH = int(os.getenv("CANONICALIZE_MAX_DEPTH", "4"))
+CANONICALIZE_MAX_VARIANTS = int(os.getenv("CANONICALIZE_MAX_VARIANTS", "16"))
+CANONICALIZE_MAX_INPUT = int(os.getenv("CANONICALIZE_MAX_INPUT", "16384"))
+# 인증 정보가 들어 있는 header는 디코딩하지 않는다 (Basic 인증 / JWT가 평문으로 prompt와 log에 남지 않도록)
+CREDENTIAL_HEADERS = frozenset(h.strip().lower() for h in os.getenv(
+    "CREDENTIAL_HEADERS",
+    "authorization,proxy-authorization,cookie,x-api-key,api-key,x-auth-token,x-csrf-token,x-xsrf-token"
+).split(",") if h.strip())
+
+# 디코딩 결과가 평문으로 인정되는 printable 비율
+PRINTABLE_RATIO = 0.85
+
+PERCENT_PATTERN = re.compile(r"%[0-9a-fA-F]{2}|%u[0-9a-fA-F]{4}")
+IIS_UNICODE_PATTERN = re.compile(r"%u([0-9a-fA-F]{4})")
+HTML_ENTITY_PATTERN = re.compile(r"&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[a-zA-Z]+);?")
+UNICODE_ESCAPE_PATTERN = re.compile(r"\\u([0-9a-fA-F]{4})|\\x([0-9a-fA-F]{2})")
+# 문자열 안에서 찾는 base64 token은 짧은 단어를 잘못 디코딩하지 않도록 8자 이상만, 값 전체가 token이면 길이 제한 없음
+BASE64_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9+/_-]{8,}={0,2}")
+BASE64_VALUE_PATTERN = re.compile(r"[A-Za-z0-9+/_-]+={0,2}")
+HEX_TOKEN_PATTERN = re.compile(r"\b(?:0x)?((?:[0-9a-fA-F]{2}){4,})\b")
+SQL_COMMENT_PATTERN = re.compile(r"/\*.*?\*/", re.S)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def _is_plain_text(text: str) -> bool:
+    if not text:
+        return False
+    printable = sum(1 for ch in text if ch.isprintable() or ch in "\r\n\t")
+    return printable / len(text) >= PRINTABLE_RATIO
+
+
+def _decode_bytes(raw: bytes) -> Optional[str]:
+    try:
+        text = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    return text if _is_plain_text(text) else None
+
+
+def _url_decode(text: str) -> Optional[str]:
+    if not PERCENT_PATTERN.search(text):
+        return None
+    text = IIS_UNICODE_PATTERN.sub(lambda m: chr(int(m.group(1), 16)), text)
+    return unquote_plus(text)
+
+
+def _html_decode(text: str) -> Optional[str]:
+    if not HTML_ENTITY_PATTERN.search(text):
+        return None
+    return html.unescape(text)
+
+
+def _unicode_escape_decode(text: str) -> Optional[str]:
+    if not UNICODE_ESCAPE_PATTERN.search(text):
+        return None
+    return UNICODE_ESCAPE_PATTERN.sub(lambda m: chr(int(m.group(1) or m.group(2), 16)), text)
+
+
+def _base64_token(match: re.Match) -> str:
+    return _base64_decode_token(match.group(0))
+
+
+def _base64_decode_token(token: str) -> str:
+    stripped = token.rstrip("=")
+    if len(stripped) % 4 == 1:
+        return token
+    padded = stripped + "=" * (-len(stripped) % 4)
+    try:
+        if "-" in padded or "_" in padded:
+            raw = base64.urlsafe_b64decode(padded)
+        else:
+            raw = base64.b64decode(padded, validate=True)
+    except (binascii.Error, ValueError):
+        return token
+    decoded = _decode_bytes(raw)
+    return decoded if decoded is not None else token
+
+
+def _base64_decode(text: str) -> Optional[str]:
+    if not BASE64_TOKEN_PATTERN.search(text):
+        return None
+    return BASE64_TOKEN_PATTERN.sub(_base64_token, text)
+
+
+def _base64_decode_value(text: str) -> Optional[str]:
+    # 입력 전체가 하나의 base64 token이면 길이와 관계없이 디코딩 (예: "aWQ="), 아니면 문자열 안의 token만 디코딩
+    if BASE64_VALUE_PATTERN.fullmatch(text):
+        return _base64_decode_token(text)
+    return _base64_decode(text)
+
+
+def _hex_token(match: re.Match) -> str:
+    try:
+        decoded = _decode_bytes(bytes.fromhex(match.group(1)))
+    except ValueError:
+        return match.group(0)
+    return decoded if decoded is not None else match.group(0)
+
+
+def _hex_decode(text: str) -> Optional[str]:
+    if not HEX_TOKEN_PATTERN.search(text):
+        return None
+    return HEX_TOKEN_PATTERN.sub(_hex_token, text)
+
+
+# 순서대로 적용되는 decoder 목록 (결과가 입력과 같으면 무시)
+DECODERS: List[Callable[[str], Optional[str]]] = [
+    _url_decode,
+    _html_decode,
+    _unicode_escape_decode,
+    _base64_decode,
+    _hex_decode,
+]
+
+
+def normalize_obfuscation(text: str) -> str:
+    # SQL inline 주석, null byte, 대소문자, 연속 공백 우회를 제거한 형태
+    text = SQL_COMMENT_PATTERN.sub(" ", text.replace("\x00", ""))
+    return WHITESPACE_PATTERN.sub(" ", text).strip().lower()
+
+
+def canonicalize(value: str, max_depth: int = CANONICALIZE_MAX_DEPTH,
+                 max_variants: int = CANONICALIZE_MAX_VARIANTS) -> List[str]:
+    """
+    문자열에 URL, 이중 URL, Base64, Hex, HTML Entity, \\uXXXX 인코딩을 재귀적으로 풀어
+    원본과 다른 디코딩 결과(variant) 목록을 반환합니다. 깊이와 개수가 제한되어 있습니다.
+
+    Args:
+        value (str): 원본 문자열
+        max_depth (int): 최대 재귀 디코딩 깊이
+        max_variants (int): 최대 variant 개수
+
+    Returns:
+        List[str]: 원본을 제외한 디코딩 / 정규화 결과
+    """
+    if not value:
+        return []
+    value = value[:CANONICALIZE_MAX_INPUT]
+
+    seen = {value}
+    variants: List[str] = []
+    frontier = [value]
+    for _ in range(max_depth):
+        next_frontier = []
+        for text in frontier:
+            for decoder in DECODERS:
+                decoded = decoder(text)
+                if decoded is None or decoded in seen:
+                    continue
+                seen.add(decoded)
+                variants.append(decoded)
+                next_frontier.append(decoded)
+                if len(variants) >= max_variants:
+                    return variants
+        if not next_frontier:
+            break
+        frontier = next_frontier
+
+    # 주석 / null byte 우회는 마지막 단계(가장 많이 디코딩된 형태)에만 적용
+    # (대소문자와 공백만 다른 경우는 시그니처가 이미 처리하므로 variant로 추가하지 않음)
+    for text in [value] + variants[-2:]:
+        normalized = normalize_obfuscation(text)
+        folded = WHITESPACE_PATTERN.sub(" ", text).strip().lower()
+        if normalized and normalized not in seen and normalized != folded:
+            seen.add(normalized)
+            variants.append(normalized)
+            if len(variants) >= max_variants:
+                break
+    return variants
+
+
+def canonicalize_context(full_context: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    요청 context의 path, query, headers, body를 각각 canonicalize 합니다.
+    디코딩 결과가 있는 필드만 반환합니다.
+    header는 값 하나씩 디코딩해서 "name: variant" 형태로 반환하고, CREDENTIAL_HEADERS는 건너뜁니다.
+    """
+    query_params = full_context.get("query_params", {})
+    fields = {
+        "path": full_context.get("path", ""),
+        "query": "\n".join(f"{k}={v}" for k, v in query_params.items()),
+        "body": full_context.get("body", ""),
+    }
+
+    decoded = {}
+    for field, text in fields.items():
+        variants = canonicalize(text)
+        if variants:
+            decoded[field] = variants
+
+    header_variants: List[str] = []
+    for name, value in full_context.get("headers", {}).items():
+        name = name.lower()
+        if name in CREDENTIAL_HEADERS:
+            continue
+        remaining = CANONICALIZE_MAX_VARIANTS - len(header_variants)
+        if remaining <= 0:
+            break
+        header_variants.extend(f"{name}: {variant}" for variant in canonicalize(value, max_variants=remaining))
+    if header_variants:
+        decoded["headers"] = header_variants
+    return decoded
+
+
+def decode_recursive(encoded: str, decoder: Callable[[str], Optional[str]] = _base64_decode_value,
+                     max_depth: int = CANONICALIZE_MAX_DEPTH) -> str:
+    # 같은 decoder를 더 이상 변화가 없을 때까지 반복 적용 (Tool 용)
+    current = encoded.strip()
+    for _ in range(max_depth):
+        decoded = decoder(current)
+        if decoded is None or decoded == current:
+            break
+        current = decoded
+    return current
@@ -0,0 +1,208 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from config.metrics.metrics import get_metrics_registry
+
+# LLM deployment별 circuit breaker 설정 (.env 또는 환경변수로 조정 가능)
+CIRCUIT_WINDOW_SECONDS = float(os.getenv("CIRCUIT_WINDOW_SECONDS", "30"))       # 오류율 / 지연율을 계산하는 구간
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "10"))                  # 비율로 판단하기 위한 최소 호출 수
+CIRCUIT_ERROR_RATE = float(os.getenv("CIRCUIT_ERROR_RATE", "0.5"))
+CIRCUIT_SLOW_RATE = float(os.getenv("CIRCUIT_SLOW_RATE", "0.5"))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "4"))
+# 이보다 오래 걸리면 실패로 보고 중단 (ADMISSION_CLASSIFY_TIMEOUT보다 짧아야 timeout이 실패로 집계된다)
+CIRCUIT_CALL_TIMEOUT = float(os.getenv("CIRCUIT_CALL_TIMEOUT", "8"))
+CIRCUIT_CONSECUTIVE_FAILURES = int(os.getenv("CIRCUIT_CONSECUTIVE_FAILURES", "5"))  # 호출 수가 적어도 바로 open
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))          # open 유지 시간 (이후 half-open)
+CIRCUIT_HALF_OPEN_PROBES = int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "3"))     # close에 필요한 연속 성공 probe 수
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+STATE_VALUES = {STATE_CLOSED: 0, STATE_HALF_OPEN: 1, STATE_OPEN: 2}
+
+metrics = get_metrics_registry()
+circuit_transitions = metrics.counter("gateway_circuit_transitions_total", "circuit breaker 상태 전이 수",
+                                      ["deployment", "from_state", "to_state"])
+circuit_calls = metrics.counter("gateway_circuit_calls_total", "circuit breaker를 거친 LLM 호출 결과",
+                                ["deployment", "result"])
+
+
+class CircuitOpenError(Exception):
+    # circuit이 열려 있어 LLM을 호출하지 않은 경우
+    def __init__(self, deployment: str):
+        super().__init__(f"LLM deployment {deployment} circuit open")
+        self.deployment = deployment
+
+
+class CircuitBreaker:
+    """
+    LLM deployment 하나에 대한 circuit breaker.
+
+    - closed: 최근 CIRCUIT_WINDOW_SECONDS 동안의 오류율 또는 지연율(CIRCUIT_SLOW_CALL_SECONDS 초과)이 기준을 넘거나,
+      CIRCUIT_CONSECUTIVE_FAILURES번 연속 실패하면 open
+    - open: CIRCUIT_OPEN_SECONDS 동안 호출하지 않고 CircuitOpenError (호출자는 local fallback으로 판단)
+    - half_open: 동시에 CIRCUIT_HALF_OPEN_PROBES개까지만 probe 호출, 그만큼 연속 성공하면 closed / 하나라도 실패하면 다시 open
+    - 호출은 CIRCUIT_CALL_TIMEOUT으로 잘라서 느린 deployment가 요청을 오래 붙잡지 않도록 한다
+    """
+
+    def __init__(self, deployment: str, window_seconds: float = CIRCUIT_WINDOW_SECONDS,
+                 min_calls: int = CIRCUIT_MIN_CALLS, error_rate: float = CIRCUIT_ERROR_RATE,
+                 slow_rate: float = CIRCUIT_SLOW_RATE, slow_call_seconds: float = CIRCUIT_SLOW_CALL_SECONDS,
+                 call_timeout: Optional[float] = CIRCUIT_CALL_TIMEOUT,
+                 consecutive_failures: int = CIRCUIT_CONSECUTIVE_FAILURES,
+                 open_seconds: float = CIRCUIT_OPEN_SECONDS, half_open_probes: int = CIRCUIT_HALF_OPEN_PROBES):
+        self.deployment = deployment
+        self.state = STATE_CLOSED
+        self._window_seconds = window_seconds
+        self._min_calls = min_calls
+        self._error_rate = error_rate
+        self._slow_rate = slow_rate
+        self._slow_call_seconds = slow_call_seconds
+        self._call_timeout = call_timeout if call_timeout and call_timeout > 0 else None
+        self._consecutive_limit = consecutive_failures
+        self._open_seconds = open_seconds
+        self._half_open_probes = max(1, half_open_probes)
+
+        # 최근 호출 결과: (끝난 시각, 실패 여부, 느림 여부)
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()
+        self._failures = 0
+        self._slow = 0
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        print(f"LLM circuit {self.deployment}: {self.state} -> {state}")
+        circuit_transitions.inc(deployment=self.deployment, from_state=self.state, to_state=state)
+        self.state = state
+        if state == STATE_OPEN:
+            self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._failures = self._slow = 0
+        self._consecutive_failures = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def is_open(self) -> bool:
+        # 상태만 확인 (half-open probe slot을 잡지 않음)
+        return self.state == STATE_OPEN and time.monotonic() - self._opened_at < self._open_seconds
+
+    def allow_request(self) -> bool:
+        # 호출해도 되는지 확인하고, half-open이면 probe slot을 하나 잡는다 (잡았다면 반드시 record_* 호출)
+        if self.state == STATE_OPEN:
+            if time.monotonic() - self._opened_at < self._open_seconds:
+                return False
+            self._transition(STATE_HALF_OPEN)
+        if self.state == STATE_HALF_OPEN:
+            if self._probes_in_flight >= self._half_open_probes:
+                return False
+            self._probes_in_flight += 1
+        return True
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self._window_seconds:
+            _, failed, slow = self._outcomes.popleft()
+            self._failures -= failed
+            self._slow -= slow
+
+    def record_success(self, elapsed: float, probe: bool = False) -> None:
+        slow = elapsed > self._slow_call_seconds
+        circuit_calls.inc(deployment=self.deployment, result="slow" if slow else "success")
+        if self.state == STATE_HALF_OPEN:
+            # open 이전에 시작된 호출의 결과는 probe로 치지 않는다
+            if not probe:
+                return
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if slow:
+                self._transition(STATE_OPEN)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self._half_open_probes:
+                self._transition(STATE_CLOSED)
+            return
+        self._consecutive_failures = 0
+        self._add_outcome(False, slow)
+
+    def record_failure(self, reason: str = "error", probe: bool = False) -> None:
+        circuit_calls.inc(deployment=self.deployment, result=reason)
+        if self.state == STATE_HALF_OPEN:
+            if probe:
+                self._transition(STATE_OPEN)
+            return
+        self._consecutive_failures += 1
+        self._add_outcome(True, False)
+
+    def release_probe(self, probe: bool = True) -> None:
+        # 결과를 판단할 수 없이 끝난 probe (취소 등)는 slot만 돌려준다
+        if probe and self.state == STATE_HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _add_outcome(self, failed: bool, slow: bool) -> None:
+        now = time.monotonic()
+        self._outcomes.append((now, failed, slow))
+        self._failures += failed
+        self._slow += slow
+        self._trim(now)
+        if self.state != STATE_CLOSED:
+            return
+        total = len(self._outcomes)
+        if self._consecutive_failures >= self._consecutive_limit:
+            self._transition(STATE_OPEN)
+        elif total >= self._min_calls and (self._failures / total >= self._error_rate
+                                           or self._slow / total >= self._slow_rate):
+            self._transition(STATE_OPEN)
+
+    async def call(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.allow_request():
+            circuit_calls.inc(deployment=self.deployment, result="rejected")
+            raise CircuitOpenError(self.deployment)
+        probe = self.state == STATE_HALF_OPEN
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(func(), timeout=self._call_timeout)
+        except asyncio.TimeoutError:
+            self.record_failure("timeout", probe)
+            raise
+        except asyncio.CancelledError:
+            self.release_probe(probe)
+            raise
+        except Exception:
+            self.record_failure("error", probe)
+            raise
+        self.record_success(time.perf_counter() - start, probe)
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        self._trim(time.monotonic())
+        total = len(self._outcomes)
+        return {
+            "state": STATE_VALUES[self.state],
+            "calls": total,
+            "error_rate": round(self._failures / total, 3) if total else 0.0,
+            "slow_rate": round(self._slow / total, 3) if total else 0.0,
+            "consecutive_failures": self._consecutive_failures,
+        }
+
+
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(deployment: Optional[str]) -> CircuitBreaker:
+    global circuit_breakers
+    deployment = deployment or "default"
+    breaker = circuit_breakers.get(deployment)
+    if breaker is None:
+        breaker = CircuitBreaker(deployment)
+        circuit_breakers[deployment] = breaker
+    return breaker
+
+
+def get_circuit_breakers() -> Dict[str, CircuitBreaker]:
+    global circuit_breakers
+    return circuit_breakers
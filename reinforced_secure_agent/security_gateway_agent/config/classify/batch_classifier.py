@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import secrets
+import time
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from config.metrics.metrics import get_metrics_registry
+from config.decision.decision_log import add_decision_tokens, token_usage
+from config.circuit.circuit_breaker import get_circuit_breaker
+from config.prompts.prompts import build_llm_prompt, build_llm_system_prompt, build_llm_batch_prompt, \
+    build_llm_batch_system_prompt
+
+# 1차 LLM batch 설정 (.env 또는 환경변수로 조정 가능, LLM_BATCH_WINDOW_MS=0 이면 batch 없이 요청마다 호출)
+LLM_BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "20"))
+LLM_BATCH_MAX = int(os.getenv("LLM_BATCH_MAX", "8"))
+
+VALID_ACTIONS = ("block", "allow", "review")
+
+metrics = get_metrics_registry()
+batch_size_histogram = metrics.histogram("gateway_llm_batch_size", "1차 LLM 호출 한 번에 묶인 요청 수",
+                                         buckets=(1, 2, 4, 8, 16, 32))
+llm_calls = metrics.counter("gateway_llm_calls_total", "1차 LLM 호출 수", ["mode"])
+batch_fallbacks = metrics.counter("gateway_llm_batch_fallback_total", "batch 응답이 잘못되어 개별 호출로 다시 판단한 요청 수",
+                                  ["reason"])
+
+
+def parse_batch_verdicts(content: str, refs: List[str]) -> Dict[int, str]:
+    """
+    [{"id": 0, "ref": "...", "action": "allow"}, ...] 응답을 id -> action 으로 반환합니다.
+    배열이 요청과 정확히 맞지 않으면(개수, id 순서, ref, action 중 하나라도 다르면) 한 요청의 내용이
+    다른 요청의 판정을 바꿨을 수 있으므로 batch 전체를 거부합니다 (ValueError, 호출자는 개별 판단으로 전환).
+    """
+    start, end = content.find("["), content.rfind("]")
+    if start < 0 or end < start:
+        raise ValueError("batch 응답에 JSON 배열이 없습니다")
+    items = json.loads(content[start:end + 1])
+    if not isinstance(items, list):
+        raise ValueError("batch 응답이 JSON 배열이 아닙니다")
+    if len(items) != len(refs):
+        raise ValueError(f"batch 응답 항목 수가 요청 수와 다릅니다 ({len(items)} != {len(refs)})")
+
+    verdicts: Dict[int, str] = {}
+    for index, (item, ref) in enumerate(zip(items, refs)):
+        if not isinstance(item, dict) or str(item.get("id")) != str(index) or str(item.get("ref")) != ref:
+            raise ValueError(f"batch 응답 {index}번 항목의 id / ref가 요청과 맞지 않습니다")
+        action = str(item.get("action", "")).strip().lower()
+        if action not in VALID_ACTIONS:
+            raise ValueError(f"batch 응답 {index}번 항목의 action이 올바르지 않습니다: {action[:20]}")
+        verdicts[index] = action
+    return verdicts
+
+
+class BatchClassifier:
+    """
+    1차 LLM 판단을 묶어서 보내는 분류기.
+
+    - LLM_BATCH_WINDOW_MS 동안(또는 LLM_BATCH_MAX개가 찰 때까지) 들어온 요청을 한 번의 호출로 판단
+    - system prompt는 batch당 한 번만 보내고, 응답은 id별 JSON 배열로 받아 각 요청에 돌려준다
+    - 요청마다 내용은 JSON 문자열로 escape하고 batch마다 새로 만든 ref로 구분하며,
+      응답 배열이 요청과 정확히 맞지 않으면 batch 전체를 기존 방식(요청 하나씩)으로 다시 판단
+      (다른 client의 요청에 들어 있는 prompt injection이 판정 순서를 바꾸지 못하도록)
+    - LLM 호출은 circuit breaker를 거친다 (LLM pool이면 failover까지 모두 실패한 경우만 실패로 집계,
+      호출 자체가 실패하면 batch 전체에 같은 예외를 전달)
+    """
+
+    def __init__(self, llm, window_ms: float = LLM_BATCH_WINDOW_MS, max_batch: int = LLM_BATCH_MAX):
+        self._llm = llm
+        self._breaker = get_circuit_breaker(getattr(llm, "deployment_name", None))
+        self._window = window_ms / 1000.0
+        self._max_batch = max(1, max_batch)
+        # future 결과는 (verdict, 그 요청 몫의 token 수)
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    async def _classify_one(self, str_full_context: str) -> Tuple[str, int]:
+        llm_calls.inc(mode="single")
+        decision = await self._breaker.call(lambda: self._llm.ainvoke([
+            SystemMessage(content=build_llm_system_prompt()),
+            HumanMessage(content=build_llm_prompt(str_full_context))
+        ]))
+        result = json.loads(decision.content)
+        action = str(result.get('action', '')).strip().lower() if isinstance(result, dict) else ''
+        if action not in VALID_ACTIONS:
+            raise ValueError(f"1차 LLM 응답 형식 오류: {decision.content[:200]}")
+        return action, token_usage(decision)
+
+    async def classify_one(self, str_full_context: str) -> str:
+        action, tokens = await self._classify_one(str_full_context)
+        add_decision_tokens(tokens)
+        return action
+
+    async def classify(self, str_full_context: str) -> str:
+        if self._window <= 0 or self._max_batch == 1:
+            return await self.classify_one(str_full_context)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((str_full_context, future))
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._flush)
+
+        # 기다리던 요청이 취소되어도 batch 안의 다른 요청 결과에는 영향이 없도록 shield
+        action, tokens = await asyncio.shield(future)
+        # batch task가 아니라 요청 쪽 context에서 기록해야 요청별 decision trace에 남는다
+        add_decision_tokens(tokens)
+        return action
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        batch_size_histogram.observe(len(batch))
+        contexts = [context for context, _ in batch]
+        refs = [secrets.token_hex(3) for _ in batch]
+
+        tokens = 0
+        if len(batch) == 1:
+            verdicts: Dict[int, str] = {}
+        else:
+            start = time.perf_counter()
+            llm_calls.inc(mode="batch")
+            try:
+                decision = await self._breaker.call(lambda: self._llm.ainvoke([
+                    SystemMessage(content=build_llm_batch_system_prompt()),
+                    HumanMessage(content=build_llm_batch_prompt(contexts, refs))
+                ]))
+            except Exception as e:
+                # 호출 자체가 실패(circuit open, timeout, API 오류)했다면 하나씩 다시 호출해도 같은 결과이므로 바로 전달
+                print(f"1차 LLM batch 호출 실패: {e!r}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                        future.exception()
+                return
+            try:
+                verdicts = parse_batch_verdicts(decision.content, refs)
+                # batch 호출 token은 요청 수로 나눠서 각 요청에 기록
+                tokens = token_usage(decision) // len(batch)
+                print(f"1차 LLM batch 판단 ({len(batch)}건): {time.perf_counter() - start:.4f}초")
+            except Exception as e:
+                print(f"1차 LLM batch 판단 실패, 개별 판단으로 전환: {e}")
+                batch_fallbacks.inc(len(batch), reason="malformed")
+                verdicts = {}
+
+        for index, (_, future) in enumerate(batch):
+            if index in verdicts and not future.done():
+                future.set_result((verdicts[index], tokens))
+
+        # batch에서 결과를 받지 못한 요청은 하나씩 다시 판단 (동시에 실행)
+        missing = [(context, future) for index, (context, future) in enumerate(batch) if index not in verdicts]
+        if missing:
+            await asyncio.gather(*(self._resolve_one(context, future) for context, future in missing))
+
+    async def _resolve_one(self, str_full_context: str, future: asyncio.Future) -> None:
+        try:
+            result = await self._classify_one(str_full_context)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+                # 기다리는 요청이 없어도 "exception was never retrieved" 경고가 나지 않도록
+                future.exception()
+            return
+        if not future.done():
+            future.set_result(result)
+
+
+batch_classifier: Optional[BatchClassifier] = None
+
+
+def get_batch_classifier() -> BatchClassifier:
+    global batch_classifier
+    if batch_classifier is None:
+        from config.agent_config.agent_config import llm
+        batch_classifier = BatchClassifier(llm)
+    return batch_classifier
@@ -0,0 +1,61 @@
+import os
+from typing import Any, Dict, Optional
+
+from config.metrics.metrics import get_metrics_registry
+from config.signature.signature_filter import get_signature_filter
+
+# LLM을 사용할 수 없을 때(circuit open, 호출 실패, 응답 형식 오류)의 local 판단 설정 (.env 또는 환경변수로 조정 가능)
+# 어떤 시그니처에도 걸리지 않은 요청의 판정
+LLM_FALLBACK_DEFAULT_ACTION = os.getenv("LLM_FALLBACK_DEFAULT_ACTION", "allow").lower()
+# escalate 시그니처(의심 패턴)에 걸린 요청의 판정
+LLM_FALLBACK_SUSPICIOUS_ACTION = os.getenv("LLM_FALLBACK_SUSPICIOUS_ACTION", "block").lower()
+
+FALLBACK_ACTIONS = ("allow", "block")
+
+metrics = get_metrics_registry()
+fallback_decisions = metrics.counter("gateway_llm_fallback_total", "LLM 대신 local fallback으로 판단한 요청 수",
+                                     ["reason", "action"])
+
+
+def _valid_action(action: str, default: str, name: str) -> str:
+    if action in FALLBACK_ACTIONS:
+        return action
+    print(f"알 수 없는 {name}({action}), {default}로 동작합니다")
+    return default
+
+
+class FallbackClassifier:
+    """
+    CPU만 사용하는 local fallback 분류기 (network 호출 없음).
+
+    요청 context(디코딩 결과 포함)를 필드(method / path / query / headers / body)별로 시그니처로 다시 검사해서
+    block 시그니처 -> block, escalate 시그니처 -> LLM_FALLBACK_SUSPICIOUS_ACTION, 그 외 -> LLM_FALLBACK_DEFAULT_ACTION
+    """
+
+    def __init__(self, default_action: str = LLM_FALLBACK_DEFAULT_ACTION,
+                 suspicious_action: str = LLM_FALLBACK_SUSPICIOUS_ACTION):
+        self.default_action = _valid_action(default_action, "allow", "LLM_FALLBACK_DEFAULT_ACTION")
+        self.suspicious_action = _valid_action(suspicious_action, "block", "LLM_FALLBACK_SUSPICIOUS_ACTION")
+        self._signature_filter = get_signature_filter()
+
+    def classify(self, full_context: Dict[str, Any], reason: str = "error") -> str:
+        # 직렬화된 문자열을 body 하나로 검사하면 method / path까지 body 시그니처에 걸리므로 원본 dict를 검사
+        signature_action, matched_signatures = self._signature_filter.inspect(full_context)
+        if signature_action == "block":
+            action = "block"
+        elif matched_signatures:
+            action = self.suspicious_action
+        else:
+            action = self.default_action
+        fallback_decisions.inc(reason=reason, action=action)
+        return action
+
+
+fallback_classifier: Optional[FallbackClassifier] = None
+
+
+def get_fallback_classifier() -> FallbackClassifier:
+    global fallback_classifier
+    if fallback_classifier is None:
+        fallback_classifier = FallbackClassifier()
+    return fallback_classifier
@@ -0,0 +1,392 @@
+import json
+import os
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.embedding.embedding_service import get_embedding_service
+from config.metrics.metrics import get_metrics_registry
+from config.models.model_registry import EMBEDDING_MODEL_NAME
+
+# local ML 분류 tier 설정 (.env 또는 환경변수로 조정 가능)
+LOCAL_CLASSIFIER_ENABLED = os.getenv("LOCAL_CLASSIFIER_ENABLED", "true").lower() == "true"
+# 학습 결과 파일 경로 (확장자 제외: .npz = weight, .json = threshold / 학습 정보)
+LOCAL_CLASSIFIER_PATH = os.getenv("LOCAL_CLASSIFIER_PATH", os.path.join("models", "local_classifier"))
+# 비워 두면 학습 때 calibration으로 정한 threshold 사용 (0~1, block 확률 기준)
+LOCAL_CLASSIFIER_BLOCK_THRESHOLD = os.getenv("LOCAL_CLASSIFIER_BLOCK_THRESHOLD", "")
+LOCAL_CLASSIFIER_ALLOW_THRESHOLD = os.getenv("LOCAL_CLASSIFIER_ALLOW_THRESHOLD", "")
+
+# 학습 기본값 (training/train_local_classifier.py 인자로도 조정 가능)
+HASH_BITS = 11                   # byte n-gram hashing 차원 = 2 ** HASH_BITS
+NGRAM_RANGE = (3, 5)
+MAX_FEATURE_BYTES = 4096         # 직렬화된 context 앞부분만 사용 (n-gram 계산량 제한)
+BLOCK_PRECISION = 0.99           # block으로 바로 판단하는 구간의 검증 precision 목표
+ALLOW_PRECISION = 0.995          # allow로 바로 판단하는 구간의 검증 precision 목표 (놓친 공격이 더 비싸므로 더 엄격)
+MIN_SUPPORT = 30                 # threshold 구간에 필요한 최소 검증 sample 수
+
+LABELS = ("allow", "block")
+DISABLED_BLOCK_THRESHOLD = 1.01  # 목표 precision을 만족하는 구간이 없으면 해당 방향으로는 판단하지 않는다
+DISABLED_ALLOW_THRESHOLD = -0.01
+
+_HASH_PRIME = np.uint64(1099511628211)
+_HASH_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+metrics = get_metrics_registry()
+local_decisions = metrics.counter("gateway_local_classifier_total", "local ML 분류 결과", ["result"])
+local_seconds = metrics.histogram("gateway_local_classifier_seconds", "local ML 분류 시간 (embedding 포함)")
+
+
+def hash_ngrams(text: str, bits: int = HASH_BITS, ngram_range: Tuple[int, int] = NGRAM_RANGE,
+                max_bytes: int = MAX_FEATURE_BYTES) -> np.ndarray:
+    """
+    소문자 UTF-8 byte n-gram을 signed feature hashing으로 2 ** bits 차원 vector로 만든다.
+    n-gram hash는 NumPy 연산으로 한 번에 계산하고 (Python loop 없음), process가 달라도 같은 값이 나온다.
+    """
+    dim = 1 << bits
+    data = np.frombuffer(text.lower().encode("utf-8")[:max_bytes], dtype=np.uint8).astype(np.uint64)
+    indices, signs = [], []
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        if len(data) < n:
+            continue
+        windows = np.lib.stride_tricks.sliding_window_view(data, n)
+        hashed = np.full(len(windows), np.uint64(n), dtype=np.uint64)
+        for column in range(n):
+            hashed = hashed * _HASH_PRIME + windows[:, column]
+        hashed = hashed * _HASH_MIX
+        indices.append((hashed >> np.uint64(64 - bits)).astype(np.intp))
+        signs.append(np.where(hashed & np.uint64(1), 1.0, -1.0))
+    if not indices:
+        return np.zeros(dim, dtype=np.float32)
+    counts = np.bincount(np.concatenate(indices), weights=np.concatenate(signs), minlength=dim)
+    # 긴 요청에서 같은 n-gram이 반복되어도 한 feature가 지배하지 않도록 log scaling 후 정규화
+    features = np.sign(counts) * np.log1p(np.abs(counts))
+    norm = np.linalg.norm(features)
+    return (features / norm if norm > 0 else features).astype(np.float32)
+
+
+def build_features(text: str, embedding: Optional[np.ndarray], bits: int = HASH_BITS,
+                   ngram_range: Tuple[int, int] = NGRAM_RANGE) -> np.ndarray:
+    # [정규화된 MiniLM embedding | byte n-gram hashing] (embedding을 쓰지 않는 model이면 hashing만)
+    hashed = hash_ngrams(text, bits, ngram_range)
+    if embedding is None:
+        return hashed
+    embedding = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(embedding)
+    return np.concatenate([embedding / norm if norm > 0 else embedding, hashed])
+
+
+def sigmoid(values: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(values, -40.0, 40.0)))
+
+
+# ---------- 학습 (offline 학습 command에서 사용) ----------
+
+def fit_logistic(features: np.ndarray, labels: np.ndarray, l2: float = 1e-4, epochs: int = 60,
+                 learning_rate: float = 0.05, batch_size: int = 256, seed: int = 0) -> Tuple[np.ndarray, float]:
+    """
+    class 균형 가중치를 준 L2 logistic regression (mini-batch Adam).
+    block 예시는 적고 allow 예시는 많으므로 두 class의 전체 가중치가 같도록 sample weight를 준다.
+    """
+    rng = np.random.default_rng(seed)
+    count, dim = features.shape
+    positives = max(1, int(labels.sum()))
+    negatives = max(1, count - positives)
+    sample_weights = np.where(labels == 1, count / (2 * positives), count / (2 * negatives)).astype(np.float32)
+
+    params = np.zeros(dim + 1, dtype=np.float64)
+    moment = np.zeros_like(params)
+    velocity = np.zeros_like(params)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    step = 0
+    for _ in range(epochs):
+        order = rng.permutation(count)
+        for start in range(0, count, batch_size):
+            batch = order[start:start + batch_size]
+            x, y, w = features[batch], labels[batch], sample_weights[batch]
+            error = (sigmoid(x @ params[:-1] + params[-1]) - y) * w
+            gradient = np.empty_like(params)
+            gradient[:-1] = x.T @ error / len(batch) + l2 * params[:-1]
+            gradient[-1] = error.mean()
+
+            step += 1
+            moment = beta1 * moment + (1 - beta1) * gradient
+            velocity = beta2 * velocity + (1 - beta2) * gradient ** 2
+            params -= learning_rate * (moment / (1 - beta1 ** step)) / (np.sqrt(velocity / (1 - beta2 ** step)) + eps)
+    return params[:-1].astype(np.float32), float(params[-1])
+
+
+def fit_platt(scores: np.ndarray, labels: np.ndarray, iterations: int = 100) -> Tuple[float, float]:
+    """
+    Platt scaling: 검증 set의 logit s에 대해 P(block) = sigmoid(a * s + b)를 Newton method로 맞춘다.
+    (class 균형 가중치로 학습한 logit을 실제 class 비율에 맞는 확률로 보정)
+    """
+    positives = float(labels.sum())
+    negatives = float(len(labels) - positives)
+    # 과적합을 막기 위한 Platt의 target smoothing
+    targets = np.where(labels == 1, (positives + 1) / (positives + 2), 1 / (negatives + 2))
+    a, b = 1.0, 0.0
+    for _ in range(iterations):
+        p = sigmoid(a * scores + b)
+        d = p - targets
+        w = np.maximum(p * (1 - p), 1e-12)
+        gradient = np.array([np.dot(d, scores), d.sum()])
+        hessian = np.array([[np.dot(w * scores, scores), np.dot(w, scores)],
+                            [np.dot(w, scores), w.sum()]]) + np.eye(2) * 1e-9
+        delta = np.linalg.solve(hessian, gradient)
+        a, b = a - delta[0], b - delta[1]
+        if np.abs(delta).max() < 1e-9:
+            break
+    return float(a), float(b)
+
+
+def choose_thresholds(probabilities: np.ndarray, labels: np.ndarray, block_precision: float = BLOCK_PRECISION,
+                      allow_precision: float = ALLOW_PRECISION, min_support: int = MIN_SUPPORT) -> Tuple[float, float]:
+    """
+    검증 set에서 목표 precision을 만족하는 가장 넓은 구간의 경계를 고른다.
+        block: p >= block_threshold 인 요청 중 실제 block 비율 >= block_precision
+        allow: p <= allow_threshold 인 요청 중 실제 allow 비율 >= allow_precision
+    둘 사이(불확실 구간)의 요청만 LLM으로 보낸다. 보정된 확률이 반대쪽(0.5 기준)인 요청은 precision과 관계없이 판단하지 않는다.
+    """
+    order = np.argsort(-probabilities)
+    sorted_p, sorted_y = probabilities[order], labels[order]
+    counts = np.arange(1, len(sorted_p) + 1)
+
+    block_threshold = DISABLED_BLOCK_THRESHOLD
+    precision = np.cumsum(sorted_y) / counts
+    # 같은 확률 값은 나눠서 판단할 수 없으므로 값이 바뀌는 위치에서만 자른다
+    boundary = np.append(sorted_p[1:] != sorted_p[:-1], True)
+    valid = np.flatnonzero(boundary & (precision >= block_precision) & (counts >= min_support) & (sorted_p >= 0.5))
+    if len(valid):
+        block_threshold = float(sorted_p[valid[-1]])
+
+    allow_threshold = DISABLED_ALLOW_THRESHOLD
+    ascending_p, ascending_y = sorted_p[::-1], sorted_y[::-1]
+    precision = np.cumsum(1 - ascending_y) / counts
+    boundary = np.append(ascending_p[1:] != ascending_p[:-1], True)
+    valid = np.flatnonzero(boundary & (precision >= allow_precision) & (counts >= min_support)
+                           & (ascending_p < 0.5))
+    if len(valid):
+        allow_threshold = float(ascending_p[valid[-1]])
+    return block_threshold, allow_threshold
+
+
+class LocalModel:
+    """
+    학습된 local 분류 model (logistic regression weight + Platt scaling + threshold).
+    """
+
+    def __init__(self, weights: np.ndarray, bias: float, platt: Tuple[float, float], block_threshold: float,
+                 allow_threshold: float, hash_bits: int = HASH_BITS, ngram_range: Tuple[int, int] = NGRAM_RANGE,
+                 embedding_model: Optional[str] = EMBEDDING_MODEL_NAME, info: Optional[Dict[str, Any]] = None):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = bias
+        self.platt = platt
+        self.block_threshold = block_threshold
+        self.allow_threshold = allow_threshold
+        self.hash_bits = hash_bits
+        self.ngram_range = tuple(ngram_range)
+        # None이면 embedding 없이 hashing feature만 사용
+        self.embedding_model = embedding_model
+        self.info = info or {}
+
+    def features(self, text: str, embedding: Optional[np.ndarray] = None) -> np.ndarray:
+        return build_features(text, embedding if self.embedding_model else None, self.hash_bits, self.ngram_range)
+
+    def probability(self, features: np.ndarray) -> np.ndarray:
+        # 보정된 block 확률 (features: 한 행 또는 여러 행)
+        scores = features @ self.weights + self.bias
+        return sigmoid(self.platt[0] * scores + self.platt[1])
+
+    def decide(self, probability: float) -> Optional[str]:
+        if probability >= self.block_threshold:
+            return "block"
+        if probability <= self.allow_threshold:
+            return "allow"
+        return None
+
+    def save(self, path: str = LOCAL_CLASSIFIER_PATH) -> None:
+        # 임시 파일에 쓴 뒤 os.replace로 교체 (gateway가 읽는 도중에도 온전한 파일만 보이도록)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        weights_tmp = path + ".npz.tmp"
+        meta_tmp = path + ".json.tmp"
+        with open(weights_tmp, "wb") as f:
+            np.savez(f, weights=self.weights)
+        with open(meta_tmp, "w", encoding="utf-8") as f:
+            json.dump({"bias": self.bias, "platt": list(self.platt), "block_threshold": self.block_threshold,
+                       "allow_threshold": self.allow_threshold, "hash_bits": self.hash_bits,
+                       "ngram_range": list(self.ngram_range), "embedding_model": self.embedding_model,
+                       "info": self.info}, f, ensure_ascii=False, indent=2)
+        os.replace(weights_tmp, path + ".npz")
+        os.replace(meta_tmp, path + ".json")
+
+
+def load_local_model(path: str = LOCAL_CLASSIFIER_PATH) -> Optional[LocalModel]:
+    if not (os.path.exists(path + ".npz") and os.path.exists(path + ".json")):
+        return None
+    with open(path + ".json", encoding="utf-8") as f:
+        meta = json.load(f)
+    with np.load(path + ".npz") as data:
+        weights = data["weights"]
+    model = LocalModel(weights, meta["bias"], tuple(meta["platt"]), meta["block_threshold"],
+                       meta["allow_threshold"], meta["hash_bits"], tuple(meta["ngram_range"]),
+                       meta.get("embedding_model"), meta.get("info"))
+    expected = (1 << model.hash_bits) + (int(model.info.get("embedding_dim", 0)) if model.embedding_model else 0)
+    if model.weights.shape != (expected,):
+        raise ValueError(f"weight 크기({model.weights.shape})가 feature 차원({expected})과 다릅니다")
+    return model
+
+
+def train_local_model(texts: Sequence[str], labels: Sequence[int], embeddings: Optional[np.ndarray] = None,
+                      validation_ratio: float = 0.2, hash_bits: int = HASH_BITS,
+                      block_precision: float = BLOCK_PRECISION, allow_precision: float = ALLOW_PRECISION,
+                      min_support: int = MIN_SUPPORT, l2: float = 1e-4, epochs: int = 60,
+                      seed: int = 0) -> LocalModel:
+    """
+    학습 set으로 logistic regression을 학습하고, 따로 떼어 둔 검증 set으로 Platt scaling과 threshold를 정한다.
+    (class별로 같은 비율을 검증 set으로 떼어서 block 예시가 적어도 양쪽에 남도록)
+    """
+    y = np.asarray(labels, dtype=np.float32)
+    embedding_list = [None] * len(texts) if embeddings is None else embeddings
+    x = np.stack([build_features(text, embedding, hash_bits) for text, embedding in zip(texts, embedding_list)])
+
+    rng = np.random.default_rng(seed)
+    validation = np.zeros(len(y), dtype=bool)
+    for label in (0, 1):
+        members = rng.permutation(np.flatnonzero(y == label))
+        validation[members[:int(round(len(members) * validation_ratio))]] = True
+    if validation.all() or not validation.any():
+        raise ValueError("학습 / 검증 set으로 나눌 수 있을 만큼 예시가 충분하지 않습니다")
+
+    weights, bias = fit_logistic(x[~validation], y[~validation], l2=l2, epochs=epochs, seed=seed)
+    scores = x[validation] @ weights + bias
+    platt = fit_platt(scores, y[validation])
+    probabilities = sigmoid(platt[0] * scores + platt[1])
+    block_threshold, allow_threshold = choose_thresholds(probabilities, y[validation], block_precision,
+                                                         allow_precision, min_support)
+
+    model = LocalModel(weights, bias, platt, block_threshold, allow_threshold, hash_bits,
+                       embedding_model=EMBEDDING_MODEL_NAME if embeddings is not None else None)
+    model.info = {
+        "trained_at": round(time.time(), 3),
+        "embedding_dim": int(embeddings.shape[1]) if embeddings is not None else 0,
+        "examples": {"block": int(y.sum()), "allow": int(len(y) - y.sum())},
+        "validation": evaluate(model, probabilities, y[validation]),
+    }
+    return model
+
+
+def evaluate(model: LocalModel, probabilities: np.ndarray, labels: np.ndarray) -> Dict[str, Any]:
+    # 검증 set 기준 coverage(LLM 없이 판단한 비율)와 판단한 구간의 정확도
+    block = probabilities >= model.block_threshold
+    allow = probabilities <= model.allow_threshold
+    decided = block | allow
+    correct = (block & (labels == 1)) | (allow & (labels == 0))
+    return {
+        "count": int(len(labels)),
+        "coverage": round(float(decided.mean()), 4) if len(labels) else 0.0,
+        "accuracy": round(float(correct.sum() / decided.sum()), 4) if decided.any() else None,
+        "block_precision": round(float(labels[block].mean()), 4) if block.any() else None,
+        "allow_precision": round(float(1 - labels[allow].mean()), 4) if allow.any() else None,
+        "missed_blocks": int((allow & (labels == 1)).sum()),
+    }
+
+
+# ---------- 요청 처리 경로 ----------
+
+def _threshold_override(value: str, default: float, name: str) -> float:
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"잘못된 {name}({value}), 학습된 threshold를 사용합니다")
+        return default
+
+
+class LocalClassifier:
+    """
+    LLM 앞단의 local ML 분류 tier.
+
+    - startup에서 학습된 model 파일을 읽고, 파일이 없으면 아무것도 판단하지 않는다 (모든 요청이 LLM으로)
+    - embedding은 EmbeddingService(cache + micro-batch)를 사용하므로 이후 few-shot 검색과 같은 encode를 공유
+    - 보정된 block 확률이 threshold 밖(확신이 높은 구간)이면 바로 판단하고, 불확실 구간이면 None (LLM이 판단)
+    """
+
+    def __init__(self, path: str = LOCAL_CLASSIFIER_PATH, enabled: bool = LOCAL_CLASSIFIER_ENABLED):
+        self.path = path
+        self.enabled = enabled
+        self.model: Optional[LocalModel] = None
+        self._embedding_service = get_embedding_service()
+        self._decided = 0
+        self._uncertain = 0
+
+    def load(self) -> bool:
+        if not self.enabled:
+            return False
+        try:
+            model = load_local_model(self.path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"local 분류 model을 읽을 수 없어 사용하지 않습니다 ({self.path}): {e}")
+            return False
+        if model is None:
+            print(f"local 분류 model 파일이 없어 모든 요청을 LLM으로 판단합니다 ({self.path})")
+            return False
+        if model.embedding_model and model.embedding_model != EMBEDDING_MODEL_NAME:
+            print(f"local 분류 model의 embedding model({model.embedding_model})이 "
+                  f"현재 설정({EMBEDDING_MODEL_NAME})과 달라 사용하지 않습니다")
+            return False
+        model.block_threshold = _threshold_override(LOCAL_CLASSIFIER_BLOCK_THRESHOLD, model.block_threshold,
+                                                    "LOCAL_CLASSIFIER_BLOCK_THRESHOLD")
+        model.allow_threshold = _threshold_override(LOCAL_CLASSIFIER_ALLOW_THRESHOLD, model.allow_threshold,
+                                                    "LOCAL_CLASSIFIER_ALLOW_THRESHOLD")
+        self.model = model
+        print(f"local 분류 model 불러오기 완료 (block >= {model.block_threshold:.4f}, "
+              f"allow <= {model.allow_threshold:.4f}, 검증 coverage {model.info.get('validation', {}).get('coverage')})")
+        return True
+
+    async def classify(self, str_full_context: str) -> Optional[str]:
+        model = self.model
+        if model is None:
+            return None
+        start = time.perf_counter()
+        try:
+            embedding = await self._embedding_service.embed(str_full_context) if model.embedding_model else None
+            probability = float(model.probability(model.features(str_full_context, embedding)))
+        except Exception as e:
+            # local 분류를 못 해도 LLM이 판단하면 되므로 요청을 실패시키지 않는다
+            print(f"local 분류 실패, LLM으로 판단: {e!r}")
+            local_decisions.inc(result="error")
+            return None
+        finally:
+            local_seconds.observe(time.perf_counter() - start)
+
+        action = model.decide(probability)
+        if action is None:
+            self._uncertain += 1
+        else:
+            self._decided += 1
+        local_decisions.inc(result=action or "uncertain")
+        return action
+
+    def stats(self) -> Dict[str, float]:
+        model = self.model
+        return {
+            "loaded": int(model is not None),
+            "block_threshold": model.block_threshold if model else DISABLED_BLOCK_THRESHOLD,
+            "allow_threshold": model.allow_threshold if model else DISABLED_ALLOW_THRESHOLD,
+            "decided": self._decided,
+            "uncertain": self._uncertain,
+        }
+
+
+local_classifier: Optional[LocalClassifier] = None
+
+
+def get_local_classifier() -> LocalClassifier:
+    global local_classifier
+    if local_classifier is None:
+        local_classifier = LocalClassifier()
+    return local_classifier
@@ -0,0 +1,96 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# 공유된 판단을 기다리는 최대 시간 (.env 또는 환경변수로 조정 가능)
+SINGLE_FLIGHT_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_TIMEOUT", "60"))
+
+
+# 같은 fingerprint로 동시에 들어온 판단 요청을 하나의 실행으로 합친다 (single-flight)
+class SingleFlight:
+
+    def __init__(self, timeout: Optional[float] = SINGLE_FLIGHT_TIMEOUT):
+        self._timeout = timeout
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+
+        self.leaders = 0      # 실제로 실행된 판단 수
+        self.coalesced = 0    # 다른 요청의 판단 결과를 공유받은 수
+        self.timeouts = 0
+        self.cancellations = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        key에 해당하는 실행이 이미 있다면 그 결과를 기다리고, 없다면 func를 실행합니다.
+
+        - 실행 자체는 별도 Task로 분리되어 있어, 기다리던 요청 하나가 취소(client 연결 종료 등)되어도
+          다른 요청이 기다리는 판단은 취소되지 않습니다. 기다리는 요청이 모두 사라졌을 때만 취소합니다.
+        - timeout이 지나면 해당 요청만 asyncio.TimeoutError를 받습니다.
+
+        Args:
+            key (str): 요청 fingerprint
+            func (Callable[[], Awaitable[Any]]): 실제 판단을 수행하는 coroutine 함수
+
+        Returns:
+            Any: func의 결과 (예외가 발생했다면 모든 대기자에게 같은 예외 전파)
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda _, k=key, t=task: self._forget(k, t))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+        try:
+            # shield: 대기자가 취소 / timeout 되어도 공유 Task는 계속 실행
+            return await asyncio.wait_for(asyncio.shield(task), timeout=self._timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except asyncio.CancelledError:
+            self.cancellations += 1
+            raise
+        finally:
+            self._release(key, task)
+
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is not task:
+            return
+        self._waiters[key] -= 1
+        if self._waiters[key] <= 0 and not task.done():
+            # 아무도 기다리지 않는 판단은 LLM 비용만 쓰므로 취소 (새 요청은 새로 실행)
+            task.cancel()
+            del self._in_flight[key]
+            del self._waiters[key]
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+            del self._waiters[key]
+        # 기다리는 요청이 없어 결과를 꺼내지 않은 예외는 조용히 소비
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._in_flight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "cancellations": self.cancellations,
+        }
+
+
+single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    global single_flight
+    return single_flight
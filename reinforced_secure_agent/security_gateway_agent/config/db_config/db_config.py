@@ -1,9 +1,9 @@
 import os
 from dotenv import load_dotenv
 from langchain_qdrant import QdrantVectorStore
-from sentence_transformers import SentenceTransformer
-from langchain_huggingface import HuggingFaceEmbeddings
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, AsyncQdrantClient
+
+from config.models.model_registry import get_model_registry, EMBEDDINGS
 
 # ENV 설정 및 Qdrant 연결
 dotenv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env')
@@ -12,25 +12,33 @@ load_dotenv(dotenv_path)
 # Qdrant 서버 연결
 qdrant = QdrantClient(host="localhost", port=6333)
 
+# 요청 처리 경로(async middleware)에서 사용하는 비동기 client
+async_qdrant = AsyncQdrantClient(host="localhost", port=6333)
 
-# SentenceTransformer 모델 직접 로드
-model = SentenceTransformer('all-MiniLM-L6-v2')
-
-embeddings = HuggingFaceEmbeddings(
-    model_name="all-MiniLM-L6-v2",  # 여기에 모델 이름 직접
-    model_kwargs={"device": "cpu"}  # or "cuda" 가능
-)
+# few-shot 예시가 저장된 collection
+CACHING_COLLECTION = "caching"
 
 
-# LangChain Qdrant VectorStore 생성
-caching_store = QdrantVectorStore(
-    client=qdrant,
-    collection_name="caching",
-    embedding=embeddings
-)
+# embedding model은 process 전체에서 공유하는 model registry가 처음 사용할 때 한 번만 로드
+# LangChain Qdrant VectorStore도 embedding model이 필요하므로 처음 사용할 때 생성
+caching_store = None
 
 
 def get_caching_store():
     global caching_store
+    if caching_store is None:
+        caching_store = QdrantVectorStore(
+            client=qdrant,
+            collection_name=CACHING_COLLECTION,
+            embedding=get_embeddings()
+        )
     return caching_store
 
+
+def get_async_qdrant():
+    global async_qdrant
+    return async_qdrant
+
+
+def get_embeddings():
+    return get_model_registry().get(EMBEDDINGS)
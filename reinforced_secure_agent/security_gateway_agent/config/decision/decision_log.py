@@ -0,0 +1,297 @@
+import contextvars
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config.metrics.metrics import get_metrics_registry
+from config.lock.file_lock import file_lock
+
+# 판정 기록(decision log) 설정 (.env 또는 환경변수로 조정 가능)
+DECISION_LOG_ENABLED = os.getenv("DECISION_LOG_ENABLED", "true").lower() == "true"
+DECISION_LOG_DIR = os.getenv("DECISION_LOG_DIR", os.path.join("logs", "decisions"))
+DECISION_LOG_QUEUE_SIZE = int(os.getenv("DECISION_LOG_QUEUE_SIZE", "10000"))
+DECISION_LOG_BATCH = int(os.getenv("DECISION_LOG_BATCH", "256"))
+DECISION_LOG_FLUSH_MS = float(os.getenv("DECISION_LOG_FLUSH_MS", "200"))
+DECISION_LOG_FSYNC_SECONDS = float(os.getenv("DECISION_LOG_FSYNC_SECONDS", "1"))
+DECISION_LOG_SEGMENT_BYTES = int(os.getenv("DECISION_LOG_SEGMENT_BYTES", str(16 * 1024 * 1024)))
+DECISION_LOG_MAX_SEGMENTS = int(os.getenv("DECISION_LOG_MAX_SEGMENTS", "16"))
+# true이면 LLM이 판단한 요청의 직렬화된 context도 기록 (local 분류 model 학습 데이터, 요청 값이 disk에 남으므로 기본 off)
+DECISION_LOG_CONTEXT = os.getenv("DECISION_LOG_CONTEXT", "false").lower() == "true"
+
+SEGMENT_SUFFIX = ".log"
+# 여러 worker process가 같은 디렉터리에 기록할 때 write / rotate를 직렬화하는 lock 파일
+LOCK_FILE = ".lock"
+FINGERPRINT_CHARS = 16
+# context를 기록하는 tier (사후 검사는 "audit_" 접두어)
+CONTEXT_TIERS = ("first_tier", "review")
+
+metrics = get_metrics_registry()
+decision_log_results = metrics.counter("gateway_decision_log_total", "판정 기록 처리 결과", ["result"])
+decision_log_write_seconds = metrics.histogram("gateway_decision_log_write_seconds", "판정 기록 batch write 시간")
+
+# 요청 하나의 판단 과정 (어느 tier가 판단했는지, LLM token 사용량)
+# middleware에서 만든 dict를 single-flight / admission Task가 context로 물려받아 같은 dict에 기록한다
+_decision_trace: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("decision_trace",
+                                                                                          default=None)
+
+
+def start_decision_trace() -> Dict[str, Any]:
+    trace = {"tier": None, "tokens": 0}
+    _decision_trace.set(trace)
+    return trace
+
+
+def set_decision_tier(tier: str) -> None:
+    trace = _decision_trace.get()
+    if trace is not None:
+        trace["tier"] = tier
+
+
+def add_decision_tokens(tokens: int) -> None:
+    trace = _decision_trace.get()
+    if trace is not None and tokens:
+        trace["tokens"] += tokens
+
+
+def token_usage(message) -> int:
+    # LangChain AIMessage의 usage_metadata (없으면 response_metadata의 token_usage)
+    usage = getattr(message, "usage_metadata", None) or {}
+    if usage.get("total_tokens"):
+        return int(usage["total_tokens"])
+    token_usage_metadata = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    return int(token_usage_metadata.get("total_tokens") or 0)
+
+
+def segment_name(base_offset: int) -> str:
+    return f"{base_offset:020d}{SEGMENT_SUFFIX}"
+
+
+def list_segments(directory: str) -> List[int]:
+    # segment 파일 이름은 첫 byte의 전체 offset (20자리) 이므로 이름 순서 = offset 순서
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(name[:-len(SEGMENT_SUFFIX)]) for name in os.listdir(directory)
+                  if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit())
+
+
+class DecisionLogWriter:
+    """
+    Gateway 판정을 append-only segment 파일에 JSON 한 줄씩 기록하는 write-behind writer.
+
+    - record()는 크기가 제한된 queue에 넣기만 한다 (요청 처리 경로에서 disk I/O 없음, 가득 차면 버리고 count)
+    - background thread가 DECISION_LOG_BATCH개 또는 DECISION_LOG_FLUSH_MS마다 한 번에 write,
+      fsync는 DECISION_LOG_FSYNC_SECONDS마다 한 번
+    - segment가 DECISION_LOG_SEGMENT_BYTES를 넘으면 새 segment로 넘어가고, 오래된 segment는
+      DECISION_LOG_MAX_SEGMENTS개만 남긴다
+    - offset은 전체 log의 byte 위치이며, segment 파일 이름이 그 segment 첫 줄의 offset (reader가 offset으로 이어 읽기)
+    - uvicorn worker 여러 개가 같은 디렉터리에 쓰므로 batch write / rotate는 file lock 안에서 수행하고,
+      매번 최신 segment와 실제 파일 크기(fstat)를 다시 확인한다 (segment 이름이 항상 실제 offset과 일치)
+    """
+
+    def __init__(self, directory: str = DECISION_LOG_DIR, queue_size: int = DECISION_LOG_QUEUE_SIZE,
+                 batch_size: int = DECISION_LOG_BATCH, flush_ms: float = DECISION_LOG_FLUSH_MS,
+                 fsync_seconds: float = DECISION_LOG_FSYNC_SECONDS, segment_bytes: int = DECISION_LOG_SEGMENT_BYTES,
+                 max_segments: int = DECISION_LOG_MAX_SEGMENTS, enabled: bool = DECISION_LOG_ENABLED):
+        self.directory = directory
+        self.enabled = enabled
+        self._lock_path = os.path.join(directory, LOCK_FILE)
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_ms / 1000.0
+        self._fsync_seconds = fsync_seconds
+        self._segment_bytes = segment_bytes
+        self._max_segments = max(1, max_segments)
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._segment_base = 0
+        self._segment_size = 0
+        self._last_fsync = 0.0
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def offset(self) -> int:
+        return self._segment_base + self._segment_size
+
+    def record(self, entry: Dict[str, Any]) -> bool:
+        if not self.enabled or self._thread is None:
+            return False
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            decision_log_results.inc(result="dropped")
+            return False
+        return True
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        try:
+            self._open_latest_segment()
+        except OSError as e:
+            print(f"decision log를 열 수 없어 기록하지 않습니다 ({self.directory}): {e}")
+            return
+        self._thread = threading.Thread(target=self._run, name="decision-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        # queue가 가득 차 있어도 종료 신호는 반드시 전달
+        while True:
+            try:
+                self._queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                if not self._thread.is_alive():
+                    break
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _open_latest_segment(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with file_lock(self._lock_path):
+            self._sync_segment()
+            if self._segment_size:
+                self._truncate_partial_line(os.path.join(self.directory, segment_name(self._segment_base)))
+
+    def _sync_segment(self) -> None:
+        # file lock 안에서만 호출: 다른 worker가 rotate 했다면 최신 segment로 옮기고, 크기는 실제 파일 기준
+        segments = list_segments(self.directory)
+        latest = segments[-1] if segments else 0
+        if self._file is None or latest != self._segment_base:
+            self._close()
+            self._segment_base = latest
+            self._file = open(os.path.join(self.directory, segment_name(latest)), "ab")
+        self._segment_size = os.fstat(self._file.fileno()).st_size
+
+    def _truncate_partial_line(self, path: str) -> None:
+        # 비정상 종료로 마지막 줄이 잘렸다면 그 줄을 지운다 (reader가 항상 완전한 줄만 보도록)
+        # (write는 file lock 안에서만 하므로 lock을 잡은 상태에서 잘린 줄은 죽은 process가 남긴 것)
+        with open(path, "rb") as f:
+            f.seek(max(0, self._segment_size - 65536))
+            tail = f.read()
+        if tail.endswith(b"\n"):
+            return
+        cut = tail.rfind(b"\n")
+        size = self._segment_size - len(tail) + cut + 1 if cut >= 0 else max(0, self._segment_size - len(tail))
+        self._file.truncate(size)
+        self._file.seek(size)
+        self._segment_size = size
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            try:
+                entry = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                self._maybe_fsync()
+                continue
+            # 첫 항목부터 flush 주기 동안(또는 batch가 찰 때까지) 모아서 한 번에 write
+            batch: List[Dict[str, Any]] = []
+            deadline = time.monotonic() + self._flush_interval
+            while entry is not None:
+                batch.append(entry)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self._batch_size or remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if entry is None:
+                running = False
+            if batch:
+                self._write(batch)
+            self._maybe_fsync(force=not running)
+        self._close()
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        start = time.perf_counter()
+        data = "".join(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+                       for entry in batch).encode("utf-8")
+        try:
+            with file_lock(self._lock_path):
+                self._sync_segment()
+                if self._segment_size and self._segment_size + len(data) > self._segment_bytes:
+                    self._rotate()
+                self._file.write(data)
+                self._file.flush()
+                self._segment_size += len(data)
+            self.written += len(batch)
+            decision_log_results.inc(len(batch), result="written")
+        except OSError as e:
+            print(f"decision log 기록 실패: {e}")
+            decision_log_results.inc(len(batch), result="failed")
+        finally:
+            decision_log_write_seconds.observe(time.perf_counter() - start)
+
+    def _maybe_fsync(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if self._file is None or (not force and now - self._last_fsync < self._fsync_seconds):
+            return
+        try:
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            print(f"decision log fsync 실패: {e}")
+        self._last_fsync = now
+
+    def _rotate(self) -> None:
+        self._close()
+        self._segment_base += self._segment_size
+        self._segment_size = 0
+        self._file = open(os.path.join(self.directory, segment_name(self._segment_base)), "ab")
+
+        segments = list_segments(self.directory)
+        for base in segments[:max(0, len(segments) - self._max_segments)]:
+            try:
+                os.remove(os.path.join(self.directory, segment_name(base)))
+            except OSError as e:
+                print(f"오래된 decision log segment 삭제 실패: {e}")
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._maybe_fsync(force=True)
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"queued": self._queue.qsize(), "written": self.written, "dropped": self.dropped,
+                "offset": self.offset}
+
+
+def build_decision_entry(client: str, method: str, path: str, tier: str, verdict: str, latency_seconds: float,
+                         tokens: int = 0, fingerprint: Optional[str] = None,
+                         context: Optional[str] = None) -> Dict[str, Any]:
+    """
+    decision log 한 줄 (key를 짧게 유지):
+        ts(epoch 초), fp(요청 fingerprint 앞 16자), client, method, path, tier(판단한 단계), verdict, ms(판단까지 걸린 시간), tokens
+        ctx(LLM이 판단한 요청의 직렬화된 context, DECISION_LOG_CONTEXT=true일 때만)
+    """
+    entry: Dict[str, Any] = {
+        "ts": round(time.time(), 3),
+        "client": client,
+        "method": method,
+        "path": path,
+        "tier": tier,
+        "verdict": verdict,
+        "ms": round(latency_seconds * 1000, 2),
+        "tokens": tokens,
+    }
+    if fingerprint:
+        entry["fp"] = fingerprint[:FINGERPRINT_CHARS]
+    if context and DECISION_LOG_CONTEXT and tier.split("audit_", 1)[-1] in CONTEXT_TIERS:
+        entry["ctx"] = context
+    return entry
+
+
+decision_log_writer = DecisionLogWriter()
+
+
+def get_decision_log_writer() -> DecisionLogWriter:
+    global decision_log_writer
+    return decision_log_writer
@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.db_config.db_config import get_embeddings
+from config.metrics.metrics import get_metrics_registry
+
+# embedding 설정 (.env 또는 환경변수로 조정 가능)
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "2"))
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+EMBEDDING_BATCH_MAX = int(os.getenv("EMBEDDING_BATCH_MAX", "32"))
+
+metrics = get_metrics_registry()
+batch_size_histogram = metrics.histogram("gateway_embedding_batch_size", "한 번에 encode한 문장 수",
+                                         buckets=(1, 2, 4, 8, 16, 32, 64, 128))
+wait_seconds_histogram = metrics.histogram("gateway_embedding_wait_seconds", "embedding 요청부터 결과까지 걸린 시간")
+encode_seconds_histogram = metrics.histogram("gateway_embedding_encode_seconds", "batch encode 시간")
+cache_requests = metrics.counter("gateway_embedding_cache_total", "embedding cache 조회 결과", ["result"])
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# content hash 기준 LRU embedding cache (vector byte 크기로 메모리 제한)
+class EmbeddingCache:
+
+    def __init__(self, max_bytes: int = EMBEDDING_CACHE_MAX_BYTES):
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+            return vector
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key).nbytes
+            self._entries[key] = vector
+            self._bytes += vector.nbytes
+            while self._entries and self._bytes > self._max_bytes:
+                _, oldest = self._entries.popitem(last=False)
+                self._bytes -= oldest.nbytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class EmbeddingService:
+    """
+    HuggingFaceEmbeddings 앞단의 embedding service.
+
+    - 같은 내용은 content hash LRU cache에서 바로 반환
+    - 동시에 들어온 요청은 EMBEDDING_BATCH_WINDOW_MS 동안 모아서(또는 EMBEDDING_BATCH_MAX개가 차면)
+      한 번의 batch encode로 처리하고, encode는 크기가 제한된 thread pool에서 실행
+    """
+
+    def __init__(self, embeddings=None, max_workers: int = EMBEDDING_WORKERS,
+                 window_ms: float = EMBEDDING_BATCH_WINDOW_MS, max_batch: int = EMBEDDING_BATCH_MAX):
+        # None이면 처음 encode할 때 model registry에서 가져온다 (import 시점에 model을 로드하지 않음)
+        self._embeddings = embeddings
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embedding")
+        self._window = window_ms / 1000.0
+        self._max_batch = max_batch
+        self._cache = EmbeddingCache()
+
+        # 아직 encode되지 않은 요청: hash -> (text, 결과 future, 최초 요청 시각)
+        self._pending: Dict[str, Tuple[str, asyncio.Future, float]] = {}
+        # pending 또는 encode 중인 hash의 결과 future (같은 내용은 한 번만 encode)
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    async def embed(self, text: str) -> np.ndarray:
+        key = content_hash(text)
+        vector = self._cache.get(key)
+        if vector is not None:
+            cache_requests.inc(result="hit")
+            return vector
+        cache_requests.inc(result="miss")
+
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            self._pending[key] = (text, future, time.perf_counter())
+
+            if len(self._pending) >= self._max_batch:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self._window, self._flush)
+
+        # 한 요청이 취소되어도 같은 내용을 기다리는 다른 요청에는 영향이 없도록 shield
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        asyncio.ensure_future(self._encode_batch(batch))
+
+    async def _encode_batch(self, batch: Dict[str, Tuple[str, asyncio.Future, float]]) -> None:
+        keys = list(batch.keys())
+        texts = [batch[key][0] for key in keys]
+        batch_size_histogram.observe(len(texts))
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            vectors = await loop.run_in_executor(self._executor, self._encode, texts)
+        except Exception as e:
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+                    # 기다리는 요청이 없어도 "exception was never retrieved" 경고가 나지 않도록
+                    future.exception()
+            return
+        finally:
+            encode_seconds_histogram.observe(time.perf_counter() - start)
+
+        now = time.perf_counter()
+        for key, row in zip(keys, vectors):
+            # batch 배열과 분리된 읽기 전용 vector로 저장 (cache 메모리 계산이 정확하도록)
+            vector = np.array(row, dtype=np.float32, copy=True)
+            vector.setflags(write=False)
+            self._cache.put(key, vector)
+            wait_seconds_histogram.observe(now - batch[key][2])
+            future = self._futures.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(vector)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        # 하나의 NumPy batch로 encode (float32, 행 단위 vector)
+        if self._embeddings is None:
+            self._embeddings = get_embeddings()
+        return np.asarray(self._embeddings.embed_documents(texts), dtype=np.float32)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+embedding_service: Optional[EmbeddingService] = None
+
+
+def get_embedding_service() -> EmbeddingService:
+    global embedding_service
+    if embedding_service is None:
+        embedding_service = EmbeddingService()
+    return embedding_service
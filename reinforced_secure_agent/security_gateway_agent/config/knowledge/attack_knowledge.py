@@ -0,0 +1,148 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# 공격 기법 지식 문서 위치 (.env 또는 환경변수로 조정 가능, 디렉터리 안의 .json / .md / .txt 파일을 모두 읽는다)
+KNOWLEDGE_DIR = os.getenv("KNOWLEDGE_DIR", os.path.join(os.path.dirname(__file__), "documents"))
+KNOWLEDGE_TOP_K = int(os.getenv("KNOWLEDGE_TOP_K", "3"))
+KNOWLEDGE_SNIPPET_CHARS = int(os.getenv("KNOWLEDGE_SNIPPET_CHARS", "600"))
+
+# BM25 parameter
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# 영문/숫자 단어, 한글 단어, 그리고 공격 payload에서 의미가 있는 기호를 token으로 사용
+TOKEN_PATTERN = re.compile(r"[a-z0-9_]+|[가-힣]+|[<>'\"();|&$%{}\\/*=#@!`]")
+# 한글 단어 끝의 조사는 떼어서 색인 (예: "인코딩된" -> "인코딩", "공격을" -> "공격")
+KOREAN_SUFFIXES = ("으로", "에서", "에게", "하는", "되는", "된", "을", "를", "이", "가", "은", "는", "의", "에", "로", "와", "과", "도")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if "가" <= token[0] <= "힣" and len(token) > 2:
+            for suffix in KOREAN_SUFFIXES:
+                if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+                    token = token[:-len(suffix)]
+                    break
+        tokens.append(token)
+    return tokens
+
+
+class KnowledgeDocument:
+
+    __slots__ = ("doc_id", "title", "tags", "content", "length")
+
+    def __init__(self, doc_id: str, title: str, tags: List[str], content: str):
+        self.doc_id = doc_id
+        self.title = title
+        self.tags = tags
+        self.content = content
+        self.length = 0
+
+
+def load_documents(directory: str) -> List[KnowledgeDocument]:
+    """
+    - .json: [{"id", "title", "tags", "content"}, ...] 형식의 문서 목록
+    - .md / .txt: 파일 하나가 문서 하나 (첫 줄이 제목)
+    """
+    documents: List[KnowledgeDocument] = []
+    if not os.path.isdir(directory):
+        print(f"공격 지식 디렉터리가 없습니다: {directory}")
+        return documents
+
+    for file_name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, file_name)
+        try:
+            if file_name.endswith(".json"):
+                with open(path, encoding="utf-8") as f:
+                    for index, item in enumerate(json.load(f)):
+                        documents.append(KnowledgeDocument(
+                            str(item.get("id", f"{file_name}:{index}")),
+                            item.get("title", ""),
+                            list(item.get("tags", [])),
+                            item.get("content", "")
+                        ))
+            elif file_name.endswith((".md", ".txt")):
+                with open(path, encoding="utf-8") as f:
+                    text = f.read()
+                title, _, content = text.partition("\n")
+                documents.append(KnowledgeDocument(file_name, title.lstrip("# ").strip(), [], content.strip()))
+        except (OSError, ValueError) as e:
+            print(f"공격 지식 파일 읽기 실패 ({file_name}): {e}")
+    return documents
+
+
+class AttackKnowledgeIndex:
+    """
+    공격 기법 / 인코딩 / payload 유형 문서를 위한 in-memory inverted index (BM25 ranking).
+    외부 검색 없이 local 파일만 사용하므로 air-gapped 환경에서도 동작하고, 검색은 ms 단위로 끝납니다.
+    """
+
+    def __init__(self, documents: List[KnowledgeDocument]):
+        self.documents = documents
+        # term -> [(문서 index, term frequency)]
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._idf: Dict[str, float] = {}
+        self._average_length = 0.0
+        self._build()
+
+    def _build(self) -> None:
+        total_length = 0
+        for index, document in enumerate(self.documents):
+            # 제목 / tag는 본문보다 중요하므로 두 번 색인
+            text = " ".join([document.title, document.title, " ".join(document.tags * 2), document.content])
+            term_counts = Counter(tokenize(text))
+            document.length = sum(term_counts.values())
+            total_length += document.length
+            for term, count in term_counts.items():
+                self._postings.setdefault(term, []).append((index, count))
+
+        count = len(self.documents)
+        self._average_length = total_length / count if count else 0.0
+        for term, postings in self._postings.items():
+            df = len(postings)
+            self._idf[term] = math.log(1 + (count - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = KNOWLEDGE_TOP_K) -> List[Tuple[KnowledgeDocument, float]]:
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            for index, tf in postings:
+                length_norm = 1 - BM25_B + BM25_B * self.documents[index].length / self._average_length
+                scores[index] = scores.get(index, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.documents[index], score) for index, score in ranked]
+
+
+def format_results(results: List[Tuple[KnowledgeDocument, float]]) -> str:
+    if not results:
+        return "관련 공격 지식을 찾지 못했습니다. 요청 내용과 few-shot 예시만으로 판단하세요."
+    formatted = []
+    for document, score in results:
+        content = document.content
+        if len(content) > KNOWLEDGE_SNIPPET_CHARS:
+            content = content[:KNOWLEDGE_SNIPPET_CHARS] + "…"
+        tags = f" [{', '.join(document.tags)}]" if document.tags else ""
+        formatted.append(f"## {document.title}{tags} (score {score:.2f})\n{content}")
+    return "\n\n".join(formatted)
+
+
+attack_knowledge_index: Optional[AttackKnowledgeIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_attack_knowledge_index() -> AttackKnowledgeIndex:
+    global attack_knowledge_index
+    with _index_lock:
+        if attack_knowledge_index is None:
+            attack_knowledge_index = AttackKnowledgeIndex(load_documents(KNOWLEDGE_DIR))
+            print(f"공격 지식 index 생성 완료 ({len(attack_knowledge_index.documents)}건)")
+    return attack_knowledge_index
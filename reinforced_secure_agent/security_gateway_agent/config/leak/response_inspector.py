@@ -0,0 +1,286 @@
+import os
+import re
+import time
+import zlib
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from config.metrics.metrics import get_metrics_registry
+
+# upstream 응답 정보 유출 검사 설정 (.env 또는 환경변수로 조정 가능)
+RESPONSE_INSPECT_ENABLED = os.getenv("RESPONSE_INSPECT_ENABLED", "false").lower() == "true"
+# log: 기록만 하고 그대로 전달 / truncate: 유출을 찾은 chunk부터 전달하지 않고 응답을 끊는다
+RESPONSE_INSPECT_ACTION = os.getenv("RESPONSE_INSPECT_ACTION", "log").lower()
+# 이 유형의 유출을 일으킨 client IP는 Black List에 추가 (빈 값이면 추가하지 않음)
+# sql_error, pii는 정상 client도 일으킬 수 있으므로 기본은 secret만 차단하고 나머지는 기록만 한다
+RESPONSE_INSPECT_BLACKLIST = [category.strip() for category in os.getenv(
+    "RESPONSE_INSPECT_BLACKLIST", "secret").split(",") if category.strip()]
+# 응답 하나에서 검사하는 최대 byte (압축 해제 기준, 넘으면 나머지는 검사 없이 전달)
+RESPONSE_INSPECT_MAX_BYTES = int(os.getenv("RESPONSE_INSPECT_MAX_BYTES", str(256 * 1024)))
+# 응답 하나에서 개인정보 pattern이 이만큼 나오면 대량 유출(pii)로 판단
+RESPONSE_INSPECT_PII_THRESHOLD = int(os.getenv("RESPONSE_INSPECT_PII_THRESHOLD", "20"))
+# 검사하는 Content-Type (접두어, Content-Type이 없는 응답도 검사)
+RESPONSE_INSPECT_CONTENT_TYPES = tuple(content_type.strip().lower() for content_type in os.getenv(
+    "RESPONSE_INSPECT_CONTENT_TYPES",
+    "text/,application/json,application/xml,application/javascript,application/problem+json,"
+    "application/x-www-form-urlencoded"
+).split(",") if content_type.strip())
+
+# chunk 경계에 걸친 pattern을 찾기 위해 다음 chunk와 이어서 검사하는 byte 수 (가장 긴 pattern보다 길어야 한다)
+SCAN_OVERLAP = 512
+
+
+class LeakRule(NamedTuple):
+    category: str
+    anchors: Tuple[bytes, ...]    # 소문자(숫자는 0) literal: 먼저 bytes.find로 찾고, 찾은 위치 주변만 regex로 확인
+    pattern: "re.Pattern[bytes]"
+    back: int                     # match 시작부터 anchor까지의 최대 거리
+    length: int                   # match의 최대 길이 (anchor 주변에서 regex로 확인하는 범위)
+
+
+def _rule(category: str, anchors: Tuple[bytes, ...], pattern: bytes, back: int = 0, length: int = SCAN_OVERLAP,
+          ignore_case: bool = True) -> LeakRule:
+    return LeakRule(category, anchors, re.compile(pattern, re.IGNORECASE if ignore_case else 0), back, length)
+
+
+# 유형별 rule (모든 반복은 길이 제한이 있어 match가 SCAN_OVERLAP 안에 들어간다)
+# regex 전체를 매 byte마다 시도하면 수 MB/s밖에 나오지 않으므로, 드물게 나오는 literal을 먼저 찾는다
+LEAK_RULES: List[LeakRule] = [
+    _rule("stack_trace", (b"traceback (most recent call last)",), rb"Traceback \(most recent call last\)"),
+    _rule("stack_trace", (b'exception in thread "',), rb'Exception in thread "[^"\r\n]{1,100}"'),
+    _rule("stack_trace", (b".java:", b".kt:", b".scala:"),
+          rb"\bat [\w$.]{1,200}\([\w$]{1,100}\.(?:java|kt|scala):\d{1,6}\)", 310),
+    _rule("stack_trace", (b" on line ",), rb"(?:Fatal error|Parse error|Warning): .{1,200} on line \d{1,6}", 220),
+    _rule("stack_trace", (b":line ",), rb"\bat [\w.<>`]{1,150}\(.{0,150}\) in [^\r\n]{1,150}:line \d{1,6}", 460),
+    _rule("stack_trace", (b"    at ",), rb"\n\s{2,8}at (?:async )?[\w$.<>]{1,200} \([^\s()]{1,200}:\d{1,6}:\d{1,6}\)", 9),
+    _rule("sql_error", (b"you have an error in your sql syntax",), rb"you have an error in your sql syntax"),
+    _rule("sql_error", (b"unclosed quotation mark after the character string",),
+          rb"unclosed quotation mark after the character string"),
+    _rule("sql_error", (b'syntax error at or near "',), rb'syntax error at or near "'),
+    _rule("sql_error", (b".operationalerror",), rb"sqlite3?\.OperationalError", 7),
+    _rule("sql_error", (b"sqlstate[",), rb"SQLSTATE\[\w{1,10}\]"),
+    _rule("sql_error", (b"ora-",), rb"(?<![A-Za-z0-9])ORA-\d{5}(?!\d)", ignore_case=False),
+    _rule("sql_error", (b"pg::",), rb"PG::\w{1,40}Error", ignore_case=False),
+    _rule("sql_error", (b"ole db provider for sql server",), rb"Microsoft OLE DB Provider for SQL Server", 10),
+    _rule("sql_error", (b"org.hibernate.exception.",), rb"org\.hibernate\.exception\.\w{1,60}Exception"),
+    _rule("secret", (b"private key-----",), rb"-----BEGIN (?:RSA |EC |DSA |OPENSSH |ENCRYPTED )?PRIVATE KEY-----", 26,
+          ignore_case=False),
+    _rule("secret", (b"akia", b"asia"), rb"(?<![A-Za-z0-9])(?:AKIA|ASIA)[0-9A-Z]{16}(?![A-Za-z0-9])", ignore_case=False),
+    _rule("secret", (b"gh",), rb"gh[pousr]_[A-Za-z0-9]{36}(?![A-Za-z0-9])", ignore_case=False),
+    _rule("secret", (b"xox",), rb"xox[abprs]-[A-Za-z0-9-]{10,100}", ignore_case=False),
+    _rule("secret", (b"sk_live_",), rb"sk_live_[0-9A-Za-z]{24,99}", ignore_case=False),
+    _rule("secret", (b"aws_secret_access_key",),
+          rb"aws_secret_access_key[\"']?\s{0,4}[:=]\s{0,4}[\"']?[A-Za-z0-9/+=]{40}"),
+    _rule("pii", (b"@",), rb"[\w.+-]{1,64}@[A-Za-z0-9-]{1,63}(?:\.[A-Za-z0-9-]{1,63}){1,4}", 64, 320),  # email
+    # 숫자 pattern은 숫자 자리 모양으로 찾고, UUID / 날짜 일부가 걸리지 않도록 앞뒤가 문자 / 숫자 / "-"가 아니어야 한다
+    _rule("pii", (b"000000-0000000",), rb"(?<![\w-])\d{6}-[1-4]\d{6}(?![\w-])", 0, 14),                # 주민등록번호
+    _rule("pii", (b"0000-0000-0000-0000",), rb"(?<![\w-])\d{4}-\d{4}-\d{4}-\d{4}(?![\w-])", 0, 19),  # 카드 번호
+    _rule("pii", (b"000-000-0000", b"000-0000-0000"), rb"(?<![\w-])01[016789]-\d{3,4}-\d{4}(?![\w-])", 0, 13),  # 휴대전화 번호
+]
+# 한 번만 나와도 유출로 보는 유형 (pii는 RESPONSE_INSPECT_PII_THRESHOLD 이상일 때만)
+COUNTED_CATEGORIES = {"pii"}
+# anchor 검색용: 대문자 -> 소문자, 숫자 -> "0" (한 번의 translate로 처리)
+ANCHOR_TABLE = bytes.maketrans(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ123456789", b"abcdefghijklmnopqrstuvwxyz000000000")
+
+metrics = get_metrics_registry()
+leak_findings = metrics.counter("gateway_response_leak_total", "응답 정보 유출 탐지 수", ["category", "action"])
+inspect_results = metrics.counter("gateway_response_inspect_total", "응답 검사 결과", ["result"])
+chunk_scan_seconds = metrics.histogram("gateway_response_scan_seconds", "응답 chunk 하나의 검사 시간",
+                                       buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01))
+
+
+class StreamScanner:
+    """
+    응답 body를 chunk 단위로 받아 유출 pattern을 찾는 incremental scanner.
+
+    - 이전 chunk의 마지막 SCAN_OVERLAP byte(carry)를 다음 chunk 앞에 붙여서 검사하므로 경계에 걸친 match도 찾는다
+    - rule별로 마지막 match가 끝난 위치(전체 offset)를 기억해서, carry를 다시 검사해도 같은 match를 두 번 세지 않는다
+    - 보관하는 것은 carry뿐이므로 chunk 하나의 비용은 O(chunk 크기 + SCAN_OVERLAP)
+    """
+
+    def __init__(self, rules: Optional[List[LeakRule]] = None, overlap: int = SCAN_OVERLAP,
+                 pii_threshold: int = RESPONSE_INSPECT_PII_THRESHOLD):
+        self._rules = LEAK_RULES if rules is None else rules
+        self._overlap = overlap
+        self._pii_threshold = max(1, pii_threshold)
+        # anchor -> 그 anchor를 쓰는 rule 번호
+        self._anchors: Dict[bytes, List[int]] = {}
+        for index, rule in enumerate(self._rules):
+            for anchor in rule.anchors:
+                self._anchors.setdefault(anchor, []).append(index)
+        self._carry = b""
+        self._offset = 0                               # 지금까지 받은 전체 byte 수
+        self._rule_end = [0] * len(self._rules)        # rule별 마지막으로 센 match의 끝 (전체 offset)
+        self.counts: Dict[str, int] = {}
+        self.detected: List[str] = []
+
+    def feed(self, data: bytes) -> List[str]:
+        # 이번 chunk로 새로 탐지된 유형
+        buffer = self._carry + data
+        base = self._offset - len(self._carry)
+        normalized = buffer.translate(ANCHOR_TABLE)
+        found: List[str] = []
+        for anchor, rule_indices in self._anchors.items():
+            position = normalized.find(anchor)
+            while position != -1:
+                for index in rule_indices:
+                    self._match(index, buffer, base, position, len(anchor), found)
+                position = normalized.find(anchor, position + 1)
+        self._carry = buffer[-self._overlap:] if self._overlap else b""
+        self._offset += len(data)
+        return found
+
+    def _match(self, index: int, buffer: bytes, base: int, position: int, anchor_length: int,
+               found: List[str]) -> None:
+        rule = self._rules[index]
+        start = max(0, position - rule.back, self._rule_end[index] - base)
+        if start > position:
+            return
+        for match in rule.pattern.finditer(buffer, start, min(len(buffer), start + rule.back + rule.length)):
+            if match.start() > position:
+                return
+            if match.end() < position + anchor_length:
+                continue
+            # anchor를 포함하는 match만 센다
+            self._rule_end[index] = base + match.end()
+            category = rule.category
+            count = self.counts.get(category, 0) + 1
+            self.counts[category] = count
+            if count == (self._pii_threshold if category in COUNTED_CATEGORIES else 1):
+                self.detected.append(category)
+                found.append(category)
+            return
+
+
+class ResponseLeak(NamedTuple):
+    client_ip: str
+    method: str
+    path: str
+    status_code: int
+    categories: List[str]
+    counts: Dict[str, int]
+    action: str
+    blacklist: bool
+
+
+def _decoder(content_encoding: str):
+    # 압축된 응답은 검사용으로만 압축을 풀고, client에는 원래 byte를 그대로 전달
+    encoding = content_encoding.strip().lower()
+    if encoding in ("", "identity"):
+        return None
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        return zlib.decompressobj(32 + zlib.MAX_WBITS)  # gzip / zlib header 자동 인식
+    raise ValueError(encoding)
+
+
+class ResponseInspector:
+    """
+    upstream 응답 body를 stream 그대로 전달하면서 stack trace / SQL 오류 / secret / 대량 개인정보 유출을 검사합니다.
+
+    - body 전체를 모으지 않고 chunk마다 StreamScanner로 검사 (응답당 RESPONSE_INSPECT_MAX_BYTES까지)
+    - log: 그대로 전달하고 유출만 기록 / truncate: chunk 하나만 늦게 전달하다가 유출을 찾으면 붙잡아 둔 chunk부터 끊는다
+    - 유출을 찾으면 start()로 등록한 handler를 호출 (RESPONSE_INSPECT_BLACKLIST 유형이면 client Black List 추가)
+    """
+
+    def __init__(self, enabled: bool = RESPONSE_INSPECT_ENABLED, action: str = RESPONSE_INSPECT_ACTION,
+                 blacklist_categories: Optional[List[str]] = None, max_bytes: int = RESPONSE_INSPECT_MAX_BYTES,
+                 content_types: tuple = RESPONSE_INSPECT_CONTENT_TYPES):
+        if action not in ("log", "truncate"):
+            print(f"알 수 없는 RESPONSE_INSPECT_ACTION({action}), log로 동작합니다")
+            action = "log"
+        self.enabled = enabled
+        self.action = action
+        self._blacklist_categories = set(RESPONSE_INSPECT_BLACKLIST if blacklist_categories is None
+                                         else blacklist_categories)
+        self._max_bytes = max_bytes
+        self._content_types = content_types
+        self._handler: Optional[Callable[[ResponseLeak], None]] = None
+        self.inspected = 0
+        self.leaks = 0
+        self.truncated = 0
+
+    def start(self, handler: Callable[[ResponseLeak], None]) -> None:
+        self._handler = handler
+
+    def should_inspect(self, headers) -> bool:
+        if not self.enabled:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return not content_type or content_type.startswith(self._content_types)
+
+    async def inspect(self, stream: AsyncIterator[bytes], headers, status_code: int, client_ip: str,
+                      method: str, path: str) -> AsyncIterator[bytes]:
+        try:
+            decoder = _decoder(headers.get("content-encoding", ""))
+        except ValueError:
+            # br 등 풀 수 없는 압축은 검사하지 않고 그대로 전달
+            inspect_results.inc(result="skipped")
+            async for chunk in stream:
+                yield chunk
+            return
+
+        self.inspected += 1
+        scanner = StreamScanner()
+        remaining = self._max_bytes
+        pending: Optional[bytes] = None  # truncate 모드에서 검사가 끝날 때까지 붙잡아 두는 이전 chunk
+
+        async for chunk in stream:
+            found: List[str] = []
+            if remaining > 0 and chunk:
+                start = time.perf_counter()
+                try:
+                    data = decoder.decompress(chunk, remaining) if decoder is not None else chunk[:remaining]
+                except zlib.error:
+                    data, remaining, decoder = b"", 0, None
+                    inspect_results.inc(result="decode_error")
+                remaining -= len(data)
+                found = scanner.feed(data)
+                chunk_scan_seconds.observe(time.perf_counter() - start)
+
+            if found:
+                self._report(scanner, found, status_code, client_ip, method, path)
+                if self.action == "truncate":
+                    # 이미 보낸 header는 되돌릴 수 없으므로 body를 여기서 끊는다 (붙잡아 둔 chunk도 보내지 않음)
+                    self.truncated += 1
+                    inspect_results.inc(result="truncated")
+                    return
+
+            if self.action == "truncate" and remaining > 0:
+                # match는 완성되는 chunk에서 탐지되므로, 이전 chunk 하나를 붙잡아 두면 경계에 걸친 match도 보내지 않는다
+                if pending is not None:
+                    yield pending
+                pending = chunk
+            else:
+                if pending is not None:
+                    yield pending
+                    pending = None
+                yield chunk
+
+        if pending is not None:
+            yield pending
+        inspect_results.inc(result="leak" if scanner.detected else "clean")
+
+    def _report(self, scanner: StreamScanner, categories: List[str], status_code: int, client_ip: str,
+                method: str, path: str) -> None:
+        self.leaks += 1
+        for category in categories:
+            leak_findings.inc(category=category, action=self.action)
+        leak = ResponseLeak(client_ip, method, path, status_code, categories, dict(scanner.counts), self.action,
+                            any(category in self._blacklist_categories for category in categories))
+        print(f"응답 정보 유출 탐지: {client_ip} {method} {path} {categories}")
+        if self._handler is not None:
+            try:
+                self._handler(leak)
+            except Exception as e:
+                print(f"응답 유출 handler 실패: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {"enabled": int(self.enabled), "inspected": self.inspected, "leaks": self.leaks,
+                "truncated": self.truncated}
+
+
+response_inspector = ResponseInspector()
+
+
+def get_response_inspector() -> ResponseInspector:
+    global response_inspector
+    return response_inspector
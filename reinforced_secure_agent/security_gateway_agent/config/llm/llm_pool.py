@@ -0,0 +1,329 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_openai import AzureChatOpenAI
+from pydantic import Field, PrivateAttr
+
+from config.metrics.metrics import get_metrics_registry
+
+# LLM deployment pool 설정 (.env 또는 환경변수로 조정 가능)
+# 예: LLM_DEPLOYMENTS=gpt-4o-a,gpt-4o-b|https://eastus2.openai.azure.com|AZURE_OPENAI_API_KEY_EASTUS2|300000
+#     (deployment|endpoint|API key 환경변수 이름|분당 token quota, endpoint 이후는 생략 가능)
+# 비어 있으면 DEPLOYMENT_NAME / AZURE_OPENAI_API_ENDPOINT / AZURE_OPENAI_API_KEY 하나만 사용
+LLM_DEPLOYMENTS = os.getenv("LLM_DEPLOYMENTS", "")
+LLM_API_VERSION = os.getenv("LLM_API_VERSION", "2024-02-15-preview")
+LLM_POOL_EWMA_ALPHA = float(os.getenv("LLM_POOL_EWMA_ALPHA", "0.3"))            # 지연 EWMA에서 최근 호출의 비중
+LLM_POOL_INITIAL_LATENCY = float(os.getenv("LLM_POOL_INITIAL_LATENCY", "1.0"))  # 지연을 아는 deployment가 없을 때의 추정 지연
+LLM_POOL_MAX_ATTEMPTS = int(os.getenv("LLM_POOL_MAX_ATTEMPTS", "3"))            # 한 호출에서 시도할 deployment 수
+# 남은 token이 이보다 적으면 quota가 다시 찰 때까지 후순위 (Azure quota는 분 단위)
+LLM_POOL_MIN_REMAINING_TOKENS = int(os.getenv("LLM_POOL_MIN_REMAINING_TOKENS", "2000"))
+LLM_POOL_QUOTA_WINDOW = float(os.getenv("LLM_POOL_QUOTA_WINDOW", "60"))
+LLM_POOL_RATE_LIMIT_COOLDOWN = float(os.getenv("LLM_POOL_RATE_LIMIT_COOLDOWN", "10"))  # 429에 retry-after가 없을 때
+
+# Passive health check: 연속 실패 횟수가 넘으면 일정 시간 동안 제외
+LLM_POOL_MAX_FAILURES = int(os.getenv("LLM_POOL_MAX_FAILURES", "3"))
+LLM_POOL_COOLDOWN = float(os.getenv("LLM_POOL_COOLDOWN", "30"))
+
+metrics = get_metrics_registry()
+pool_calls = metrics.counter("gateway_llm_pool_calls_total", "LLM pool에서 deployment별 호출 결과",
+                             ["deployment", "result"])
+pool_failovers = metrics.counter("gateway_llm_pool_failovers_total", "다른 deployment로 다시 시도한 호출 수",
+                                 ["deployment"])
+
+
+class LLMDeployment:
+
+    def __init__(self, name: str, client: BaseChatModel, token_quota: int = 0):
+        self.name = name
+        self.client = client
+        self.token_quota = token_quota
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.down_until = 0.0
+        # 마지막 응답의 x-ratelimit-* header (quota_at 이후 LLM_POOL_QUOTA_WINDOW가 지나면 다시 찼다고 본다)
+        self.remaining_tokens: Optional[int] = None
+        self.remaining_requests: Optional[int] = None
+        self.limit_tokens: Optional[int] = token_quota or None
+        self.quota_at = 0.0
+
+    def is_healthy(self, now: float) -> bool:
+        return self.down_until <= now
+
+    def has_quota(self, now: float) -> bool:
+        if now - self.quota_at > LLM_POOL_QUOTA_WINDOW:
+            return True
+        if self.remaining_requests is not None and self.remaining_requests <= 0:
+            return False
+        return self.remaining_tokens is None or self.remaining_tokens >= LLM_POOL_MIN_REMAINING_TOKENS
+
+    def headroom(self, now: float) -> float:
+        # 남은 token 비율 (모르면 1)
+        if now - self.quota_at > LLM_POOL_QUOTA_WINDOW or self.remaining_tokens is None or not self.limit_tokens:
+            return 1.0
+        return min(1.0, max(0.05, self.remaining_tokens / self.limit_tokens))
+
+    def score(self, now: float, default_latency: float) -> float:
+        # 작을수록 우선: 예상 지연 x (처리 중인 호출 + 1) / 남은 quota 비율
+        latency = self.latency if self.latency is not None else default_latency
+        return latency * (self.in_flight + 1) / self.headroom(now)
+
+    def observe_latency(self, elapsed: float) -> None:
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency += LLM_POOL_EWMA_ALPHA * (elapsed - self.latency)
+
+    def observe_headers(self, headers: Mapping[str, Any]) -> None:
+        values = {str(k).lower(): v for k, v in headers.items()}
+        remaining_tokens = _header_int(values, "x-ratelimit-remaining-tokens")
+        remaining_requests = _header_int(values, "x-ratelimit-remaining-requests")
+        if remaining_tokens is None and remaining_requests is None:
+            return
+        self.remaining_tokens = remaining_tokens
+        self.remaining_requests = remaining_requests
+        self.limit_tokens = _header_int(values, "x-ratelimit-limit-tokens") or self.token_quota or None
+        self.quota_at = time.monotonic()
+
+    def mark_success(self, elapsed: float) -> None:
+        self.observe_latency(elapsed)
+        self.failures = 0
+        self.down_until = 0.0
+
+    def mark_failure(self, elapsed: float) -> None:
+        # timeout / 5xx는 걸린 시간도 지연에 반영해서 복구 후에도 바로 몰리지 않도록 한다
+        self.observe_latency(elapsed)
+        self.failures += 1
+        if self.failures >= LLM_POOL_MAX_FAILURES:
+            print(f"LLM deployment {self.name} 제외 ({LLM_POOL_COOLDOWN}초)")
+            self.down_until = time.monotonic() + LLM_POOL_COOLDOWN
+
+    def mark_rate_limited(self, retry_after: Optional[float]) -> None:
+        cooldown = retry_after if retry_after is not None else LLM_POOL_RATE_LIMIT_COOLDOWN
+        print(f"LLM deployment {self.name} quota 초과 ({cooldown}초 제외)")
+        self.down_until = max(self.down_until, time.monotonic() + cooldown)
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "latency_ewma": round(self.latency, 3) if self.latency is not None else 0.0,
+            "failures": self.failures,
+            "healthy": self.is_healthy(now),
+            "has_quota": self.has_quota(now),
+            "remaining_tokens": self.remaining_tokens if self.remaining_tokens is not None else -1,
+        }
+
+
+def _header_int(headers: Mapping[str, Any], name: str) -> Optional[int]:
+    try:
+        return int(float(headers[name]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _error_status(error: Exception) -> Tuple[Optional[int], Optional[float]]:
+    # openai SDK 예외의 HTTP status와 retry-after (초)
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after = None
+    try:
+        if "retry-after-ms" in headers:
+            retry_after = float(headers["retry-after-ms"]) / 1000.0
+        elif "retry-after" in headers:
+            retry_after = float(headers["retry-after"])
+    except (TypeError, ValueError):
+        retry_after = None
+    return status, retry_after
+
+
+class LLMPool(BaseChatModel):
+    """
+    여러 Azure OpenAI deployment(각자 quota를 가진)를 하나의 chat model처럼 쓰는 pool.
+
+    - 호출마다 정상이고 quota가 남은 deployment 중 (지연 EWMA x 처리 중인 호출 수 / 남은 token 비율)이 가장 작은 곳으로 보낸다
+    - 남은 token / 요청 수는 응답의 x-ratelimit-remaining-* header로 갱신하고, 429면 retry-after 동안 제외
+    - timeout / 연결 오류 / 5xx / 429는 다음 deployment로 최대 LLM_POOL_MAX_ATTEMPTS번까지 다시 시도 (그 외 4xx는 그대로 전달)
+    - LLM_POOL_MAX_FAILURES번 연속 실패한 deployment는 LLM_POOL_COOLDOWN 동안 제외
+      (pool 전체의 장애 판단은 호출자 쪽 circuit breaker가 deployment_name 기준으로 담당)
+    - bind_tools는 첫 deployment의 형식으로 tool을 변환해서 모든 deployment에 같은 인자로 전달 (create_react_agent 용)
+    """
+
+    deployments: List[Any] = Field(default_factory=list)
+    deployment_name: str = "default"
+    max_attempts: int = LLM_POOL_MAX_ATTEMPTS
+    # 동기 호출(invoke)은 여러 thread에서 올 수 있으므로 선택 / 상태 갱신은 lock 안에서
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        if not self.deployments:
+            raise ValueError("LLM_DEPLOYMENTS가 비어 있습니다.")
+
+    @property
+    def _llm_type(self) -> str:
+        return "llm-pool"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"deployments": [deployment.name for deployment in self.deployments]}
+
+    def bind_tools(self, tools, **kwargs: Any):
+        bound = self.deployments[0].client.bind_tools(tools, **kwargs)
+        return self.bind(**bound.kwargs)
+
+    def choose(self, exclude: List[LLMDeployment]) -> Optional[LLMDeployment]:
+        now = time.monotonic()
+        others = [d for d in self.deployments if d not in exclude]
+        if not others:
+            return None
+        candidates = [d for d in others if d.is_healthy(now) and d.has_quota(now)] \
+            or [d for d in others if d.is_healthy(now)]
+        if not candidates:
+            # 모두 제외 중이면 가장 먼저 복구될 deployment로 시도
+            return min(others, key=lambda d: d.down_until)
+        # 아직 호출하지 않은 deployment는 가장 빠른 deployment만큼 빠르다고 보고 한 번은 시도되도록
+        known = [d.latency for d in candidates if d.latency is not None]
+        default_latency = min(known) if known else LLM_POOL_INITIAL_LATENCY
+        return min(candidates, key=lambda d: d.score(now, default_latency))
+
+    def _begin(self, exclude: List[LLMDeployment]) -> Optional[LLMDeployment]:
+        with self._lock:
+            deployment = self.choose(exclude)
+            if deployment is not None:
+                deployment.in_flight += 1
+            return deployment
+
+    def _success(self, deployment: LLMDeployment, start: float, result: ChatResult) -> ChatResult:
+        with self._lock:
+            deployment.in_flight -= 1
+            deployment.mark_success(time.perf_counter() - start)
+            for generation in result.generations:
+                # header는 routing에만 쓰고 message metadata에는 남기지 않는다
+                headers = (generation.generation_info or {}).pop("headers", None)
+                if headers:
+                    deployment.observe_headers(headers)
+        pool_calls.inc(deployment=deployment.name, result="success")
+        return result
+
+    def _failure(self, deployment: LLMDeployment, start: float, error: BaseException) -> bool:
+        # True면 다른 deployment로 다시 시도
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            deployment.in_flight -= 1
+            if isinstance(error, asyncio.CancelledError):
+                # 호출자 timeout 등으로 취소: 실패로 세지는 않고 지연만 반영
+                deployment.observe_latency(elapsed)
+                pool_calls.inc(deployment=deployment.name, result="cancelled")
+                return False
+            status, retry_after = _error_status(error)
+            if status == 429:
+                deployment.mark_rate_limited(retry_after)
+                pool_calls.inc(deployment=deployment.name, result="rate_limited")
+                return True
+            if status is not None and 400 <= status < 500:
+                # 요청 자체의 문제 (content filter, context 길이 등)는 다른 deployment에서도 같다
+                pool_calls.inc(deployment=deployment.name, result="client_error")
+                return False
+            deployment.mark_failure(elapsed)
+        pool_calls.inc(deployment=deployment.name, result="error")
+        print(f"LLM deployment {deployment.name} 호출 실패: {error!r}")
+        return True
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        tried: List[LLMDeployment] = []
+        while True:
+            deployment = self._begin(tried)
+            if tried:
+                pool_failovers.inc(deployment=deployment.name)
+            tried.append(deployment)
+            start = time.perf_counter()
+            try:
+                result = deployment.client._generate(messages, stop=stop, **kwargs)
+            except (Exception, asyncio.CancelledError) as e:
+                if not self._failure(deployment, start, e) or len(tried) >= self._attempts():
+                    raise
+                continue
+            return self._success(deployment, start, result)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        tried: List[LLMDeployment] = []
+        while True:
+            deployment = self._begin(tried)
+            if tried:
+                pool_failovers.inc(deployment=deployment.name)
+            tried.append(deployment)
+            start = time.perf_counter()
+            try:
+                result = await deployment.client._agenerate(messages, stop=stop, **kwargs)
+            except (Exception, asyncio.CancelledError) as e:
+                if not self._failure(deployment, start, e) or len(tried) >= self._attempts():
+                    raise
+                continue
+            return self._success(deployment, start, result)
+
+    def _attempts(self) -> int:
+        return max(1, min(self.max_attempts, len(self.deployments)))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        return {deployment.name: deployment.stats(now) for deployment in self.deployments}
+
+
+def parse_deployments(spec: str) -> List[Tuple[str, Optional[str], Optional[str], int]]:
+    # "deployment|endpoint|API key 환경변수|token quota" 목록 (endpoint 이후는 생략 가능)
+    deployments = []
+    for item in spec.split(","):
+        parts = [part.strip() for part in item.split("|")]
+        if not parts[0]:
+            continue
+        parts += [""] * (4 - len(parts))
+        name, endpoint, key_env, quota = parts[:4]
+        deployments.append((name, endpoint or None, key_env or None, int(quota) if quota else 0))
+    return deployments
+
+
+llm_pools: List[LLMPool] = []
+
+
+def build_llm_pool(spec: str = LLM_DEPLOYMENTS, **client_kwargs: Any) -> LLMPool:
+    """
+    LLM_DEPLOYMENTS의 deployment마다 AzureChatOpenAI를 만들고 pool로 묶는다.
+    client_kwargs(timeout, max_retries 등)는 모든 deployment에 그대로 전달된다.
+    """
+    default_key = os.getenv("AZURE_OPENAI_API_KEY")
+    default_endpoint = os.getenv("AZURE_OPENAI_API_ENDPOINT")
+    entries = parse_deployments(spec) or [(os.getenv("DEPLOYMENT_NAME"), None, None, 0)]
+
+    deployments = []
+    for name, endpoint, key_env, quota in entries:
+        client = AzureChatOpenAI(
+            openai_api_key=os.getenv(key_env) if key_env else default_key,
+            azure_endpoint=endpoint or default_endpoint,
+            deployment_name=name,
+            openai_api_version=LLM_API_VERSION,
+            # routing에 x-ratelimit-remaining-* header를 사용
+            include_response_headers=True,
+            **client_kwargs
+        )
+        label = name if not endpoint else f"{name}@{endpoint.split('//')[-1].split('.')[0]}"
+        deployments.append(LLMDeployment(label or "default", client, quota))
+
+    pool = LLMPool(deployments=deployments, deployment_name=",".join(d.name for d in deployments))
+    llm_pools.append(pool)
+    print(f"LLM pool: {pool.deployment_name}")
+    return pool
+
+
+def get_llm_pools() -> List[LLMPool]:
+    global llm_pools
+    return llm_pools
@@ -0,0 +1,148 @@
+import ipaddress
+from typing import List, Optional, Tuple, Union
+
+# Node: (0 방향 child, 1 방향 child, 이 node에서 끝나는 prefix 문자열 또는 None)
+# tuple이라 수정이 불가능하고, add / remove는 바뀌는 경로의 node만 새로 만든다 (path copying).
+Node = Tuple[Optional["Node"], Optional["Node"], Optional[str]]
+
+EMPTY_NODE: Node = (None, None, None)
+
+
+def parse_network(address: str) -> Union[ipaddress.IPv4Network, ipaddress.IPv6Network]:
+    # "10.0.0.1", "10.0.0.0/8", "2001:db8::/32" 모두 허용 (단일 주소는 /32, /128)
+    network = ipaddress.ip_network(address.strip(), strict=False)
+    if isinstance(network, ipaddress.IPv6Network) and network.network_address.ipv4_mapped and network.prefixlen >= 96:
+        mapped = network.network_address.ipv4_mapped
+        network = ipaddress.ip_network(f"{mapped}/{network.prefixlen - 96}", strict=False)
+    return network
+
+
+def parse_address(address: str) -> Union[ipaddress.IPv4Address, ipaddress.IPv6Address]:
+    ip = ipaddress.ip_address(address.strip())
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        return ip.ipv4_mapped
+    return ip
+
+
+def _insert(node: Optional[Node], bits: int, max_len: int, prefix_len: int, depth: int, value: str) -> Node:
+    node = node or EMPTY_NODE
+    if depth == prefix_len:
+        return node[0], node[1], value
+    bit = (bits >> (max_len - 1 - depth)) & 1
+    child = _insert(node[bit], bits, max_len, prefix_len, depth + 1, value)
+    return (child, node[1], node[2]) if bit == 0 else (node[0], child, node[2])
+
+
+def _delete(node: Optional[Node], bits: int, max_len: int, prefix_len: int, depth: int) -> Tuple[Optional[Node], bool]:
+    if node is None:
+        return None, False
+    if depth == prefix_len:
+        if node[2] is None:
+            return node, False
+        new_node = (node[0], node[1], None)
+    else:
+        bit = (bits >> (max_len - 1 - depth)) & 1
+        child, removed = _delete(node[bit], bits, max_len, prefix_len, depth + 1)
+        if not removed:
+            return node, False
+        new_node = (child, node[1], node[2]) if bit == 0 else (node[0], child, node[2])
+    # 빈 가지는 정리해서 메모리를 돌려준다
+    if new_node == EMPTY_NODE:
+        return None, True
+    return new_node, True
+
+
+def _collect(node: Optional[Node], result: List[str]) -> None:
+    if node is None:
+        return
+    if node[2] is not None:
+        result.append(node[2])
+    _collect(node[0], result)
+    _collect(node[1], result)
+
+
+class IpTrie:
+    """
+    IPv4 / IPv6 주소와 CIDR prefix를 저장하는 불변(immutable) binary radix trie.
+    조회는 prefix 길이(최대 32 / 128)에 비례하고, add / remove는 새 IpTrie를 반환하는 copy-on-write 방식입니다.
+    기존 snapshot을 들고 있는 조회는 변경 중에도 항상 완성된 trie만 보게 됩니다.
+    """
+
+    __slots__ = ("_root4", "_root6", "_size")
+
+    def __init__(self, root4: Optional[Node] = None, root6: Optional[Node] = None, size: int = 0):
+        self._root4 = root4
+        self._root6 = root6
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, address: str) -> "IpTrie":
+        network = parse_network(address)
+        value = str(network) if network.prefixlen != network.max_prefixlen else str(network.network_address)
+        if self.contains_exact(value):
+            return self
+        bits = int(network.network_address)
+        if network.version == 4:
+            root4 = _insert(self._root4, bits, 32, network.prefixlen, 0, value)
+            return IpTrie(root4, self._root6, self._size + 1)
+        root6 = _insert(self._root6, bits, 128, network.prefixlen, 0, value)
+        return IpTrie(self._root4, root6, self._size + 1)
+
+    def remove(self, address: str) -> "IpTrie":
+        network = parse_network(address)
+        bits = int(network.network_address)
+        if network.version == 4:
+            root4, removed = _delete(self._root4, bits, 32, network.prefixlen, 0)
+            return IpTrie(root4, self._root6, self._size - 1) if removed else self
+        root6, removed = _delete(self._root6, bits, 128, network.prefixlen, 0)
+        return IpTrie(self._root4, root6, self._size - 1) if removed else self
+
+    def longest_prefix(self, address: str) -> Optional[str]:
+        # address를 포함하는 가장 긴 prefix (없으면 None)
+        try:
+            ip = parse_address(address)
+        except ValueError:
+            return None
+        node, max_len = (self._root4, 32) if ip.version == 4 else (self._root6, 128)
+        bits = int(ip)
+        best = None
+        depth = 0
+        while node is not None:
+            if node[2] is not None:
+                best = node[2]
+            if depth == max_len:
+                break
+            node = node[(bits >> (max_len - 1 - depth)) & 1]
+            depth += 1
+        return best
+
+    def __contains__(self, address: str) -> bool:
+        return self.longest_prefix(address) is not None
+
+    def contains_exact(self, address: str) -> bool:
+        network = parse_network(address)
+        node, max_len = (self._root4, 32) if network.version == 4 else (self._root6, 128)
+        bits = int(network.network_address)
+        for depth in range(network.prefixlen):
+            if node is None:
+                return False
+            node = node[(bits >> (max_len - 1 - depth)) & 1]
+        return node is not None and node[2] is not None
+
+    def entries(self) -> List[str]:
+        result: List[str] = []
+        _collect(self._root4, result)
+        _collect(self._root6, result)
+        return result
+
+
+def apply_ip_list(trie: IpTrie, ip_address_list: List[str], remove: bool = False) -> IpTrie:
+    # 목록 전체를 적용한 새 snapshot 반환 (잘못된 형식은 건너뜀)
+    for ip_address in ip_address_list:
+        try:
+            trie = trie.remove(ip_address) if remove else trie.add(ip_address)
+        except ValueError:
+            print(f"{ip_address} 는 올바른 IP / CIDR 형식이 아니므로 무시합니다")
+    return trie
@@ -0,0 +1,227 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from domain.entity.entity import IPListModel
+from config.memory.ip_trie import IpTrie, apply_ip_list
+from config.lock.file_lock import file_lock
+
+# 공유 ACL 파일 설정 (.env 또는 환경변수로 조정 가능)
+ACL_SHARED_PATH = os.getenv("ACL_SHARED_PATH", os.path.join(tempfile.gettempdir(), "secure_gateway_acl.mmap"))
+ACL_SHARED_SLOT_SIZE = int(os.getenv("ACL_SHARED_SLOT_SIZE", str(8 * 1024 * 1024)))
+ACL_SHARED_POLL_INTERVAL = float(os.getenv("ACL_SHARED_POLL_INTERVAL", "0.5"))
+# seq가 홀수(교체 중)인 상태가 이보다 오래 가면 읽기를 포기 (writer가 쓰는 도중 죽은 경우)
+ACL_SHARED_READ_TIMEOUT = float(os.getenv("ACL_SHARED_READ_TIMEOUT", "1.0"))
+
+# 파일 구조: [header 64 byte][slot 0][slot 1]
+# header: magic(8) | seq(u64, 쓰는 중에는 홀수) | active slot(u32) | slot 0 길이(u32) | slot 1 길이(u32)
+MAGIC = b"SGACL001"
+HEADER_FORMAT = "<8sQIII"
+HEADER_SIZE = 64
+SEQ_OFFSET = 8
+
+
+class SharedAclStore:
+    """
+    같은 host의 gateway worker들이 공유하는 memory-mapped ACL 저장소.
+
+    - 변경은 비활성 slot에 전체 snapshot을 쓴 뒤 header의 active slot을 바꾸는 방식 (atomic snapshot swap)
+    - header는 seqlock(version counter)으로 보호되어 reader는 lock 없이 일관된 snapshot만 읽는다
+    - 각 worker는 background thread에서 version 변화를 감지해 IpTrie를 다시 만들고, 요청 처리 중에는
+      이미 만들어진 snapshot 참조만 읽는다
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            print("\nShared ACL Memory is generated")
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, path: str = ACL_SHARED_PATH, slot_size: int = ACL_SHARED_SLOT_SIZE):
+        cls = type(self)
+        if hasattr(cls, "_init"):
+            return
+
+        self._path = path
+        self._lock_path = path + ".lock"
+        self._slot_size = slot_size
+        self._local_lock = threading.Lock()
+        self._mmap = self._open()
+
+        self._seq = -1
+        self._snapshots: Dict[str, IpTrie] = {"whitelist": IpTrie(), "blacklist": IpTrie()}
+        self.refresh()
+
+        threading.Thread(target=self._poll, name="shared-acl-poll", daemon=True).start()
+        print(f"Shared ACL Memory is initialized ({path})\n")
+        cls._init = True
+
+    def _open(self) -> mmap.mmap:
+        total_size = HEADER_SIZE + 2 * self._slot_size
+        with file_lock(self._lock_path):
+            fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if os.fstat(fd).st_size != total_size:
+                    os.ftruncate(fd, total_size)
+                mm = mmap.mmap(fd, total_size)
+            finally:
+                os.close(fd)
+            magic, _, _, _, _ = struct.unpack_from(HEADER_FORMAT, mm, 0)
+            if magic != MAGIC:
+                struct.pack_into(HEADER_FORMAT, mm, 0, MAGIC, 0, 0, 0, 0)
+                mm.flush()
+            else:
+                self._repair_seq(mm)
+        return mm
+
+    @staticmethod
+    def _repair_seq(mm: mmap.mmap) -> None:
+        # file lock을 잡은 상태에서만 호출: 이때 seq가 홀수라면 쓰던 writer가 죽은 것
+        # (payload는 비활성 slot에 먼저 쓰고 header만 바꾸므로 active slot은 항상 완성된 snapshot)
+        seq = struct.unpack_from("<Q", mm, SEQ_OFFSET)[0]
+        if seq % 2:
+            print(f"Shared ACL seq {seq} 복구 (이전 writer가 쓰는 도중 종료)")
+            struct.pack_into("<Q", mm, SEQ_OFFSET, seq + 1)
+            mm.flush()
+
+    def version(self) -> int:
+        return struct.unpack_from("<Q", self._mmap, SEQ_OFFSET)[0]
+
+    def _read_consistent(self) -> Tuple[int, bytes]:
+        # seqlock read: 읽기 전후 seq가 같고 짝수일 때만 유효
+        deadline = time.monotonic() + ACL_SHARED_READ_TIMEOUT
+        while True:
+            seq_before = self.version()
+            if seq_before % 2:
+                if time.monotonic() > deadline:
+                    # 다음 writer(update / reset)가 file lock을 잡고 seq를 복구한다
+                    raise TimeoutError(f"Shared ACL seq {seq_before}가 교체 중 상태로 남아 있습니다.")
+                time.sleep(0)
+                continue
+            _, _, active, len0, len1 = struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+            length = len0 if active == 0 else len1
+            offset = HEADER_SIZE + active * self._slot_size
+            payload = self._mmap[offset:offset + length]
+            if self.version() == seq_before:
+                return seq_before, payload
+
+    def refresh(self) -> None:
+        if self.version() == self._seq:
+            return
+        seq, payload = self._read_consistent()
+        data = json.loads(payload.decode("utf-8")) if payload else {}
+        snapshots = {name: apply_ip_list(IpTrie(), data.get(name, [])) for name in ("whitelist", "blacklist")}
+        with self._local_lock:
+            if seq > self._seq:
+                self._snapshots = snapshots
+                self._seq = seq
+
+    def _poll(self) -> None:
+        while True:
+            time.sleep(ACL_SHARED_POLL_INTERVAL)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Shared ACL refresh 실패: {e}")
+
+    def _write(self, snapshots: Dict[str, IpTrie]) -> int:
+        payload = json.dumps({name: trie.entries() for name, trie in snapshots.items()},
+                             separators=(",", ":")).encode("utf-8")
+        if len(payload) > self._slot_size:
+            raise ValueError(f"ACL snapshot 크기({len(payload)} byte)가 ACL_SHARED_SLOT_SIZE를 초과합니다.")
+
+        _, seq, active, len0, len1 = struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+        target = 1 - active
+        offset = HEADER_SIZE + target * self._slot_size
+        self._mmap[offset:offset + len(payload)] = payload
+
+        lengths = [len0, len1]
+        lengths[target] = len(payload)
+        struct.pack_into("<Q", self._mmap, SEQ_OFFSET, seq + 1)  # 홀수: 교체 중
+        struct.pack_into("<III", self._mmap, SEQ_OFFSET + 8, target, lengths[0], lengths[1])
+        struct.pack_into("<Q", self._mmap, SEQ_OFFSET, seq + 2)
+        self._mmap.flush()
+        return seq + 2
+
+    def _publish(self, snapshots: Dict[str, IpTrie]) -> None:
+        # 직접 쓴 worker는 다시 parse하지 않고 만든 snapshot을 바로 사용
+        seq = self._write(snapshots)
+        with self._local_lock:
+            self._snapshots = snapshots
+            self._seq = seq
+
+    def update(self, name: str, ip_address_list: List[str], remove: bool = False) -> None:
+        with file_lock(self._lock_path):
+            # 다른 worker가 먼저 바꾼 내용 위에 적용
+            self._repair_seq(self._mmap)
+            self.refresh()
+            snapshots = dict(self._snapshots)
+            snapshots[name] = apply_ip_list(snapshots[name], ip_address_list, remove=remove)
+            self._publish(snapshots)
+
+    def reset(self, name: str) -> None:
+        with file_lock(self._lock_path):
+            self._repair_seq(self._mmap)
+            self.refresh()
+            snapshots = dict(self._snapshots)
+            snapshots[name] = IpTrie()
+            self._publish(snapshots)
+
+    def snapshot(self, name: str) -> IpTrie:
+        return self._snapshots[name]
+
+
+# WhiteList / Blacklist와 같은 interface를 가진 공유 backend
+class SharedWhiteList:
+
+    def __init__(self):
+        self._store = SharedAclStore()
+
+    def reset_whitelist(self) -> None:
+        self._store.reset("whitelist")
+
+    def get_whitelist(self) -> List[str]:
+        return self._store.snapshot("whitelist").entries()
+
+    def get_snapshot(self) -> IpTrie:
+        return self._store.snapshot("whitelist")
+
+    def is_whitelisted(self, ip_address: str) -> bool:
+        return ip_address in self._store.snapshot("whitelist")
+
+    def add_whitelist(self, ip_list_model: IPListModel) -> None:
+        self._store.update("whitelist", ip_list_model.ipList)
+
+    def remove_whitelist(self, ip_list_model: IPListModel) -> None:
+        self._store.update("whitelist", ip_list_model.ipList, remove=True)
+
+
+class SharedBlacklist:
+
+    def __init__(self):
+        self._store = SharedAclStore()
+
+    def reset_blacklist(self) -> None:
+        self._store.reset("blacklist")
+
+    def get_blacklist(self) -> List[str]:
+        return self._store.snapshot("blacklist").entries()
+
+    def get_snapshot(self) -> IpTrie:
+        return self._store.snapshot("blacklist")
+
+    def is_blacklisted(self, ip_address: str) -> bool:
+        return ip_address in self._store.snapshot("blacklist")
+
+    def add_blacklist(self, ip_list_model: IPListModel) -> None:
+        self._store.update("blacklist", ip_list_model.ipList)
+
+    def remove_blacklist(self, ip_list_model: IPListModel) -> None:
+        self._store.update("blacklist", ip_list_model.ipList, remove=True)
@@ -1,8 +1,11 @@
+import threading
 from typing import List
 from domain.entity.entity import IPListModel
+from config.memory.ip_trie import IpTrie, apply_ip_list
 
 
 # 나중에 이중화 또는 3중화할때는 Redis로 연동하는 계획으로 가자
+# IP 목록은 불변 IpTrie로 관리하고, 변경 시 새 snapshot으로 통째로 교체한다 (조회는 lock 없이 수행)
 class WhiteList:
     _instance = None
 
@@ -16,20 +19,29 @@ class WhiteList:
         cls = type(self)
         if not hasattr(cls, "_init"):
             print("WhiteList Memory is initialized\n")
-            self._whitelist = []
+            self._whitelist = IpTrie()
+            self._lock = threading.Lock()
             cls._init = True
 
     def reset_whitelist(self) -> None:
-        self._whitelist = []
+        self._whitelist = IpTrie()
 
     def get_whitelist(self) -> List[str]:
+        return self._whitelist.entries()
+
+    def get_snapshot(self) -> IpTrie:
         return self._whitelist
 
+    def is_whitelisted(self, ip_address: str) -> bool:
+        return ip_address in self._whitelist
+
     def add_whitelist(self, ip_list_model: IPListModel) -> None:
-        ip_address_list = ip_list_model.ipList
-        ip_address_list.extend(self._whitelist)
-        ip_address_list = list(set(ip_address_list))
-        self._whitelist = ip_address_list
+        with self._lock:
+            self._whitelist = apply_ip_list(self._whitelist, ip_list_model.ipList)
+
+    def remove_whitelist(self, ip_list_model: IPListModel) -> None:
+        with self._lock:
+            self._whitelist = apply_ip_list(self._whitelist, ip_list_model.ipList, remove=True)
 
 
 class Blacklist:
@@ -45,17 +57,26 @@ class Blacklist:
         cls = type(self)
         if not hasattr(cls, "_init"):
             print("Blacklist Memory is initialized\n")
-            self._blacklist = []
+            self._blacklist = IpTrie()
+            self._lock = threading.Lock()
             cls._init = True
 
     def reset_blacklist(self) -> None:
-        self._blacklist = []
+        self._blacklist = IpTrie()
 
     def get_blacklist(self) -> List[str]:
+        return self._blacklist.entries()
+
+    def get_snapshot(self) -> IpTrie:
         return self._blacklist
 
+    def is_blacklisted(self, ip_address: str) -> bool:
+        return ip_address in self._blacklist
+
     def add_blacklist(self, ip_list_model: IPListModel) -> None:
-        ip_address_list = ip_list_model.ipList
-        ip_address_list.extend(self._blacklist)
-        ip_address_list = list(set(ip_address_list))
-        self._blacklist = ip_address_list
+        with self._lock:
+            self._blacklist = apply_ip_list(self._blacklist, ip_list_model.ipList)
+
+    def remove_blacklist(self, ip_list_model: IPListModel) -> None:
+        with self._lock:
+            self._blacklist = apply_ip_list(self._blacklist, ip_list_model.ipList, remove=True)
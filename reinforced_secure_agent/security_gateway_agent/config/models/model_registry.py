@@ -0,0 +1,121 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# model registry 설정 (.env 또는 환경변수로 조정 가능)
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+EMBEDDING_MODEL_DEVICE = os.getenv("EMBEDDING_MODEL_DEVICE", "cpu")  # or "cuda" 가능
+# true이면 startup에서 background로 model을 미리 로드하고 warm-up encode까지 수행 (끝나기 전까지 readiness는 503)
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "true").lower() == "true"
+
+# registry에 등록되는 model 이름
+EMBEDDINGS = "embeddings"
+
+
+class ModelEntry:
+
+    __slots__ = ("name", "loader", "warmup", "model", "lock", "load_seconds", "warmed", "error")
+
+    def __init__(self, name: str, loader: Callable[[], Any], warmup: Optional[Callable[[Any], Any]]):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.model = None
+        self.lock = threading.Lock()
+        self.load_seconds = 0.0
+        self.warmed = False
+        self.error: Optional[str] = None
+
+
+class ModelRegistry:
+    """
+    process 전체에서 공유하는 model registry.
+
+    - model은 처음 get() 할 때 한 번만 로드되고 (model별 lock), 이후에는 모든 호출자가 같은 객체를 사용
+    - preload()는 startup에서 thread로 로드 + warm-up encode를 수행하고, ready()로 완료 여부를 확인
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, ModelEntry] = {}
+        self._lock = threading.Lock()
+        self._preloading = False
+
+    def register(self, name: str, loader: Callable[[], Any], warmup: Optional[Callable[[Any], Any]] = None) -> None:
+        # 같은 이름으로 다시 등록하면 교체 (benchmark stand-in 등)
+        with self._lock:
+            self._entries[name] = ModelEntry(name, loader, warmup)
+
+    def get(self, name: str) -> Any:
+        entry = self._entries[name]
+        if entry.model is not None:
+            return entry.model
+        with entry.lock:
+            if entry.model is None:
+                start = time.perf_counter()
+                try:
+                    entry.model = entry.loader()
+                except Exception as e:
+                    entry.error = str(e)
+                    raise
+                entry.load_seconds = time.perf_counter() - start
+                entry.error = None
+                print(f"model 로드 완료: {name} ({entry.load_seconds:.2f}초)")
+        return entry.model
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.model is not None
+
+    def _load_and_warmup(self, name: str) -> None:
+        model = self.get(name)
+        entry = self._entries[name]
+        if entry.warmup is not None and not entry.warmed:
+            entry.warmup(model)
+        entry.warmed = True
+
+    async def preload(self, names: Optional[List[str]] = None) -> bool:
+        # 로드는 CPU / disk를 쓰므로 thread에서 실행 (event loop를 막지 않음)
+        self._preloading = True
+        try:
+            for name in names or list(self._entries):
+                try:
+                    await asyncio.to_thread(self._load_and_warmup, name)
+                except Exception as e:
+                    self._entries[name].error = str(e)
+                    print(f"model preload 실패 ({name}): {e}")
+        finally:
+            self._preloading = False
+        return self.ready()
+
+    def ready(self) -> bool:
+        return not self._preloading and all(entry.warmed for entry in self._entries.values())
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: {"loaded": entry.model is not None, "warmed": entry.warmed,
+                       "load_seconds": round(entry.load_seconds, 3), "error": entry.error}
+                for name, entry in self._entries.items()}
+
+
+def load_embeddings():
+    # import 자체도 무거우므로 실제로 로드할 때 import
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL_NAME,
+        model_kwargs={"device": EMBEDDING_MODEL_DEVICE}
+    )
+
+
+def warmup_embeddings(embeddings) -> None:
+    # 첫 encode에서 생기는 지연(tokenizer / kernel 초기화)을 요청 처리 전에 미리 치른다
+    embeddings.embed_documents(["GET /warmup HTTP/1.1"])
+
+
+model_registry = ModelRegistry()
+model_registry.register(EMBEDDINGS, load_embeddings, warmup_embeddings)
+
+
+def get_model_registry() -> ModelRegistry:
+    global model_registry
+    return model_registry
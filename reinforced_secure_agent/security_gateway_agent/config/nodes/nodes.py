@@ -1,8 +1,6 @@
 # from langchain.agents import create_tool_calling_agent # 해당 method는 bind_tools를 가져오고 있다. (어차피 AzureOpenAI는 안됨)
 
-from langchain_huggingface import HuggingFaceEmbeddings
 from langgraph.graph import MessagesState
-from sentence_transformers import SentenceTransformer
 
 from config.db_config.db_config import get_caching_store
 
@@ -14,14 +12,6 @@ from config.db_config.db_config import get_caching_store
 # agent를 initialize_agent method로 수동 실행 (llm bind tools 말고)
 # agent_executor.run({"안녕 넌 누구니? 인터넷 검색해서 이태혁이라는 사람을 검색해줄 수 있어?"})
 
-# Embedding 모델 설정 (로컬)
-model = SentenceTransformer('all-MiniLM-L6-v2')
-embeddings = HuggingFaceEmbeddings(
-    model_name="all-MiniLM-L6-v2",
-    model_kwargs={"device": "cpu"}
-)
-
-
 # Vector Store 설정
 def retriever_node():
     return get_caching_store()
@@ -0,0 +1,188 @@
+import itertools
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from starlette.requests import Request
+from starlette.responses import Response, JSONResponse, StreamingResponse
+
+from config.leak.response_inspector import get_response_inspector
+
+# Upstream 설정 (.env 또는 환경변수로 조정 가능)
+# 예: UPSTREAM_URLS=http://10.0.0.1:8080,http://10.0.0.2:8080
+UPSTREAM_URLS = [url.strip().rstrip("/") for url in os.getenv("UPSTREAM_URLS", "http://localhost:8080").split(",")
+                 if url.strip()]
+UPSTREAM_BALANCE = os.getenv("UPSTREAM_BALANCE", "round_robin")  # round_robin | least_connections
+UPSTREAM_POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", "100"))
+UPSTREAM_KEEPALIVE = int(os.getenv("UPSTREAM_KEEPALIVE", "20"))
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "120"))
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "5"))
+
+# Passive health check: 연속 실패 횟수가 넘으면 일정 시간 동안 제외
+UPSTREAM_MAX_FAILURES = int(os.getenv("UPSTREAM_MAX_FAILURES", "3"))
+UPSTREAM_COOLDOWN = float(os.getenv("UPSTREAM_COOLDOWN", "10"))
+
+# 프록시가 그대로 전달하면 안 되는 hop-by-hop Header
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailers",
+    "transfer-encoding", "upgrade",
+}
+# 요청은 httpx가 upstream 기준으로 다시 채우는 Header도 제외
+# x-forwarded-*는 gateway가 다시 만들어 붙이므로 client가 보낸 값은 그대로 넘기지 않는다
+REQUEST_EXCLUDED_HEADERS = HOP_BY_HOP_HEADERS | {"host", "content-length", "x-forwarded-for", "x-forwarded-host"}
+
+
+class Upstream:
+
+    def __init__(self, url: str, pool_size: int = UPSTREAM_POOL_SIZE, keepalive: int = UPSTREAM_KEEPALIVE):
+        self.url = url
+        # Upstream마다 keep-alive connection pool을 따로 유지 (https는 일단 껐습니다 verify)
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(UPSTREAM_TIMEOUT, connect=UPSTREAM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=keepalive),
+            verify=False
+        )
+        self.active = 0
+        self.failures = 0
+        self.down_until = 0.0
+
+    def is_healthy(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+    def mark_success(self) -> None:
+        self.failures = 0
+        self.down_until = 0.0
+
+    def mark_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= UPSTREAM_MAX_FAILURES:
+            print(f"upstream {self.url} 제외 ({UPSTREAM_COOLDOWN}초)")
+            self.down_until = time.monotonic() + UPSTREAM_COOLDOWN
+
+
+class UpstreamPool:
+
+    def __init__(self, urls: List[str] = UPSTREAM_URLS, strategy: str = UPSTREAM_BALANCE):
+        if not urls:
+            raise ValueError("UPSTREAM_URLS가 비어 있습니다.")
+        self.upstreams = [Upstream(url) for url in urls]
+        self.strategy = strategy
+        self._round_robin = itertools.cycle(range(len(self.upstreams)))
+        self._inspector = get_response_inspector()
+
+    def choose(self, exclude: Optional[Upstream] = None) -> Upstream:
+        candidates = [u for u in self.upstreams if u.is_healthy() and u is not exclude]
+        if not candidates:
+            # 모두 비정상이면 가장 먼저 복구될 upstream으로 시도
+            others = [u for u in self.upstreams if u is not exclude] or self.upstreams
+            candidates = [min(others, key=lambda u: u.down_until)]
+
+        if self.strategy == "least_connections":
+            return min(candidates, key=lambda u: u.active)
+
+        for _ in range(len(self.upstreams)):
+            upstream = self.upstreams[next(self._round_robin)]
+            if upstream in candidates:
+                return upstream
+        return candidates[0]
+
+    async def forward(self, request: Request, request_body: bytes) -> Response:
+        """
+        요청을 upstream으로 전달하고, 응답 body를 메모리에 모으지 않고 chunk 단위로 client에 stream 합니다.
+        RESPONSE_INSPECT_ENABLED=true이면 stream 중에 chunk 단위로 정보 유출을 검사합니다.
+        연결 자체가 실패하면(요청이 전달되지 않았으므로) 다른 upstream으로 한 번 재시도합니다.
+        """
+        headers = [(k, v) for k, v in request.headers.raw
+                   if k.decode("latin-1").lower() not in REQUEST_EXCLUDED_HEADERS]
+        # 기존 x-forwarded-for 체인 뒤에 client IP를 붙여 하나의 header로 보낸다
+        forwarded_for = [v for k, v in request.headers.items() if k == "x-forwarded-for"]
+        if request.client is not None:
+            forwarded_for.append(request.client.host)
+        if forwarded_for:
+            headers.append((b"x-forwarded-for", ", ".join(forwarded_for).encode("latin-1")))
+        headers.append((b"x-forwarded-host", request.headers.get("host", "").encode("latin-1")))
+
+        upstream = self.choose()
+        for attempt in range(2):
+            url = upstream.url + request.url.path
+            if request.url.query:
+                url += "?" + request.url.query
+
+            upstream_request = upstream.client.build_request(
+                method=request.method,
+                url=url,
+                headers=headers,
+                content=request_body
+            )
+
+            upstream.active += 1
+            try:
+                proxied_response = await upstream.client.send(upstream_request, stream=True)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                upstream.active -= 1
+                upstream.mark_failure()
+                print(f"upstream {upstream.url} 연결 실패: {e}")
+                if attempt == 0 and len(self.upstreams) > 1:
+                    upstream = self.choose(exclude=upstream)
+                    continue
+                return JSONResponse(content={"detail": "upstream 연결 실패"}, status_code=502)
+            except Exception as e:
+                upstream.active -= 1
+                upstream.mark_failure()
+                print(f"upstream {upstream.url} 요청 실패: {e}")
+                return JSONResponse(content={"detail": "upstream 요청 실패"}, status_code=502)
+
+            if proxied_response.status_code >= 500:
+                upstream.mark_failure()
+            else:
+                upstream.mark_success()
+
+            response_headers = [(k, v) for k, v in proxied_response.headers.raw
+                                if k.decode("latin-1").lower() not in HOP_BY_HOP_HEADERS]
+            body = proxied_response.aiter_raw()
+            if self._inspector.should_inspect(proxied_response.headers):
+                body = self._inspector.inspect(body, proxied_response.headers, proxied_response.status_code,
+                                               request.client.host if request.client is not None else "",
+                                               request.method, request.url.path)
+            response = StreamingResponse(
+                self._stream(body, upstream, proxied_response),
+                status_code=proxied_response.status_code
+            )
+            # StreamingResponse 기본 header 대신 upstream header 그대로 사용
+            response.raw_headers = [(k.lower(), v) for k, v in response_headers]
+            return response
+
+    @staticmethod
+    async def _stream(body: AsyncIterator[bytes], upstream: Upstream,
+                      proxied_response: httpx.Response) -> AsyncIterator[bytes]:
+        # client가 stream 도중 연결을 끊으면 Starlette는 background task를 실행하지 않으므로
+        # 전송이 끝나든 끊기든 여기서 active 수를 돌려주고 upstream 연결을 pool로 반환
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            upstream.active -= 1
+            try:
+                if hasattr(body, "aclose"):
+                    await body.aclose()
+            finally:
+                await proxied_response.aclose()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            upstream.url: {"active": upstream.active, "failures": upstream.failures, "healthy": upstream.is_healthy()}
+            for upstream in self.upstreams
+        }
+
+    async def close(self) -> None:
+        for upstream in self.upstreams:
+            await upstream.client.aclose()
+
+
+upstream_pool = UpstreamPool()
+
+
+def get_upstream_pool() -> UpstreamPool:
+    global upstream_pool
+    return upstream_pool
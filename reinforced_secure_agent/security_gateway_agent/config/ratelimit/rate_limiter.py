@@ -0,0 +1,218 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from config.metrics.metrics import get_metrics_registry
+
+# client별 요청 수 제한 설정 (.env 또는 환경변수로 조정 가능)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+# "요청 수/초" 형식 (기본: 60초에 600회)
+RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "600/60")
+# route별 한도: "[METHOD ]path prefix=요청 수/초"를 쉼표로 구분 (예: "POST /api/login=10/60,/search=120/60")
+RATE_LIMIT_ROUTES = os.getenv("RATE_LIMIT_ROUTES", "")
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+# 이 시간(초) 동안 요청이 없던 client의 counter는 정리
+RATE_LIMIT_IDLE_SECONDS = float(os.getenv("RATE_LIMIT_IDLE_SECONDS", "600"))
+
+metrics = get_metrics_registry()
+rate_limit_results = metrics.counter("gateway_rate_limit_total", "rate limit 검사 결과", ["rule", "result"])
+
+
+class RateLimitRule(NamedTuple):
+    name: str
+    method: Optional[str]  # None이면 모든 method
+    prefix: str
+    limit: int
+    window: float
+
+
+def parse_limit(text: str) -> Tuple[int, float]:
+    count, _, window = text.strip().partition("/")
+    return int(count), float(window or 1)
+
+
+def parse_rules(default: str = RATE_LIMIT_DEFAULT, routes: str = RATE_LIMIT_ROUTES) -> List[RateLimitRule]:
+    """
+    route별 rule은 path prefix가 긴 것부터 검사하고, 어디에도 맞지 않으면 default rule을 적용합니다.
+    """
+    rules: List[RateLimitRule] = []
+    for part in routes.split(","):
+        if not part.strip():
+            continue
+        target, _, limit_text = part.rpartition("=")
+        try:
+            limit, window = parse_limit(limit_text)
+        except ValueError:
+            print(f"잘못된 RATE_LIMIT_ROUTES 항목: {part}")
+            continue
+        method, _, prefix = target.strip().rpartition(" ")
+        rules.append(RateLimitRule(target.strip(), method.upper() or None, prefix, limit, window))
+    rules.sort(key=lambda rule: (len(rule.prefix), rule.method is not None), reverse=True)
+
+    limit, window = parse_limit(default)
+    rules.append(RateLimitRule("default", None, "/", limit, window))
+    return rules
+
+
+class SlidingWindowCounter:
+    """
+    sliding window counter (고정 window 2개로 근사, client당 O(1) 메모리 / 연산).
+
+    직전 window 요청 수를 현재 window에서 지난 비율만큼 줄여서 더한다:
+        estimate = previous * (1 - elapsed / window) + current
+    """
+
+    __slots__ = ("window_start", "current", "previous", "last_seen", "rejected")
+
+    def __init__(self, now: float):
+        self.window_start = now
+        self.current = 0
+        self.previous = 0
+        self.last_seen = now
+        self.rejected = 0
+
+    def estimate(self, now: float, window: float) -> float:
+        elapsed = now - self.window_start
+        if elapsed >= window:
+            # window 경계를 넘었으면 한 칸(또는 그 이상) 이동
+            shift = int(elapsed // window)
+            self.previous = self.current if shift == 1 else 0
+            self.current = 0
+            self.window_start += shift * window
+            elapsed = now - self.window_start
+        return self.previous * (1 - elapsed / window) + self.current
+
+    def retry_after(self, now: float, window: float, limit: int) -> float:
+        # 직전 window 비중이 줄어 한도 아래로 내려가는 시점 (현재 window만으로 넘었으면 다음 window 시작)
+        elapsed = now - self.window_start
+        if self.current >= limit or self.previous <= 0:
+            return max(0.0, window - elapsed)
+        needed = 1 - (limit - 1 - self.current) / self.previous
+        return max(0.0, min(window - elapsed, needed * window - elapsed))
+
+
+class SlidingWindowRateLimiter:
+    """
+    client(IP) x rule 별 sliding window rate limiter.
+
+    - counter는 크기가 제한된 LRU에 보관하고, RATE_LIMIT_IDLE_SECONDS 동안 요청이 없던 client부터 정리
+    - check()는 dict 조회 + 산술 연산만 하므로 LLM 판단 전에 매 요청마다 호출해도 비용이 거의 없다
+    - export()로 현재 상태를 monitoring agent에 제공
+    """
+
+    def __init__(self, rules: Optional[List[RateLimitRule]] = None, max_clients: int = RATE_LIMIT_MAX_CLIENTS,
+                 idle_seconds: float = RATE_LIMIT_IDLE_SECONDS, enabled: bool = RATE_LIMIT_ENABLED):
+        self.rules = rules if rules is not None else parse_rules()
+        self.enabled = enabled
+        self._max_clients = max_clients
+        self._idle_seconds = idle_seconds
+        # (client, rule 이름) -> counter
+        self._counters: "OrderedDict[Tuple[str, str], SlidingWindowCounter]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._allowed = 0
+        self._rejected = 0
+
+    def match_rule(self, method: str, path: str) -> RateLimitRule:
+        for rule in self.rules:
+            if path.startswith(rule.prefix) and (rule.method is None or rule.method == method):
+                return rule
+        return self.rules[-1]
+
+    def _evict(self, now: float) -> None:
+        # 가장 오래 안 보인 counter부터 확인하므로 앞쪽 몇 개만 보면 된다
+        while self._counters:
+            key, counter = next(iter(self._counters.items()))
+            if len(self._counters) <= self._max_clients and now - counter.last_seen < self._idle_seconds:
+                break
+            del self._counters[key]
+
+    def check(self, client: str, method: str, path: str) -> Tuple[bool, float, RateLimitRule]:
+        """
+        요청 하나를 기록하고 (허용 여부, 재시도까지 남은 초, 적용된 rule)을 반환합니다.
+        """
+        rule = self.match_rule(method, path)
+        if not self.enabled or rule.limit <= 0:
+            return True, 0.0, rule
+
+        now = time.monotonic()
+        key = (client, rule.name)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = SlidingWindowCounter(now)
+                self._counters[key] = counter
+                self._evict(now)
+            else:
+                self._counters.move_to_end(key)
+            counter.last_seen = now
+
+            if counter.estimate(now, rule.window) + 1 > rule.limit:
+                counter.rejected += 1
+                self._rejected += 1
+                retry_after = counter.retry_after(now, rule.window, rule.limit)
+                allowed = False
+            else:
+                counter.current += 1
+                self._allowed += 1
+                retry_after = 0.0
+                allowed = True
+
+        rate_limit_results.inc(rule=rule.name, result="allowed" if allowed else "rejected")
+        return allowed, retry_after, rule
+
+    def _client_state(self, now: float, key: Tuple[str, str], counter: SlidingWindowCounter) -> Dict[str, Any]:
+        client, rule_name = key
+        rule = next((rule for rule in self.rules if rule.name == rule_name), self.rules[-1])
+        estimate = counter.estimate(now, rule.window)
+        return {
+            "client": client,
+            "rule": rule_name,
+            "requests": round(estimate, 2),
+            "limit": rule.limit,
+            "window_seconds": rule.window,
+            "rejected": counter.rejected,
+            "limited": estimate + 1 > rule.limit,
+            "idle_seconds": round(now - counter.last_seen, 3),
+        }
+
+    def client_state(self, client: str) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [self._client_state(now, key, counter) for key, counter in self._counters.items()
+                    if key[0] == client]
+
+    def export(self, top: int = 100) -> Dict[str, Any]:
+        """
+        현재 상태 snapshot (요청 수가 많은 client부터 top개).
+        monitoring agent가 access log를 다시 세지 않고 바로 사용할 수 있는 형식입니다.
+        """
+        now = time.monotonic()
+        with self._lock:
+            states = [self._client_state(now, key, counter) for key, counter in self._counters.items()]
+        states.sort(key=lambda state: (state["rejected"], state["requests"] / max(state["limit"], 1)), reverse=True)
+        return {
+            "enabled": self.enabled,
+            "rules": [{"name": rule.name, "method": rule.method, "prefix": rule.prefix,
+                       "limit": rule.limit, "window_seconds": rule.window} for rule in self.rules],
+            "tracked": len(states),
+            "clients": states[:top],
+        }
+
+    def stats(self) -> Dict[str, int]:
+        return {"tracked": len(self._counters), "allowed": self._allowed, "rejected": self._rejected}
+
+
+def retry_after_header(seconds: float) -> str:
+    # Retry-After는 정수 초 (최소 1초)
+    return str(max(1, math.ceil(seconds)))
+
+
+rate_limiter = SlidingWindowRateLimiter()
+
+
+def get_rate_limiter() -> SlidingWindowRateLimiter:
+    global rate_limiter
+    return rate_limiter
@@ -0,0 +1,103 @@
+import os
+import time
+from typing import List, Optional
+
+from qdrant_client.http.models import SearchParams
+
+from config.db_config.db_config import get_async_qdrant, CACHING_COLLECTION
+from config.embedding.embedding_service import get_embedding_service
+from config.retrieval.local_vector_index import get_local_vector_index
+from config.metrics.metrics import get_metrics_registry
+
+# few-shot 검색 설정 (.env 또는 환경변수로 조정 가능)
+FEW_SHOT_K = int(os.getenv("FEW_SHOT_K", "3"))  # 여러 개 받아서 confidence 기반 판단 가능
+# hnsw_ef: 기본 64 ~ 128 / 낮추면 속도↑ 정확도↓
+FEW_SHOT_HNSW_EF = int(os.getenv("FEW_SHOT_HNSW_EF", "64"))
+
+# langchain_qdrant가 문서 본문을 저장하는 payload key
+CONTENT_PAYLOAD_KEY = "page_content"
+
+metrics = get_metrics_registry()
+embed_seconds = metrics.histogram("gateway_fewshot_embed_seconds", "few-shot query embedding 시간")
+search_seconds = metrics.histogram("gateway_fewshot_search_seconds", "few-shot Qdrant 검색 시간")
+retrieval_errors = metrics.counter("gateway_fewshot_errors_total", "few-shot 검색 실패 수", ["stage"])
+
+
+class FewShotRetriever:
+    """
+    review 경로에서 사용하는 비동기 few-shot 검색기. 한 번 만들어서 재사용합니다.
+
+    - CPU를 쓰는 embedding은 EmbeddingService(cache + micro-batch, thread pool)에서 실행 (event loop를 막지 않음)
+    - LOCAL_VECTOR_INDEX=true이면 process 안의 LocalVectorIndex에서 검색하고, index가 아직 비어 있을 때만 Qdrant 사용
+    - Qdrant 검색은 AsyncQdrantClient로 수행 (실패 시 local index가 있으면 그 결과로 대체)
+    """
+
+    def __init__(self, collection_name: str = CACHING_COLLECTION, k: int = FEW_SHOT_K):
+        self._collection_name = collection_name
+        self._k = k
+        self._embedding_service = get_embedding_service()
+        self._qdrant = get_async_qdrant()
+        self._local_index = get_local_vector_index()
+
+    def start(self) -> None:
+        if self._local_index is not None:
+            self._local_index.start()
+
+    async def embed(self, query: str) -> List[float]:
+        start = time.perf_counter()
+        try:
+            vector = await self._embedding_service.embed(query)
+            return vector.tolist()
+        finally:
+            embed_seconds.observe(time.perf_counter() - start)
+
+    async def search(self, vector: List[float], k: Optional[int] = None) -> List[str]:
+        if self._local_index is not None and self._local_index.ready():
+            return self._local_index.search(vector, k or self._k)
+        try:
+            return await self.search_qdrant(vector, k)
+        except Exception:
+            if self._local_index is not None and len(self._local_index):
+                return self._local_index.search(vector, k or self._k)
+            raise
+
+    async def search_qdrant(self, vector: List[float], k: Optional[int] = None) -> List[str]:
+        start = time.perf_counter()
+        try:
+            response = await self._qdrant.query_points(
+                collection_name=self._collection_name,
+                query=vector,
+                limit=k or self._k,
+                with_payload=True,
+                search_params=SearchParams(hnsw_ef=FEW_SHOT_HNSW_EF, exact=False)
+            )
+        finally:
+            search_seconds.observe(time.perf_counter() - start)
+        return [point.payload.get(CONTENT_PAYLOAD_KEY, "") for point in response.points if point.payload]
+
+    async def retrieve(self, query: str, k: Optional[int] = None) -> List[str]:
+        try:
+            vector = await self.embed(query)
+        except Exception:
+            retrieval_errors.inc(stage="embed")
+            raise
+        try:
+            return await self.search(vector, k)
+        except Exception:
+            retrieval_errors.inc(stage="search")
+            raise
+
+    def close(self) -> None:
+        if self._local_index is not None:
+            self._local_index.stop()
+        self._embedding_service.close()
+
+
+few_shot_retriever: Optional[FewShotRetriever] = None
+
+
+def get_few_shot_retriever() -> FewShotRetriever:
+    global few_shot_retriever
+    if few_shot_retriever is None:
+        few_shot_retriever = FewShotRetriever()
+    return few_shot_retriever
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config.db_config.db_config import get_async_qdrant, CACHING_COLLECTION
+from config.metrics.metrics import get_metrics_registry
+
+# local vector index 설정 (.env 또는 환경변수로 조정 가능)
+LOCAL_VECTOR_INDEX = os.getenv("LOCAL_VECTOR_INDEX", "false").lower() == "true"
+LOCAL_VECTOR_INDEX_PATH = os.getenv("LOCAL_VECTOR_INDEX_PATH",
+                                    os.path.join(tempfile.gettempdir(), "secure_gateway_fewshot_index"))
+LOCAL_VECTOR_INDEX_SYNC_INTERVAL = float(os.getenv("LOCAL_VECTOR_INDEX_SYNC_INTERVAL", "60"))
+LOCAL_VECTOR_INDEX_SCROLL_SIZE = int(os.getenv("LOCAL_VECTOR_INDEX_SCROLL_SIZE", "1000"))
+
+# langchain_qdrant가 문서 본문을 저장하는 payload key
+CONTENT_PAYLOAD_KEY = "page_content"
+
+metrics = get_metrics_registry()
+search_seconds = metrics.histogram("gateway_local_index_search_seconds", "local vector index top-k 검색 시간",
+                                   buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01))
+sync_results = metrics.counter("gateway_local_index_sync_total", "local vector index 동기화 결과", ["result"])
+
+# (정규화된 float32 행렬 (n, d), point id 목록, 본문 목록) - 통째로 교체되는 읽기 전용 snapshot
+Snapshot = Tuple[np.ndarray, List[str], List[str]]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    # cosine 유사도를 dot product 한 번으로 계산하기 위해 행 단위 L2 정규화
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+class LocalVectorIndex:
+    """
+    caching collection(clustering 후 수천 건 수준)을 process 안에 들고 있는 few-shot 검색용 index.
+
+    - 연속된 float32 행렬에 정규화된 vector를 저장하고, top-k는 행렬-vector dot product + argpartition으로 계산
+    - Qdrant와는 scroll cursor로 point id 목록만 비교해서, 새로 생긴 point만 vector를 가져오고 삭제된 point는 제거
+    - 행렬은 .npy 파일에 저장하고 시작 시 memory-map으로 열어서 재시작 시 바로 사용
+    - Qdrant 동기화가 실패해도 마지막 snapshot으로 계속 검색
+    """
+
+    def __init__(self, path: str = LOCAL_VECTOR_INDEX_PATH, collection_name: str = CACHING_COLLECTION):
+        self._matrix_path = path + ".npy"
+        self._meta_path = path + ".json"
+        self._collection_name = collection_name
+        self._qdrant = get_async_qdrant()
+        self._snapshot: Optional[Snapshot] = None
+        self._sync_lock = asyncio.Lock()
+        self._sync_task: Optional[asyncio.Task] = None
+        self.last_synced_at: Optional[float] = None
+        self._load()
+
+    def __len__(self) -> int:
+        return 0 if self._snapshot is None else len(self._snapshot[1])
+
+    def ready(self) -> bool:
+        return self._snapshot is not None and len(self._snapshot[1]) > 0
+
+    def search(self, vector, k: int) -> List[str]:
+        snapshot = self._snapshot
+        if snapshot is None or not snapshot[1]:
+            return []
+        matrix, _, contents = snapshot
+        start = time.perf_counter()
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        scores = matrix @ query
+        k = min(k, len(contents))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        search_seconds.observe(time.perf_counter() - start)
+        return [contents[i] for i in top]
+
+    # ---------- 동기화 ----------
+
+    async def _scroll_ids(self) -> List[str]:
+        ids: List[str] = []
+        offset = None
+        while True:
+            points, offset = await self._qdrant.scroll(
+                collection_name=self._collection_name,
+                limit=LOCAL_VECTOR_INDEX_SCROLL_SIZE,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False
+            )
+            ids.extend(str(point.id) for point in points)
+            if offset is None:
+                return ids
+
+    async def _fetch(self, ids: List[str]) -> Tuple[List[str], List[np.ndarray], List[str]]:
+        fetched_ids, vectors, contents = [], [], []
+        for i in range(0, len(ids), LOCAL_VECTOR_INDEX_SCROLL_SIZE):
+            points = await self._qdrant.retrieve(
+                collection_name=self._collection_name,
+                ids=ids[i:i + LOCAL_VECTOR_INDEX_SCROLL_SIZE],
+                with_payload=True,
+                with_vectors=True
+            )
+            for point in points:
+                vector = point.vector
+                if isinstance(vector, dict):  # named vector collection이면 첫 번째 vector 사용
+                    vector = next(iter(vector.values()), None)
+                if vector is None:
+                    continue
+                fetched_ids.append(str(point.id))
+                vectors.append(np.asarray(vector, dtype=np.float32))
+                contents.append((point.payload or {}).get(CONTENT_PAYLOAD_KEY, ""))
+        return fetched_ids, vectors, contents
+
+    async def sync(self) -> bool:
+        # 변경이 있었으면 True
+        async with self._sync_lock:
+            try:
+                remote_ids = await self._scroll_ids()
+                matrix, ids, contents = self._snapshot or (np.zeros((0, 0), dtype=np.float32), [], [])
+                remote_set = set(remote_ids)
+                local_set = set(ids)
+                new_ids = [point_id for point_id in remote_ids if point_id not in local_set]
+                fetched = await self._fetch(new_ids) if new_ids else ([], [], [])
+            except Exception as e:
+                sync_results.inc(result="error")
+                print(f"local vector index 동기화 실패 (기존 index 유지): {e}")
+                return False
+
+            self.last_synced_at = time.time()
+            if not new_ids and remote_set == local_set:
+                sync_results.inc(result="unchanged")
+                return False
+
+            keep = [i for i, point_id in enumerate(ids) if point_id in remote_set]
+            try:
+                new_ids, new_vectors, new_contents = self._matching_dimension(matrix, keep, *fetched)
+                if not new_ids and len(keep) == len(ids):
+                    sync_results.inc(result="unchanged")
+                    return False
+                parts = [np.asarray(matrix[keep], dtype=np.float32)] if keep else []
+                if new_vectors:
+                    parts.append(_normalize(np.stack(new_vectors)))
+                new_matrix = (np.ascontiguousarray(np.concatenate(parts)) if parts
+                              else np.zeros((0, 0), dtype=np.float32))
+                snapshot = (new_matrix,
+                            [ids[i] for i in keep] + new_ids,
+                            [contents[i] for i in keep] + new_contents)
+
+                await asyncio.get_running_loop().run_in_executor(None, self._save, snapshot)
+            except Exception as e:
+                sync_results.inc(result="error")
+                print(f"local vector index 갱신 실패 (기존 index 유지): {e}")
+                return False
+            self._snapshot = snapshot
+            sync_results.inc(result="updated")
+            print(f"local vector index 동기화 완료: +{len(new_ids)} / -{len(ids) - len(keep)} (총 {len(snapshot[1])}건)")
+            return True
+
+    @staticmethod
+    def _matching_dimension(matrix: np.ndarray, keep: List[int], new_ids: List[str], new_vectors: List[np.ndarray],
+                            new_contents: List[str]) -> Tuple[List[str], List[np.ndarray], List[str]]:
+        # 기존 index(없으면 첫 번째 새 vector)와 차원이 다른 point는 건너뛴다 (한 건 때문에 동기화 전체가 멈추지 않도록)
+        if keep:
+            dimension = matrix.shape[1]
+        elif new_vectors:
+            dimension = new_vectors[0].shape[-1]
+        else:
+            return new_ids, new_vectors, new_contents
+        selected = [i for i, vector in enumerate(new_vectors) if vector.ndim == 1 and vector.shape[0] == dimension]
+        if len(selected) != len(new_vectors):
+            print(f"local vector index: 차원이 {dimension}이 아닌 point {len(new_vectors) - len(selected)}건 제외")
+        return ([new_ids[i] for i in selected], [new_vectors[i] for i in selected],
+                [new_contents[i] for i in selected])
+
+    async def _sync_loop(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                # 예상하지 못한 오류로 주기 동기화가 끝나지 않도록 기록만 하고 다음 주기에 다시 시도
+                sync_results.inc(result="error")
+                print(f"local vector index 동기화 오류: {e!r}")
+            await asyncio.sleep(LOCAL_VECTOR_INDEX_SYNC_INTERVAL)
+
+    def start(self) -> None:
+        if self._sync_task is None:
+            self._sync_task = asyncio.ensure_future(self._sync_loop())
+
+    def stop(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+
+    # ---------- 파일 저장 / 불러오기 ----------
+
+    def _save(self, snapshot: Snapshot) -> None:
+        # 임시 파일에 쓴 뒤 os.replace로 교체 (중간에 죽어도 이전 파일은 온전히 남는다)
+        matrix, ids, contents = snapshot
+        matrix_tmp = self._matrix_path + ".tmp"
+        meta_tmp = self._meta_path + ".tmp"
+        with open(matrix_tmp, "wb") as f:
+            np.save(f, matrix)
+        with open(meta_tmp, "w", encoding="utf-8") as f:
+            json.dump({"collection": self._collection_name, "shape": list(matrix.shape),
+                       "ids": ids, "contents": contents}, f, ensure_ascii=False)
+        os.replace(matrix_tmp, self._matrix_path)
+        os.replace(meta_tmp, self._meta_path)
+
+    def _load(self) -> None:
+        if not (os.path.exists(self._matrix_path) and os.path.exists(self._meta_path)):
+            return
+        try:
+            with open(self._meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            matrix = np.load(self._matrix_path, mmap_mode="r")
+            if (meta.get("collection") != self._collection_name or list(matrix.shape) != meta.get("shape")
+                    or matrix.dtype != np.float32 or len(meta["ids"]) != matrix.shape[0]):
+                print("local vector index 파일이 현재 설정과 맞지 않아 무시합니다")
+                return
+            self._snapshot = (matrix, meta["ids"], meta["contents"])
+            print(f"local vector index 불러오기 완료 ({len(meta['ids'])}건, {self._matrix_path})")
+        except Exception as e:
+            print(f"local vector index 파일 불러오기 실패: {e}")
+
+
+local_vector_index: Optional[LocalVectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_local_vector_index() -> Optional[LocalVectorIndex]:
+    # LOCAL_VECTOR_INDEX=true 일 때만 생성 (아니면 None)
+    global local_vector_index
+    if not LOCAL_VECTOR_INDEX:
+        return None
+    with _index_lock:
+        if local_vector_index is None:
+            local_vector_index = LocalVectorIndex()
+    return local_vector_index
@@ -0,0 +1,144 @@
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from config.metrics.metrics import get_metrics_registry
+from config.canonicalize.canonicalizer import CREDENTIAL_HEADERS
+
+# prompt용 요청 직렬화 설정 (.env 또는 환경변수로 조정 가능)
+CONTEXT_HEADER_ALLOWLIST = tuple(h.strip().lower() for h in os.getenv(
+    "CONTEXT_HEADER_ALLOWLIST",
+    "host,content-type,content-length,referer,origin,x-forwarded-for,x-real-ip,x-requested-with"
+).split(",") if h.strip())
+CONTEXT_MAX_VALUE_CHARS = int(os.getenv("CONTEXT_MAX_VALUE_CHARS", "256"))
+CONTEXT_MAX_BODY_CHARS = int(os.getenv("CONTEXT_MAX_BODY_CHARS", "2048"))
+CONTEXT_MAX_DECODED = int(os.getenv("CONTEXT_MAX_DECODED", "8"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+CONTEXT_TOKENIZER = os.getenv("CONTEXT_TOKENIZER", "cl100k_base")
+
+# allowlist 밖의 header라도 값에 공격에 쓰이는 문자가 있으면 prompt에 포함 (예: X-Api-Version: ${jndi:...})
+# 단 CREDENTIAL_HEADERS(authorization, cookie 등)는 어떤 경우에도 prompt에 넣지 않는다
+SUSPICIOUS_VALUE_PATTERN = re.compile(r"[<>'`{}|\\]|\$[({]|%[0-9a-fA-F]{2}|\.\./|&#|--|/\*")
+# tiktoken이 없을 때 쓰는 근사 tokenizer (단어 / 숫자 묶음, 그 외 문자는 1 token)
+APPROX_TOKEN_PATTERN = re.compile(r"[A-Za-z]{1,4}|\d{1,3}|\s+|[^\sA-Za-z\d]")
+
+metrics = get_metrics_registry()
+context_tokens = metrics.histogram("gateway_prompt_context_tokens", "prompt에 들어가는 요청 context token 수",
+                                   buckets=(64, 128, 256, 512, 1024, 1500, 2048, 4096, 8192))
+context_chars = metrics.histogram("gateway_prompt_context_chars", "prompt에 들어가는 요청 context 문자 수",
+                                  buckets=(256, 512, 1024, 2048, 4096, 8192, 16384, 65536))
+context_truncations = metrics.counter("gateway_prompt_context_truncated_total", "요청 context 축소 횟수", ["reason"])
+dropped_headers = metrics.counter("gateway_prompt_context_dropped_headers_total", "prompt에서 제외한 header 수")
+
+_encoding = None
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding(CONTEXT_TOKENIZER)
+except Exception:
+    print("tiktoken을 사용할 수 없어 근사 token 수로 prompt 크기를 계산합니다")
+
+
+def count_tokens(text: str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(APPROX_TOKEN_PATTERN.findall(text))
+
+
+def truncate_middle(value: str, max_chars: int) -> str:
+    # 앞뒤를 남기고 가운데를 생략 (payload는 앞 / 뒤 어느 쪽에도 있을 수 있으므로)
+    if max_chars <= 0 or len(value) <= max_chars:
+        return value
+    head = max_chars * 2 // 3
+    tail = max_chars - head
+    return f"{value[:head]}…[{len(value) - max_chars} chars omitted]…{value[-tail:] if tail else ''}"
+
+
+def select_headers(headers: Dict[str, str], max_value_chars: int,
+                   decoded_headers: Iterable[str] = ()) -> Dict[str, str]:
+    # 디코딩한 값에 의심 문자가 있는 header도 포함 (Base64 등으로 감춘 payload)
+    suspicious = {line.split(":", 1)[0] for line in decoded_headers
+                  if SUSPICIOUS_VALUE_PATTERN.search(line.split(":", 1)[-1])}
+    selected = {}
+    for name, value in headers.items():
+        name = name.lower()
+        if name in CREDENTIAL_HEADERS:
+            dropped_headers.inc()
+        elif name in CONTEXT_HEADER_ALLOWLIST or name in suspicious or SUSPICIOUS_VALUE_PATTERN.search(value or ""):
+            selected[name] = truncate_middle(value, max_value_chars)
+        else:
+            dropped_headers.inc()
+    return selected
+
+
+def _compact(full_context: Dict[str, Any], max_value_chars: int, max_body_chars: int,
+             max_decoded: int) -> Dict[str, Any]:
+    compact: Dict[str, Any] = {
+        "method": full_context.get("method"),
+        "path": truncate_middle(str(full_context.get("path", "")), max_value_chars * 2),
+    }
+    query_params = full_context.get("query_params") or {}
+    if query_params:
+        compact["query_params"] = {truncate_middle(str(k), max_value_chars): truncate_middle(str(v), max_value_chars)
+                                   for k, v in query_params.items()}
+    decoded = full_context.get("decoded") or {}
+    compact["headers"] = select_headers(full_context.get("headers") or {}, max_value_chars,
+                                        decoded.get("headers") or ())
+    body = full_context.get("body") or ""
+    if body:
+        compact["body"] = truncate_middle(body, max_body_chars)
+
+    if decoded and max_decoded > 0:
+        compact_decoded: Dict[str, List[str]] = {}
+        remaining = max_decoded
+        for field, variants in decoded.items():
+            if remaining <= 0:
+                break
+            if field == "headers":
+                # header 디코딩 결과("name: variant")도 prompt에 넣기로 한 header만 남긴다
+                variants = [v for v in variants if str(v).split(":", 1)[0] in compact["headers"]]
+                if not variants:
+                    continue
+            kept = [truncate_middle(str(v), max_body_chars) for v in list(variants)[:remaining]]
+            compact_decoded[field] = kept
+            remaining -= len(kept)
+        compact["decoded"] = compact_decoded
+    return compact
+
+
+def serialize_context(full_context: Dict[str, Any], token_budget: Optional[int] = None) -> str:
+    """
+    LLM prompt / embedding query에 넣을 요청 context를 짧게 직렬화합니다.
+
+    - 보안 판단에 필요한 header만 남기고(allowlist + 의심 문자가 있는 header), 공백 없는 JSON으로 직렬화
+    - 긴 값과 body는 앞뒤를 남기고 가운데를 생략
+    - token_budget(기본 CONTEXT_TOKEN_BUDGET)을 넘으면 한도를 절반씩 줄이며 다시 직렬화하고,
+      그래도 넘으면 문자열 자체를 잘라서 반드시 budget 안에 맞춘다
+    """
+    budget = token_budget or CONTEXT_TOKEN_BUDGET
+    max_value_chars, max_body_chars, max_decoded = CONTEXT_MAX_VALUE_CHARS, CONTEXT_MAX_BODY_CHARS, CONTEXT_MAX_DECODED
+
+    text = json.dumps(_compact(full_context, max_value_chars, max_body_chars, max_decoded),
+                      ensure_ascii=False, separators=(",", ":"))
+    tokens = count_tokens(text)
+    if tokens > budget:
+        context_truncations.inc(reason="shrink")
+    while tokens > budget and (max_body_chars > 64 or max_value_chars > 32):
+        max_body_chars = max(64, max_body_chars // 2)
+        max_value_chars = max(32, max_value_chars // 2)
+        max_decoded = max(1, max_decoded // 2)
+        text = json.dumps(_compact(full_context, max_value_chars, max_body_chars, max_decoded),
+                          ensure_ascii=False, separators=(",", ":"))
+        tokens = count_tokens(text)
+
+    if tokens > budget:
+        # 최후 수단: token 수 비율로 문자열을 잘라 budget 안에 맞춘다 (매번 길이가 줄어들어 반드시 끝난다)
+        context_truncations.inc(reason="hard_cut")
+        while tokens > budget and text:
+            target = min(len(text) - 1, int(len(text) * budget / tokens * 0.9))
+            text = truncate_middle(text, target - 32) if target > 128 else text[:max(0, target)]
+            tokens = count_tokens(text)
+
+    context_tokens.observe(tokens)
+    context_chars.observe(len(text))
+    return text
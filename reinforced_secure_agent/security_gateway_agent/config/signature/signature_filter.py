@@ -0,0 +1,223 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Tuple, Any, Optional
+
+# 시그니처 파일 위치 및 변경 감지 주기 (.env 또는 환경변수로 조정 가능)
+SIGNATURE_FILE_PATH = os.getenv("SIGNATURE_FILE_PATH", os.path.join(os.path.dirname(__file__), "signatures.json"))
+SIGNATURE_RELOAD_INTERVAL = float(os.getenv("SIGNATURE_RELOAD_INTERVAL", "5"))
+
+# 검사 대상 필드
+FIELDS = ("method", "path", "query", "headers", "body")
+
+# 판정 우선순위: block > escalate > allow
+ACTION_BLOCK = "block"
+ACTION_ALLOW = "allow"
+ACTION_ESCALATE = "escalate"
+
+
+# 여러 keyword를 한 번의 scan으로 찾기 위한 Aho-Corasick automaton
+class AhoCorasick:
+
+    def __init__(self, keywords: List[Tuple[str, int]]):
+        # keywords: (keyword, signature index)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for keyword, sig_index in keywords:
+            self._add(keyword.lower(), sig_index)
+        self._build()
+
+    def _add(self, keyword: str, sig_index: int) -> None:
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = nxt
+        self._output[node].append(sig_index)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def search(self, text: str) -> set:
+        goto, fail, output = self._goto, self._fail, self._output
+        matched = set()
+        node = 0
+        for ch in text.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if output[node]:
+                matched.update(output[node])
+        return matched
+
+
+class Signature:
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.id: str = raw["id"]
+        self.type: str = raw.get("type", "regex")
+        self.action: str = raw.get("action", ACTION_BLOCK)
+        self.fields = tuple(raw.get("fields", FIELDS))
+        self.methods = tuple(m.upper() for m in raw.get("methods", ()))
+        self.description: str = raw.get("description", "")
+
+        patterns = raw["pattern"]
+        self.keywords: List[str] = []
+        self.regex: Optional[re.Pattern] = None
+        if self.type == "keyword":
+            self.keywords = patterns if isinstance(patterns, list) else [patterns]
+        else:
+            self.regex = re.compile(patterns)
+
+        if self.action not in (ACTION_BLOCK, ACTION_ALLOW, ACTION_ESCALATE):
+            raise ValueError(f"[{self.id}] 알 수 없는 action: {self.action}")
+
+
+# 컴파일된 시그니처 묶음 (reload 시 통째로 교체된다)
+class CompiledSignatureSet:
+
+    def __init__(self, signatures: List[Signature]):
+        self.signatures = signatures
+
+        # 필드별로 keyword automaton / regex 목록을 미리 나눠둔다
+        self._automata: Dict[str, AhoCorasick] = {}
+        self._regexes: Dict[str, List[int]] = {}
+        for field in FIELDS:
+            keywords = [(kw, idx) for idx, sig in enumerate(signatures)
+                        if sig.type == "keyword" and field in sig.fields for kw in sig.keywords]
+            self._automata[field] = AhoCorasick(keywords)
+            self._regexes[field] = [idx for idx, sig in enumerate(signatures)
+                                    if sig.regex is not None and field in sig.fields]
+
+    def match(self, fields: Dict[str, str], method: str) -> List[Signature]:
+        matched = set()
+        for field in FIELDS:
+            text = fields.get(field, "")
+            if not text:
+                continue
+            matched |= self._automata[field].search(text)
+            for idx in self._regexes[field]:
+                if idx not in matched and self.signatures[idx].regex.search(text):
+                    matched.add(idx)
+
+        result = []
+        for idx in sorted(matched):
+            sig = self.signatures[idx]
+            if sig.methods and method.upper() not in sig.methods:
+                continue
+            result.append(sig)
+        return result
+
+
+def load_signature_set(path: str = SIGNATURE_FILE_PATH) -> CompiledSignatureSet:
+    with open(path, "r", encoding="utf-8") as f:
+        raw_signatures = json.load(f)
+    return CompiledSignatureSet([Signature(raw) for raw in raw_signatures])
+
+
+def build_signature_fields(full_context: Dict[str, Any]) -> Dict[str, str]:
+    query_params = full_context.get("query_params", {})
+    headers = full_context.get("headers", {})
+    fields = {
+        "method": full_context.get("method", ""),
+        "path": full_context.get("path", ""),
+        "query": "\n".join(f"{k}={v}" for k, v in query_params.items()),
+        "headers": "\n".join(f"{k}: {v}" for k, v in headers.items()),
+        "body": full_context.get("body", ""),
+    }
+
+    # canonicalizer가 만든 디코딩 결과도 같은 필드로 검사
+    for field, variants in full_context.get("decoded", {}).items():
+        if field in fields:
+            fields[field] = "\n".join([fields[field]] + variants)
+    return fields
+
+
+# 요청을 LLM 전에 block / allow / escalate로 분류하는 결정적(deterministic) 1차 필터
+class SignatureFilter:
+
+    def __init__(self, path: str = SIGNATURE_FILE_PATH, reload_interval: float = SIGNATURE_RELOAD_INTERVAL):
+        self._path = path
+        self._reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._mtime = os.path.getmtime(path)
+        self._last_check = time.monotonic()
+        self._signature_set = load_signature_set(path)
+        print(f"Signature set loaded: {len(self._signature_set.signatures)}개")
+
+    def reload(self) -> int:
+        # 새로 컴파일이 끝난 뒤에 교체하므로, 검사 중인 요청은 항상 완성된 set만 본다
+        with self._lock:
+            mtime = os.path.getmtime(self._path)
+            signature_set = load_signature_set(self._path)
+            self._signature_set = signature_set
+            self._mtime = mtime
+            print(f"Signature set reloaded: {len(signature_set.signatures)}개")
+            return len(signature_set.signatures)
+
+    def _reload_if_changed(self) -> None:
+        now = time.monotonic()
+        if now - self._last_check < self._reload_interval:
+            return
+        self._last_check = now
+        try:
+            if os.path.getmtime(self._path) != self._mtime:
+                self.reload()
+        except Exception as e:
+            # 잘못된 파일이 올라와도 기존 시그니처로 계속 동작
+            print(f"Signature reload 실패 (기존 시그니처 유지): {e}")
+
+    def inspect(self, full_context: Dict[str, Any]) -> Tuple[str, List[str]]:
+        """
+        요청 context를 시그니처로 검사합니다.
+
+        Args:
+            full_context (Dict[str, Any]): secure_agent_gateway에서 만든 요청 context
+
+        Returns:
+            Tuple[str, List[str]]: (block / allow / escalate, 매칭된 시그니처 id 목록)
+        """
+        self._reload_if_changed()
+        signature_set = self._signature_set
+
+        fields = build_signature_fields(full_context)
+        matched = signature_set.match(fields, fields["method"])
+        matched_ids = [sig.id for sig in matched]
+        actions = {sig.action for sig in matched}
+
+        if ACTION_BLOCK in actions:
+            return ACTION_BLOCK, matched_ids
+        if ACTION_ESCALATE in actions or not actions:
+            return ACTION_ESCALATE, matched_ids
+        return ACTION_ALLOW, matched_ids
+
+    def inspect_payload(self, payload: str) -> Tuple[str, List[str]]:
+        # 단일 문자열 검사용 (Tool 등)
+        return self.inspect({"body": payload})
+
+
+signature_filter = SignatureFilter()
+
+
+def get_signature_filter() -> SignatureFilter:
+    global signature_filter
+    return signature_filter
@@ -1,6 +1,10 @@
+import re
+
 from config.tools import *
-from langchain_community.tools import DuckDuckGoSearchRun
-import base64
+from config.signature.signature_filter import get_signature_filter
+from config.canonicalize.canonicalizer import decode_recursive
+from config.knowledge.attack_knowledge import get_attack_knowledge_index, format_results
+from config.ratelimit.rate_limiter import get_rate_limiter
 
 
 @tool
@@ -14,23 +18,14 @@ def suspicious_pattern_detector(request_payload: str) -> str:
     Returns:
         str: 악성 여부 판단
     """
-    import re
-    patterns = [
-        r"(?i)(\bselect\b|\binsert\b|\bupdate\b|\bdelete\b|\bdrop\b)",  # SQL Injection
-        r"(?i)<script.*?>.*?</script>",  # XSS
-        r"(?i)\bUNION\b.*\bSELECT\b",  # SQL Union Injection
-        r"\.\./",  # Path Traversal
-    ]
-    for pattern in patterns:
-        if re.search(pattern, request_payload):
-            return "악성 요청 감지됨"
+    action, matched_signatures = get_signature_filter().inspect_payload(request_payload)
+    if action == "block":
+        return f"악성 요청 감지됨 ({', '.join(matched_signatures)})"
+    if matched_signatures:
+        return f"의심 패턴 존재, 추가 분석 필요 ({', '.join(matched_signatures)})"
     return "SQL, XSS,SQL Union Injection, Path Traversal Pattern 통과"
 
 
-# Web Search Tool
-web_search_tool = DuckDuckGoSearchRun()
-
-
 '''
 Rate Limit Tool
 '''
@@ -38,6 +33,7 @@ Rate Limit Tool
 def rate_limit_check_tool(ip: str, log_lines: list[str]) -> str:
     """
     특정 IP의 과도한 요청을 감지합니다.
+    access log 라인 수와 함께 Gateway rate limiter의 현재 상태(sliding window 요청 수, 차단 횟수)를 확인합니다.
 
     Args:
         ip (str): 요청을 보낸 IP 주소
@@ -46,7 +42,14 @@ def rate_limit_check_tool(ip: str, log_lines: list[str]) -> str:
     Returns:
         str: 의심 여부 결과
     """
-    count = sum(1 for line in log_lines if ip in line)
+    # 부분 문자열이 아니라 IP가 정확히 일치하는 라인만 센다 (10.0.0.1이 10.0.0.11 라인에 걸리지 않도록)
+    ip_pattern = re.compile(rf"(?<![\w.:]){re.escape(ip)}(?![\w.:])")
+    count = sum(1 for line in log_lines if ip_pattern.search(line))
+    limited = [state for state in get_rate_limiter().client_state(ip) if state["limited"] or state["rejected"]]
+    if limited:
+        rules = ", ".join(f"{state['rule']} {state['requests']:.0f}/{state['limit']} (차단 {state['rejected']}회)"
+                          for state in limited)
+        return f"{ip}: 과도한 요청 감지됨 (Gateway rate limit 초과: {rules})"
     if count > 100:  # 예: 5분간 100회 이상
         return f"{ip}: 과도한 요청 감지됨 (DoS 의심)"
     return f"{ip}: 정상 요청"
@@ -64,8 +67,8 @@ def think_aloud(context: str) -> str:
         str: 에이전트의 추론 과정
     """
     return (f"이 상황을 어떻게 판단할 수 있을지 논리적으로 생각해봅니다."
-            f"또한 도구를 사용하다 실패할 경우도 web_search를 찾아서 생각해봅니다"
-            f" (만약 이해가 안되면, web_search 도구를 사용해서 검색하세요): {context}")
+            f"또한 도구를 사용하다 실패할 경우도 web_search로 공격 지식 문서를 찾아서 생각해봅니다"
+            f" (만약 이해가 안되면, web_search 도구로 payload 일부나 키워드를 검색하세요): {context}")
 
 
 # @tool(description="상황을 논리적으로 분석하고, 추가 도구 사용이 필요한지 판단합니다.")
@@ -93,25 +96,29 @@ def think_aloud(context: str) -> str:
 #     )
 
 
-# DuckDuckGo를 직접 감싸서 tool 함수로 변환
+# 외부 웹 검색(DuckDuckGo) 대신 local 공격 지식 문서(BM25 index)를 검색 (network 불필요, ms 단위 응답)
 @tool
 def web_search_tool(query: str) -> str:
     """
-    검색 쿼리를 받아서 웹에서 관련 정보를 찾아 반환합니다.
+    공격 기법 / 인코딩 / payload 유형에 대한 보안 지식 문서를 검색합니다.
+    의심 payload 일부나 키워드(예: "${jndi:ldap", "UNION SELECT", "base64 script")를 넣으면 관련 설명과 판단 기준을 반환합니다.
+
+    Args:
+        query (str): 검색할 payload 일부 또는 키워드
+
+    Returns:
+        str: 관련 공격 지식 (제목, tag, 설명)
     """
-    duck_search = DuckDuckGoSearchRun()
-    return duck_search.run(query)
+    return format_results(get_attack_knowledge_index().search(query))
 
 
 @tool(description="Base64로 인코딩된 문자열을 디코딩합니다. 일반적으로 평문 문자열을 확인할 때 사용합니다.")
 def base64_decode_tool(encoded: str) -> str:
     """Base64로 한 번 또는 여러 번 인코딩된 문자열을 디코딩합니다."""
-    try:
-        first = base64.b64decode(encoded)
-        second = base64.b64decode(first)
-        return second.decode("utf-8", errors="replace")
-    except Exception as e:
-        return f"[Double Decoding Failed] {str(e)}"
+    decoded = decode_recursive(encoded)
+    if decoded == encoded.strip():
+        return "[Base64 Decoding Failed] Base64 평문으로 디코딩되지 않습니다."
+    return decoded
 
 
 @tool(description="Unicode로 인코딩된 문자열을 디코딩합니다. 예: \\u003cscript\\u003e 등")
@@ -1,15 +1,40 @@
-from config.nodes.nodes import retriever_node
-from config.agent_config.agent_config import agent_graph, config, llm
+from config.agent_config.agent_config import agent_graph, config, llm, build_review_config, REVIEW_TIMEOUT, \
+    REVIEW_MAX_ITERATIONS, REVIEW_FALLBACK_ACTION
+from langgraph.errors import GraphRecursionError
 
-from config.prompts.prompts import build_secure_prompt, build_agent_human_prompt, build_agent_system_message, test_prompt \
-    ,build_llm_system_prompt, build_llm_prompt
+from config.prompts.prompts import build_secure_prompt, build_agent_human_prompt, build_agent_system_message, test_prompt
 from fastapi import FastAPI, Request
+import asyncio
 import json
-from typing import List
-import httpx
+from typing import List, Optional
 from starlette.responses import Response, JSONResponse
-from config.memory.singleton import WhiteList, Blacklist
+import service.acl_service as accessControlService
+from config.cache.verdict_cache import get_verdict_cache, build_request_fingerprint
+from config.signature.signature_filter import get_signature_filter
+from config.canonicalize.canonicalizer import canonicalize_context
+from config.serialize.context_serializer import serialize_context
+from config.coalesce.single_flight import get_single_flight
+from config.proxy.upstream_proxy import get_upstream_pool
+from config.retrieval.few_shot_retriever import get_few_shot_retriever
+from config.classify.batch_classifier import get_batch_classifier
+from config.classify.fallback_classifier import get_fallback_classifier
+from config.classify.local_classifier import get_local_classifier
+from config.circuit.circuit_breaker import get_circuit_breaker, CircuitOpenError
+from config.admission.admission_control import get_admission_controller, request_priority, AdmissionRejected, \
+    PRIORITY_ANONYMOUS, PRIORITY_AUDIT
+from config.audit.audit_queue import get_audit_queue, is_audit_candidate, record_gateway_event, AuditItem
+from config.ratelimit.rate_limiter import get_rate_limiter, retry_after_header
+from config.leak.response_inspector import get_response_inspector, ResponseLeak
+from config.decision.decision_log import get_decision_log_writer, build_decision_entry, start_decision_trace, \
+    set_decision_tier, add_decision_tokens, token_usage
+from domain.entity.entity import IPListModel
 from router.acl_router import router
+from router.signature_router import router as signature_router
+from router.metrics_router import router as metrics_router
+from router.model_router import router as model_router
+from router.ratelimit_router import router as ratelimit_router
+from config.models.model_registry import get_model_registry, MODEL_PRELOAD
+from config.metrics.metrics import get_metrics_registry
 import uvicorn
 
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
@@ -20,39 +45,77 @@ app = FastAPI()
 
 # Router 등록
 app.include_router(router)
-
-# HTTP 클라이언트 설정 (https는 일단 껐습니다 verify)
-client = httpx.AsyncClient(timeout=120.0, verify=False)
-
-whitelist = WhiteList()
-blacklist = Blacklist()
-
-
-def get_few_shot_from_db(str_full_context: str):
-
-    start = time.time()
-
-    # few shot을 위한 예제 불러오기
-    retriever = retriever_node().as_retriever(
-        search_kwargs={
-            "k": 3,  # 여러 개 받아서 confidence 기반 판단 가능
-            # "score_threshold": 0.5
-            # "search_params": {
-            #     "hnsw_ef": 32,  # 기본 64 ~ 128 / 낮추면 속도↑ 정확도↓
-            #     "exact": False  # True는 느리지만 완전 탐색 (쓰지 않는게 좋음)
-            # }
-        }
-    )
-
+app.include_router(signature_router)
+app.include_router(metrics_router)
+app.include_router(model_router)
+app.include_router(ratelimit_router)
+
+# Gateway 자체 관리 API 경로 (이 경로만 upstream으로 전달하지 않고 직접 처리, 그 외 /gateway/* 는 일반 요청과 같이 검사)
+GATEWAY_ROUTES = frozenset(route.path for route in app.routes if route.path.startswith("/gateway/"))
+
+whitelist, blacklist = accessControlService.get_acl_lists()
+verdict_cache = get_verdict_cache()
+signature_filter = get_signature_filter()
+single_flight = get_single_flight()
+upstream_pool = get_upstream_pool()
+few_shot_retriever = get_few_shot_retriever()
+batch_classifier = get_batch_classifier()
+fallback_classifier = get_fallback_classifier()
+local_classifier = get_local_classifier()
+# LLM pool 전체 기준의 circuit breaker (deployment별 장애는 pool이 failover / 제외로 처리)
+llm_breaker = get_circuit_breaker(getattr(llm, "deployment_name", None))
+admission = get_admission_controller()
+audit_queue = get_audit_queue()
+model_registry = get_model_registry()
+rate_limiter = get_rate_limiter()
+decision_log = get_decision_log_writer()
+response_inspector = get_response_inspector()
+
+# 단계별 latency / 판정 수 (GET /gateway/metrics 에서 Prometheus 형식으로 조회)
+metrics = get_metrics_registry()
+stage_seconds = metrics.histogram("gateway_stage_seconds", "secure_agent_gateway 단계별 처리 시간", ["stage"])
+verdict_counter = metrics.counter("gateway_verdicts_total", "판정 근거별 최종 판정 수", ["source", "action"])
+tier_counter = metrics.counter("gateway_tier_decisions_total", "LLM tier별 판정 수", ["tier", "action"])
+review_fallbacks = metrics.counter("gateway_review_fallback_total", "review 제한에 걸려 fallback 판정한 수", ["reason"])
+
+
+@app.on_event("startup")
+async def start_gateway_resources():
+    # MODEL_PRELOAD=true이면 embedding model 로드 + warm-up을 background로 수행 (완료 전까지 /gateway/ready는 503)
+    if MODEL_PRELOAD:
+        app.state.model_preload = asyncio.ensure_future(model_registry.preload())
+    # 학습된 local 분류 model이 있으면 불러와서 LLM 앞단 tier로 사용
+    local_classifier.load()
+    # LOCAL_VECTOR_INDEX=true이면 few-shot local index 동기화 시작
+    few_shot_retriever.start()
+    # AUDIT_MODE=true이면 먼저 전달한 요청을 background에서 사후 검사
+    audit_queue.start(audit_request)
+    # RESPONSE_INSPECT_ENABLED=true이면 upstream 응답에서 찾은 정보 유출을 기록 / Black List에 반영
+    response_inspector.start(handle_response_leak)
+    # 판정 기록은 background thread가 batch로 segment 파일에 기록
+    decision_log.start()
+
+
+@app.on_event("shutdown")
+async def close_gateway_resources():
+    await audit_queue.stop()
+    await upstream_pool.close()
+    decision_log.stop()
+    few_shot_retriever.close()
+
+
+async def get_few_shot_from_db(str_full_context: str):
+    # few shot을 위한 예제 불러오기 (embedding은 thread pool, 검색은 async Qdrant client)
     query = f'{str_full_context}'
-    results = retriever.invoke(query)
-
-    # print(results)
-
-    end = time.time()
-    print(f"rag search 시간: {end - start:.4f}초")
+    try:
+        with stage_seconds.time(stage="few_shot"):
+            results = await few_shot_retriever.retrieve(query)
+    except Exception as e:
+        # few-shot 없이도 review agent는 판단 가능하므로 요청을 실패시키지 않는다
+        print(f"few-shot 검색 실패: {e}")
+        results = []
 
-    return format_few_shot_examples([r.page_content for r in results])
+    return format_few_shot_examples(results)
 
 
 # --- 형식의 few-shot 예시 문자열 자동 생성
@@ -73,28 +136,229 @@ def debugging_stream(secure_prompt: str, system_message: str):
     print(f"llm response search 시간: {end - start:.4f}초")
 
 
-async def routing_url(request: Request, url: str, request_body):
-    proxied_response = await client.request(
-        method=request.method,
-        url=url + request.url.path,
-        headers=request.headers.raw,
-        content=request_body
-    )
-    return Response(
-        content=proxied_response.content,
-        status_code=proxied_response.status_code,
-        headers=dict(proxied_response.headers)
-    )
+async def routing_url(request: Request, request_body):
+    # 응답 body는 buffering 없이 upstream에서 client로 바로 stream (측정은 응답 header 수신까지)
+    with stage_seconds.time(stage="upstream"):
+        return await upstream_pool.forward(request, request_body)
+
+
+async def classify_first_tier(str_full_context: str, full_context: dict) -> str:
+    # 동시에 들어온 요청은 LLM_BATCH_WINDOW_MS 동안 모아서 한 번의 LLM 호출로 판단
+    try:
+        with stage_seconds.time(stage="first_tier"):
+            action_result = await batch_classifier.classify(str_full_context)
+    except Exception as e:
+        # LLM 장애(circuit open / timeout / API 오류)나 응답 형식 오류는 local fallback으로 판단 (500으로 끝나지 않도록)
+        reason = "circuit_open" if isinstance(e, CircuitOpenError) else "error"
+        print(f"1차 LLM 판단 불가 ({reason}: {e!r}), local fallback으로 판단")
+        action_result = fallback_classifier.classify(full_context, reason)
+        set_decision_tier("fallback")
+        tier_counter.inc(tier="fallback", action=action_result)
+        return action_result
+    set_decision_tier("first_tier")
+    tier_counter.inc(tier="first_tier", action=action_result)
+    return action_result
+
+
+async def review_request(str_full_context: str, full_context: dict) -> str:
+    # LLM deployment circuit이 열려 있으면 review agent를 실행하지 않고 local fallback으로 판단
+    if llm_breaker.is_open():
+        action_result = fallback_classifier.classify(full_context, "circuit_open")
+        set_decision_tier("fallback")
+        tier_counter.inc(tier="fallback", action=action_result)
+        return action_result
+
+    few_shot_examples = await get_few_shot_from_db(str_full_context)
+    secure_prompt = build_agent_human_prompt(few_shot_examples, str_full_context)
+
+    # print(secure_prompt)
+    system_message = build_agent_system_message()
+
+    # debugging_stream(secure_prompt, system_message)
+    # 요청마다 별도 thread에서 실행하고, 반복 횟수 / 시간 제한에 걸리면 REVIEW_FALLBACK_ACTION으로 판정
+    review_config = build_review_config()
+    tier = "review"
+    review_start = time.perf_counter()
+    try:
+        with stage_seconds.time(stage="review_agent"):
+            decision = await asyncio.wait_for(agent_graph.ainvoke(
+                {'messages': [HumanMessage(content=secure_prompt), SystemMessage(content=system_message)]},
+                config=review_config
+            ), timeout=REVIEW_TIMEOUT)
+        # LLM 호출은 모두 응답했으므로 실패와 마찬가지로 성공도 circuit breaker에 기록 (LLM 호출 1회당 평균 시간)
+        review_llm_calls = sum(1 for message in decision['messages'] if isinstance(message, AIMessage))
+        llm_breaker.record_success((time.perf_counter() - review_start) / max(1, review_llm_calls))
+        action_result = json.loads(decision['messages'][-1].content)['action']
+        add_decision_tokens(sum(token_usage(message) for message in decision['messages']))
+    except asyncio.TimeoutError:
+        print(f"review 시간 초과 ({REVIEW_TIMEOUT}초), {REVIEW_FALLBACK_ACTION}로 판정")
+        # 응답하지 않는 deployment도 circuit이 열리도록 실패로 기록
+        llm_breaker.record_failure("timeout")
+        review_fallbacks.inc(reason="timeout")
+        action_result = REVIEW_FALLBACK_ACTION
+    except GraphRecursionError:
+        print(f"review 반복 횟수 초과 ({REVIEW_MAX_ITERATIONS}회), {REVIEW_FALLBACK_ACTION}로 판정")
+        review_fallbacks.inc(reason="max_iterations")
+        action_result = REVIEW_FALLBACK_ACTION
+    except (ValueError, KeyError, TypeError) as e:
+        # 최종 응답이 {"action": ...} 형식이 아닌 경우
+        print(f"review 응답 형식 오류 ({e!r}), local fallback으로 판단")
+        review_fallbacks.inc(reason="malformed")
+        action_result = fallback_classifier.classify(full_context, "malformed")
+        tier = "fallback"
+    except Exception as e:
+        # Azure OpenAI 호출 실패: circuit breaker에 실패로 기록하고 local fallback으로 판단
+        print(f"review agent 실패 ({e!r}), local fallback으로 판단")
+        llm_breaker.record_failure("error")
+        review_fallbacks.inc(reason="error")
+        action_result = fallback_classifier.classify(full_context, "error")
+        tier = "fallback"
+    finally:
+        release_review_thread(review_config)
+
+    set_decision_tier(tier)
+    tier_counter.inc(tier=tier, action=action_result)
+    return action_result
+
+
+def release_review_thread(review_config: dict) -> None:
+    # checkpointer가 붙어 있다면 끝난 review thread의 기록을 지운다 (uptime에 따라 메모리가 늘지 않도록)
+    checkpointer = getattr(agent_graph, "checkpointer", None)
+    if checkpointer is not None and hasattr(checkpointer, "delete_thread"):
+        checkpointer.delete_thread(review_config['configurable']['thread_id'])
+
+
+# local 분류 model이 확신하는 요청은 바로 판단하고, 나머지는 1차 LLM 판단 후 모호한 요청만 review agent로 넘긴다
+# (LLM tier는 tier별 동시 실행 수 제한 / priority queue를 거치며, 과부하 시 AdmissionRejected)
+async def classify_request(str_full_context: str, full_context: dict, priority: int = PRIORITY_ANONYMOUS) -> str:
+    with stage_seconds.time(stage="local_model"):
+        action_result = await local_classifier.classify(str_full_context)
+    if action_result is not None:
+        set_decision_tier("local_model")
+        tier_counter.inc(tier="local_model", action=action_result)
+        return action_result
+
+    action_result = await admission.run("classify", lambda: classify_first_tier(str_full_context, full_context), priority)
+    print(action_result)
+
+    if action_result == "review":
+        print("review가 필요 합니다.")
+        action_result = await admission.run("review", lambda: review_request(str_full_context, full_context), priority)
+        print(action_result)
+
+    return action_result
+
+
+# 먼저 전달한 요청의 사후 판단: block이면 client IP를 Black List에 추가하고 이벤트 기록
+async def audit_request(item: AuditItem) -> None:
+    trace = start_decision_trace()
+    start = time.perf_counter()
+    # 이미 다른 client의 같은 요청을 사후 판단했다면 그 판정을 이 client에도 적용
+    action_result = verdict_cache.get(item.fingerprint)
+    if action_result is not None:
+        set_decision_tier("cache")
+    else:
+        try:
+            action_result = await single_flight.do(item.fingerprint,
+                                                   lambda: classify_request(item.str_full_context, item.full_context,
+                                                                          PRIORITY_AUDIT))
+        except AdmissionRejected as e:
+            print(f"사후 검사 건너뜀: {e}")
+            return
+        verdict_cache.put(item.fingerprint, action_result)
+    verdict_counter.inc(source="audit", action=action_result)
+    client_ips = list(item.client_ips) or [item.client_ip]
+    decision_log.record(build_decision_entry(item.client_ip, item.method, item.path,
+                                             f"audit_{trace['tier'] or 'coalesced'}", action_result,
+                                             time.perf_counter() - start, trace["tokens"], item.fingerprint,
+                                             item.str_full_context))
+
+    if action_result == "block":
+        accessControlService.set_blacklist(IPListModel(ipList=client_ips))
+        record_gateway_event({
+            "event": "audit_block",
+            "client_ip": item.client_ip,
+            "client_ips": client_ips,
+            "method": item.method,
+            "path": item.path,
+            "fingerprint": item.fingerprint,
+            "forwarded_seconds_ago": round(time.time() - item.enqueued_at, 3)
+        })
+
+
+# upstream 응답에서 정보 유출을 찾은 경우: 이벤트 기록, 설정된 유형이면 요청한 client IP를 Black List에 추가
+def handle_response_leak(leak: ResponseLeak) -> None:
+    if leak.blacklist:
+        accessControlService.set_blacklist(IPListModel(ipList=[leak.client_ip]))
+    record_gateway_event({
+        "event": "response_leak",
+        "client_ip": leak.client_ip,
+        "method": leak.method,
+        "path": leak.path,
+        "status_code": leak.status_code,
+        "categories": leak.categories,
+        "counts": leak.counts,
+        "action": leak.action,
+        "blacklisted": leak.blacklist
+    })
+
+
+def record_decision(request: Request, trace: dict, request_start: float, tier: str, verdict: str,
+                    fingerprint: Optional[str] = None, str_full_context: Optional[str] = None) -> None:
+    # 판정 결과를 decision log queue에 넣기만 한다 (disk 기록은 background writer가 batch로 수행)
+    # LLM이 판단한 요청은 context도 함께 기록 (local 분류 model 학습 데이터)
+    decision_log.record(build_decision_entry(str(request.client.host), request.method, request.url.path, tier,
+                                             verdict, time.perf_counter() - request_start, trace["tokens"],
+                                             fingerprint, str_full_context))
 
 
 @app.middleware("http")
 async def secure_agent_gateway(request: Request, call_next):
     global whitelist
 
+    start = request_start = time.perf_counter()
     request_body = await request.body()
     request.state.body = request_body
+    stage_seconds.observe(time.perf_counter() - start, stage="body_read")
+
+    # 이 요청을 어느 단계가 판단했는지 / LLM token 사용량 (LLM 판단 Task도 같은 trace에 기록)
+    trace = start_decision_trace()
+    fingerprint = None
 
-    if request.url.path == '/gateway/whitelist' or request.url.path == '/gateway/blacklist':
+    # ACL / rate limit은 디코딩 / 직렬화 전에 판단 (차단된 client나 flood가 디코딩 비용을 쓰지 않도록)
+    # ACL snapshot (IP / CIDR radix trie, 조회 중 변경되어도 일관된 상태를 본다)
+    start = time.perf_counter()
+    free_pass_ip = whitelist.get_snapshot()
+    ban_ip = blacklist.get_snapshot()
+
+    is_banned = (str(request.client.host)) in ban_ip
+    is_free_pass = not is_banned and (str(request.client.host)) in free_pass_ip
+    stage_seconds.observe(time.perf_counter() - start, stage="acl")
+
+    if is_banned:
+        verdict_counter.inc(source="blacklist", action="block")
+        record_decision(request, trace, request_start, "blacklist", "block")
+        return JSONResponse(content={"detail": "보안상 이슈 발생"}, status_code=403)
+    # Gateway 자체 관리 API (whitelist, blacklist, signatures 등)는 ACL 검사 후 직접 처리
+    is_gateway_route = request.url.path in GATEWAY_ROUTES
+    if is_free_pass:
+        if is_gateway_route:
+            return await call_next(request)
+        verdict_counter.inc(source="whitelist", action="allow")
+        record_decision(request, trace, request_start, "whitelist", "allow")
+        return await routing_url(request, request_body)
+
+    # client별 sliding window 요청 수 제한 (시그니처 / LLM 판단 전에 수행, 초과 시 바로 429)
+    with stage_seconds.time(stage="rate_limit"):
+        allowed, retry_after, rate_rule = rate_limiter.check(str(request.client.host), request.method,
+                                                             request.url.path)
+    if not allowed:
+        print(f"rate limit 초과: {request.client.host} ({rate_rule.name})")
+        verdict_counter.inc(source="rate_limit", action="reject")
+        record_decision(request, trace, request_start, "rate_limit", "reject")
+        return JSONResponse(content={"detail": "요청이 너무 많습니다"}, status_code=429,
+                            headers={"Retry-After": retry_after_header(retry_after)})
+    if is_gateway_route:
         return await call_next(request)
 
     full_context = {
@@ -105,59 +369,82 @@ async def secure_agent_gateway(request: Request, call_next):
         "body": request_body.decode("utf-8", errors="ignore")
     }
 
-    # JSON 직렬화로 구조 유지
-    str_full_context = json.dumps(full_context, ensure_ascii=False, indent=2)
-
-    secure_prompt = build_llm_prompt(str_full_context)
-    system_message = build_llm_system_prompt()
-
-    # print(secure_prompt)
-
-    free_pass_ip = whitelist.get_whitelist()
-    ban_ip = blacklist.get_blacklist()
-
-    # 추후에 white list관련해서
-    action_result = 'allow'
-
-    if(str(request.client.host)) in ban_ip:
-        action_result = 'block'
-    elif (str(request.client.host)) not in free_pass_ip:
-        # Agent에게 판단 요청
-
-        decision = await llm.ainvoke([
-            SystemMessage(content=system_message),
-            HumanMessage(content=secure_prompt)
-        ])
-
-        # print(decision)
-
-        result = json.loads(decision.content)
-        action_result = result['action']
-
-    print(action_result)
+    # 인코딩된 payload는 한 번만 디코딩해서 이후 모든 단계(시그니처, 캐시, LLM prompt)가 공유
+    start = time.perf_counter()
+    decoded_variants = canonicalize_context(full_context)
+    if decoded_variants:
+        full_context["decoded"] = decoded_variants
+
+    # 보안 판단에 필요한 부분만 짧게 직렬화 (header allowlist, 긴 값 생략, token budget 적용)
+    str_full_context = serialize_context(full_context)
+    stage_seconds.observe(time.perf_counter() - start, stage="canonicalize")
+
+    # 명백한 공격 / 정적 리소스는 시그니처로 바로 판단 (LLM 호출 없음)
+    with stage_seconds.time(stage="signature"):
+        signature_action, matched_signatures = signature_filter.inspect(full_context)
+    if signature_action == "block":
+        print(f"signature block: {matched_signatures}")
+        verdict_counter.inc(source="signature", action="block")
+        record_decision(request, trace, request_start, "signature", "block")
+        return JSONResponse(content={"detail": "보안상 이슈 발생"}, status_code=403)
+    elif signature_action == "allow":
+        verdict_counter.inc(source="signature", action="allow")
+        record_decision(request, trace, request_start, "signature", "allow")
+        return await routing_url(request, request_body)
+
+    # 같은 형태의 요청을 최근에 판단했다면 LLM 호출 없이 캐시된 판정을 사용
+    with stage_seconds.time(stage="verdict_cache"):
+        fingerprint = build_request_fingerprint(full_context)
+        cached_action = verdict_cache.get(fingerprint)
+    if cached_action is not None:
+        print(f"verdict cache hit: {cached_action}")
+        action_result = cached_action
+        verdict_source = 'cache'
+    elif not admission.allow_client(str(request.client.host)):
+        # client별 LLM 판단 한도 초과 (token bucket)
+        verdict_counter.inc(source="throttled", action="reject")
+        record_decision(request, trace, request_start, "throttled", "reject", fingerprint)
+        return JSONResponse(content={"detail": "요청이 너무 많습니다"}, status_code=429, headers={"Retry-After": "1"})
+    elif is_audit_candidate(full_context, matched_signatures):
+        # 조회성 요청은 바로 전달하고, LLM 판단은 background queue에서 사후 수행
+        audit_queue.submit(AuditItem(fingerprint, str_full_context, full_context, str(request.client.host),
+                                     request.method, request.url.path, time.time()))
+        verdict_counter.inc(source="audit_pending", action="allow")
+        record_decision(request, trace, request_start, "audit_pending", "allow", fingerprint)
+        return await routing_url(request, request_body)
+    else:
+        # 동시에 들어온 같은 요청은 하나의 LLM 판단 결과를 함께 기다린다
+        priority = request_priority(str(request.client.host))
+        verdict_source = 'llm'
+        try:
+            action_result = await single_flight.do(fingerprint,
+                                                   lambda: classify_request(str_full_context, full_context, priority))
+        except asyncio.TimeoutError:
+            print("보안 판단 시간 초과")
+            verdict_counter.inc(source="timeout", action="reject")
+            record_decision(request, trace, request_start, "timeout", "reject", fingerprint)
+            return JSONResponse(content={"detail": "보안 판단 시간 초과"}, status_code=503)
+        except AdmissionRejected as e:
+            # 과부하: ADMISSION_SHED_POLICY에 따라 처리 (판단 결과가 아니므로 캐시하지 않음)
+            print(f"{e}")
+            action_result = admission.shed_action(matched_signatures)
+            verdict_source = 'shed'
+            if action_result is None:
+                verdict_counter.inc(source="shed", action="reject")
+                record_decision(request, trace, request_start, "shed", "reject", fingerprint)
+                return JSONResponse(content={"detail": "보안 판단 지연 (과부하)"}, status_code=503,
+                                    headers={"Retry-After": "1"})
+        else:
+            verdict_cache.put(fingerprint, action_result)
+
+    verdict_counter.inc(source=verdict_source, action=action_result)
+    # LLM 판단은 실제로 판단한 tier (같은 요청의 판단을 기다리기만 했다면 coalesced)
+    decided_tier = (trace["tier"] or "coalesced") if verdict_source == 'llm' else verdict_source
+    record_decision(request, trace, request_start, decided_tier, action_result, fingerprint, str_full_context)
     if action_result == "block":
         return JSONResponse(content={"detail": "보안상 이슈 발생"}, status_code=403)
-    elif action_result == "review":
-
-        print("review가 필요 합니다.")
-        few_shot_examples = get_few_shot_from_db(str_full_context)
-        secure_prompt = build_agent_human_prompt(few_shot_examples, str_full_context)
-
-        # print(secure_prompt)
-        system_message = build_agent_system_message()
-
-        # debugging_stream(secure_prompt, system_message)
-        decision = await agent_graph.ainvoke(
-            {'messages': [HumanMessage(content=secure_prompt), SystemMessage(content=system_message)]}, config=config
-        )
-        result = json.loads(decision['messages'][-1].content)
-        action_result = result['action']
-
-        print(action_result)
-        if action_result == "block":
-            return JSONResponse(content={"detail": "보안상 이슈 발생"}, status_code=403)
 
-    return await routing_url(request, "routing_ip/path", request_body)
+    return await routing_url(request, request_body)
 
 
 if __name__ == "__main__":
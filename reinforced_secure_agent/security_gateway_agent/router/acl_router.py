@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Request, Header, HTTPException
+from fastapi import APIRouter, Request, Header, HTTPException, Depends
 from typing import List
 import service.acl_service as accessControlService
 from domain.entity.entity import IPListModel
+from config.admin.admin_access import require_admin_client
 
 router = APIRouter(
     prefix="/gateway"
 )
 
 
-@router.post("/whitelist")
+# 조회(GET)는 누구나, 추가 / 삭제는 GATEWAY_ADMIN_NETWORKS의 client만 가능
+@router.post("/whitelist", dependencies=[Depends(require_admin_client)])
 async def set_whitelist(ipList: IPListModel):
     return accessControlService.set_whitelist(ipList)
 
@@ -18,7 +20,12 @@ async def get_whitelist():
     return accessControlService.get_whitelist()
 
 
-@router.post("/blacklist")
+@router.delete("/whitelist", dependencies=[Depends(require_admin_client)])
+async def remove_whitelist(ipList: IPListModel):
+    return accessControlService.remove_whitelist(ipList)
+
+
+@router.post("/blacklist", dependencies=[Depends(require_admin_client)])
 async def set_blacklist(ipList: IPListModel):
     return accessControlService.set_blacklist(ipList)
 
@@ -26,3 +33,8 @@ async def set_blacklist(ipList: IPListModel):
 @router.get("/blacklist")
 async def get_blacklist():
     return accessControlService.get_blacklist()
+
+
+@router.delete("/blacklist", dependencies=[Depends(require_admin_client)])
+async def remove_blacklist(ipList: IPListModel):
+    return accessControlService.remove_blacklist(ipList)
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from starlette.responses import PlainTextResponse
+import service.metrics_service as metricsService
+
+router = APIRouter(
+    prefix="/gateway"
+)
+
+
+@router.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(metricsService.get_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
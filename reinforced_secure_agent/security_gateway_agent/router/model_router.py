@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from starlette.responses import JSONResponse
+import service.model_service as modelService
+
+router = APIRouter(
+    prefix="/gateway"
+)
+
+
+@router.get("/ready")
+async def get_readiness():
+    # load balancer / k8s readinessProbe용: model preload + warm-up이 끝나기 전까지 503
+    ready, body = modelService.get_readiness()
+    return JSONResponse(status_code=200 if ready else 503, content=body)
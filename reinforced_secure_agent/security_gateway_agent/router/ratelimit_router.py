@@ -0,0 +1,14 @@
+from typing import Optional
+
+from fastapi import APIRouter
+import service.ratelimit_service as rateLimitService
+
+router = APIRouter(
+    prefix="/gateway"
+)
+
+
+# Monitoring Agent가 access log를 다시 세지 않고 client별 요청 수 / 차단 횟수를 조회
+@router.get("/ratelimit")
+async def get_rate_limit_state(client: Optional[str] = None, top: int = 100):
+    return rateLimitService.get_rate_limit_state(client, top)
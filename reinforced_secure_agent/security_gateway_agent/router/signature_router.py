@@ -0,0 +1,15 @@
+from fastapi import APIRouter, HTTPException, Depends
+import service.signature_service as signatureService
+from config.admin.admin_access import require_admin_client
+
+router = APIRouter(
+    prefix="/gateway"
+)
+
+
+@router.post("/signatures/reload", dependencies=[Depends(require_admin_client)])
+async def reload_signatures():
+    try:
+        return signatureService.reload_signatures()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,12 +1,30 @@
-from typing import List
+import os
+from typing import List, Tuple
 from sqlalchemy import create_engine, inspect
 from sqlalchemy.orm import sessionmaker
 from config.memory.singleton import WhiteList, Blacklist
 from domain.entity.entity import IPListModel
 
+# ACL 저장소 선택 (.env 또는 환경변수로 조정 가능)
+# - memory: process 내부 메모리 (기본값, 단일 worker)
+# - shared: 같은 host의 모든 uvicorn worker가 공유하는 memory-mapped 파일
+ACL_BACKEND = os.getenv("ACL_BACKEND", "memory")
+
+
+def build_acl_lists(backend: str = ACL_BACKEND) -> Tuple[object, object]:
+    if backend == "shared":
+        from config.memory.shared_acl import SharedWhiteList, SharedBlacklist
+        return SharedWhiteList(), SharedBlacklist()
+    return WhiteList(), Blacklist()
+
+
 # 나중에 Redis로 변경될 부분
-whitelist = WhiteList()
-blacklist = Blacklist()
+whitelist, blacklist = build_acl_lists()
+
+
+def get_acl_lists() -> Tuple[object, object]:
+    global whitelist, blacklist
+    return whitelist, blacklist
 
 
 def set_whitelist(ip_address_list: IPListModel) -> List[str]:
@@ -22,6 +40,13 @@ def get_whitelist() -> List[str]:
     return whitelist.get_whitelist()
 
 
+def remove_whitelist(ip_address_list: IPListModel) -> List[str]:
+    global whitelist
+
+    whitelist.remove_whitelist(ip_address_list)
+    return whitelist.get_whitelist()
+
+
 def set_blacklist(ip_address_list: IPListModel) -> List[str]:
     global blacklist
     import ast
@@ -33,3 +58,10 @@ def set_blacklist(ip_address_list: IPListModel) -> List[str]:
 def get_blacklist() -> List[str]:
     global blacklist
     return blacklist.get_blacklist()
+
+
+def remove_blacklist(ip_address_list: IPListModel) -> List[str]:
+    global blacklist
+    print(str(ip_address_list) + " 해당 주소는 BlackList에서 제거됩니다")
+    blacklist.remove_blacklist(ip_address_list)
+    return blacklist.get_blacklist()
@@ -0,0 +1,63 @@
+from typing import Any, Dict, List, Tuple
+
+from config.metrics.metrics import get_metrics_registry, render_prometheus
+from config.cache.verdict_cache import get_verdict_cache
+from config.coalesce.single_flight import get_single_flight
+from config.admission.admission_control import get_admission_controller
+from config.audit.audit_queue import get_audit_queue
+from config.proxy.upstream_proxy import get_upstream_pool
+from config.models.model_registry import get_model_registry
+from config.ratelimit.rate_limiter import get_rate_limiter
+from config.decision.decision_log import get_decision_log_writer
+from config.circuit.circuit_breaker import get_circuit_breakers
+from config.classify.local_classifier import get_local_classifier
+from config.leak.response_inspector import get_response_inspector
+from config.llm.llm_pool import get_llm_pools
+
+metrics_registry = get_metrics_registry()
+
+
+def _numeric_samples(stats: Dict[str, Any]) -> List[Tuple[Tuple[str, ...], float]]:
+    return [((key,), float(value)) for key, value in stats.items() if isinstance(value, (int, float))]
+
+
+def _nested_samples(stats: Dict[str, Dict[str, Any]]) -> List[Tuple[Tuple[str, ...], float]]:
+    return [((name, key), float(value)) for name, values in stats.items()
+            for key, value in values.items() if isinstance(value, (int, float))]
+
+
+# 다른 component가 이미 들고 있는 stats()는 수집 시점에만 읽는다 (요청 처리 경로에는 비용 없음)
+metrics_registry.gauge("gateway_verdict_cache", "verdict cache 상태 (entries, bytes, hits, misses 등)", ["stat"],
+                       callback=lambda: _numeric_samples(get_verdict_cache().stats()))
+metrics_registry.gauge("gateway_single_flight", "single-flight 상태 (in_flight, leaders, coalesced 등)", ["stat"],
+                       callback=lambda: _numeric_samples(get_single_flight().stats()))
+metrics_registry.gauge("gateway_admission", "tier별 admission 상태 (active, waiting, concurrency)", ["tier", "stat"],
+                       callback=lambda: _nested_samples(get_admission_controller().stats()))
+metrics_registry.gauge("gateway_audit_queue", "사후 검사 queue 상태", ["stat"],
+                       callback=lambda: _numeric_samples(get_audit_queue().stats()))
+metrics_registry.gauge("gateway_upstream", "upstream별 상태 (active, failures, healthy)", ["upstream", "stat"],
+                       callback=lambda: _nested_samples(get_upstream_pool().stats()))
+metrics_registry.gauge("gateway_model", "model별 로드 상태 (loaded, warmed, load_seconds)", ["model", "stat"],
+                       callback=lambda: _nested_samples(get_model_registry().stats()))
+metrics_registry.gauge("gateway_rate_limit", "rate limiter 상태 (tracked, allowed, rejected)", ["stat"],
+                       callback=lambda: _numeric_samples(get_rate_limiter().stats()))
+metrics_registry.gauge("gateway_decision_log", "판정 기록 writer 상태 (queued, written, dropped, offset)", ["stat"],
+                       callback=lambda: _numeric_samples(get_decision_log_writer().stats()))
+metrics_registry.gauge("gateway_llm_circuit", "LLM deployment별 circuit 상태 (state: 0 closed / 1 half-open / 2 open)",
+                       ["deployment", "stat"],
+                       callback=lambda: _nested_samples({name: breaker.stats()
+                                                         for name, breaker in get_circuit_breakers().items()}))
+metrics_registry.gauge("gateway_local_classifier", "local 분류 model 상태 (loaded, threshold, decided, uncertain)",
+                       ["stat"], callback=lambda: _numeric_samples(get_local_classifier().stats()))
+metrics_registry.gauge("gateway_response_inspector", "응답 유출 검사 상태 (inspected, leaks, truncated)", ["stat"],
+                       callback=lambda: _numeric_samples(get_response_inspector().stats()))
+metrics_registry.gauge("gateway_llm_pool", "LLM pool deployment별 상태 (in_flight, latency_ewma, healthy, remaining_tokens)",
+                       ["deployment", "stat"],
+                       callback=lambda: _nested_samples({name: stats for pool in get_llm_pools()
+                                                         for name, stats in pool.stats().items()}))
+
+
+def get_metrics() -> str:
+    global metrics_registry
+
+    return render_prometheus(metrics_registry)
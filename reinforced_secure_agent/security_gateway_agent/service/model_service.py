@@ -0,0 +1,13 @@
+from typing import Any, Dict, Tuple
+
+from config.models.model_registry import get_model_registry, MODEL_PRELOAD
+
+model_registry = get_model_registry()
+
+
+def get_readiness() -> Tuple[bool, Dict[str, Any]]:
+    global model_registry
+
+    # MODEL_PRELOAD=false이면 model은 첫 요청에서 로드되므로 항상 ready로 응답
+    ready = model_registry.ready() if MODEL_PRELOAD else True
+    return ready, {"ready": ready, "models": model_registry.stats()}
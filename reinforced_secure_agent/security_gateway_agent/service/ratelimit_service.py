@@ -0,0 +1,13 @@
+from typing import Any, Dict, Optional
+
+from config.ratelimit.rate_limiter import get_rate_limiter
+
+rate_limiter = get_rate_limiter()
+
+
+def get_rate_limit_state(client: Optional[str] = None, top: int = 100) -> Dict[str, Any]:
+    global rate_limiter
+
+    if client:
+        return {"enabled": rate_limiter.enabled, "clients": rate_limiter.client_state(client)}
+    return rate_limiter.export(top)
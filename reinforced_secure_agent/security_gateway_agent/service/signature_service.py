@@ -0,0 +1,17 @@
+import re
+from typing import Dict, Any
+from config.signature.signature_filter import get_signature_filter
+
+signature_filter = get_signature_filter()
+
+
+def reload_signatures() -> Dict[str, Any]:
+    global signature_filter
+
+    try:
+        count = signature_filter.reload()
+    except (OSError, ValueError, KeyError, TypeError, re.error) as e:
+        # reload는 컴파일이 끝난 뒤에만 교체하므로 실패해도 기존 시그니처가 그대로 유지된다
+        print(f"Signature reload 실패 (기존 시그니처 유지): {e}")
+        raise ValueError(f"signatures.json 로드 실패: {e}") from e
+    return {"signatures": count}
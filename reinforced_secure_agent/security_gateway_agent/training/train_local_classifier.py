@@ -0,0 +1,123 @@
+"""
+local ML 분류 model 학습 (offline, gateway 재시작 시 LOCAL_CLASSIFIER_PATH에서 불러옴)
+
+    python training/train_local_classifier.py --output models/local_classifier
+
+학습 데이터:
+  - Qdrant caching collection의 few-shot 예시 ("요청 내용:" + { "action": "block" | "allow" })
+  - decision log에서 LLM(first_tier / review)이 판단한 요청의 context와 verdict (DECISION_LOG_CONTEXT=true)
+결과: <output>.npz (weight), <output>.json (Platt scaling, threshold, 검증 coverage / precision)
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+GATEWAY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if GATEWAY_DIR not in sys.path:
+    sys.path.insert(0, GATEWAY_DIR)
+
+import numpy as np
+
+from config.classify.local_classifier import train_local_model, LABELS, LOCAL_CLASSIFIER_PATH, HASH_BITS, \
+    BLOCK_PRECISION, ALLOW_PRECISION, MIN_SUPPORT
+from config.decision.decision_log import list_segments, segment_name, DECISION_LOG_DIR, CONTEXT_TIERS
+from config.db_config.db_config import qdrant, get_embeddings, CACHING_COLLECTION
+
+# few-shot 예시 형식: "요청 내용:\n<요청>\n응답:\n{ "action": "block" }\n이유: ..."
+FEW_SHOT_PATTERN = re.compile(r"요청 내용:\s*(.*?)\s*응답:\s*\{\s*\"action\"\s*:\s*\"(\w+)\"", re.S)
+SCROLL_SIZE = 1000
+EMBEDDING_BATCH = 64
+
+
+def load_few_shot_examples(collection: str) -> Dict[str, str]:
+    examples: Dict[str, str] = {}
+    offset = None
+    while True:
+        points, offset = qdrant.scroll(collection_name=collection, limit=SCROLL_SIZE, offset=offset,
+                                       with_payload=True, with_vectors=False)
+        for point in points:
+            content = (point.payload or {}).get("page_content", "")
+            for request_text, action in FEW_SHOT_PATTERN.findall(content):
+                if action in LABELS and request_text:
+                    examples[request_text] = action
+        if offset is None:
+            return examples
+
+
+def load_decision_log_examples(directory: str) -> Dict[str, str]:
+    # 같은 context가 여러 번 판단되었다면 가장 최근 판정을 사용 (segment / 줄 순서 = 기록 순서)
+    examples: Dict[str, str] = {}
+    for base in list_segments(directory):
+        with open(os.path.join(directory, segment_name(base)), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                tier = str(entry.get("tier", "")).split("audit_", 1)[-1]
+                if entry.get("ctx") and entry.get("verdict") in LABELS and tier in CONTEXT_TIERS:
+                    examples[entry["ctx"]] = entry["verdict"]
+    return examples
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    embeddings = get_embeddings()
+    vectors = []
+    for start in range(0, len(texts), EMBEDDING_BATCH):
+        vectors.extend(embeddings.embed_documents(texts[start:start + EMBEDDING_BATCH]))
+        print(f"embedding {min(start + EMBEDDING_BATCH, len(texts))}/{len(texts)}")
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def collect_examples(collection: Optional[str], decision_log_dir: Optional[str]) -> Tuple[List[str], List[int]]:
+    examples: Dict[str, str] = {}
+    if collection:
+        few_shot = load_few_shot_examples(collection)
+        print(f"Qdrant few-shot 예시 {len(few_shot)}건 ({collection})")
+        examples.update(few_shot)
+    if decision_log_dir:
+        decisions = load_decision_log_examples(decision_log_dir)
+        print(f"decision log 예시 {len(decisions)}건 ({decision_log_dir})")
+        # 실제 traffic 형식(직렬화된 context)의 판정을 우선
+        examples.update(decisions)
+    texts = list(examples)
+    labels = [LABELS.index(examples[text]) for text in texts]
+    return texts, labels
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="local ML 분류 model 학습 (Qdrant few-shot + decision log)")
+    parser.add_argument("--collection", default=CACHING_COLLECTION, help="few-shot collection (빈 값이면 사용 안 함)")
+    parser.add_argument("--decision-log-dir", default=DECISION_LOG_DIR, help="decision log 디렉터리 (빈 값이면 사용 안 함)")
+    parser.add_argument("--output", default=LOCAL_CLASSIFIER_PATH, help="결과 파일 경로 (확장자 제외)")
+    parser.add_argument("--no-embedding", action="store_true", help="embedding 없이 byte n-gram hashing feature만 사용")
+    parser.add_argument("--hash-bits", type=int, default=HASH_BITS)
+    parser.add_argument("--block-precision", type=float, default=BLOCK_PRECISION)
+    parser.add_argument("--allow-precision", type=float, default=ALLOW_PRECISION)
+    parser.add_argument("--min-support", type=int, default=MIN_SUPPORT)
+    parser.add_argument("--validation-ratio", type=float, default=0.2)
+    parser.add_argument("--epochs", type=int, default=60)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts, labels = collect_examples(args.collection, args.decision_log_dir)
+    if not texts or len(set(labels)) < 2:
+        sys.exit("block / allow 예시가 모두 있어야 학습할 수 있습니다")
+
+    embeddings = None if args.no_embedding else embed_texts(texts)
+    model = train_local_model(texts, labels, embeddings, validation_ratio=args.validation_ratio,
+                              hash_bits=args.hash_bits, block_precision=args.block_precision,
+                              allow_precision=args.allow_precision, min_support=args.min_support,
+                              l2=args.l2, epochs=args.epochs, seed=args.seed)
+    model.save(args.output)
+
+    print(json.dumps({"output": args.output, "block_threshold": model.block_threshold,
+                      "allow_threshold": model.allow_threshold, **model.info}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 import os
 
 from dotenv import load_dotenv
-from langchain_openai import AzureChatOpenAI
 from langgraph.prebuilt import create_react_agent
 from config.prompts.prompts import build_system_prompt, build_final_secure_prompt
 
@@ -14,18 +13,12 @@ build_system_prompt = build_system_prompt()
 dotenv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env')
 load_dotenv(dotenv_path)
 
-# Azure OpenAI 설정
-env_api_key = os.getenv("AZURE_OPENAI_API_KEY")
-openai_api_base = os.getenv("AZURE_OPENAI_API_ENDPOINT")
-deployment_name = os.getenv("DEPLOYMENT_NAME")
+# LLM_DEPLOYMENTS 등 pool 설정은 import 시점에 읽으므로 .env를 불러온 뒤에 import
+from config.llm.llm_pool import build_llm_pool
 
 # Prompt & 모델 설정
-llm = AzureChatOpenAI(
-    openai_api_key=env_api_key,
-    azure_endpoint=openai_api_base,
-    deployment_name=deployment_name,
-    openai_api_version="2024-02-15-preview"
-)
+# Azure OpenAI deployment pool (LLM_DEPLOYMENTS가 비어 있으면 DEPLOYMENT_NAME 하나, Gateway와 같은 설정)
+llm = build_llm_pool()
 
 
 from config.tools.acting_tools import *
@@ -106,7 +99,8 @@ def trimming_messages(state):
 
 tools = [fetch_logs_from_collector, check_collector_queue_size, read_recent_summary_lines, write_summary_log, \
          summarize_logs_tool, add_to_blacklist, classify_logs_with_llm, caching_for_few_shot, get_message_length, \
-         think_aloud, web_search_tool]
+         think_aloud, web_search_tool, rate_limit_check_tool, fetch_rate_limit_state, \
+         read_gateway_decisions]
 
 
 config = {
@@ -0,0 +1,97 @@
+import json
+import os
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+# Gateway가 기록하는 decision log 위치 (Gateway의 DECISION_LOG_DIR와 같은 디렉터리)
+GATEWAY_DECISION_LOG_DIR = os.getenv(
+    "GATEWAY_DECISION_LOG_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))),
+                 "security_gateway_agent", "logs", "decisions")
+)
+# 마지막으로 읽은 offset을 저장하는 파일 (재시작해도 이어서 읽기)
+DECISION_LOG_OFFSET_PATH = os.getenv(
+    "DECISION_LOG_OFFSET_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "summary_file", "decision_log.offset")
+)
+
+SEGMENT_SUFFIX = ".log"
+
+
+def segment_name(base_offset: int) -> str:
+    return f"{base_offset:020d}{SEGMENT_SUFFIX}"
+
+
+def list_segments(directory: str) -> List[int]:
+    # segment 파일 이름 = 그 segment 첫 줄의 전체 byte offset (20자리)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(name[:-len(SEGMENT_SUFFIX)]) for name in os.listdir(directory)
+                  if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit())
+
+
+def read_decisions(offset: int, max_entries: int = 1000,
+                   directory: str = GATEWAY_DECISION_LOG_DIR) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    offset부터 완전한 줄만 최대 max_entries개 읽고 (entries, 다음 offset)을 반환합니다.
+    offset이 이미 삭제된 segment를 가리키면 남아 있는 가장 오래된 segment부터 읽습니다.
+    """
+    segments = list_segments(directory)
+    if not segments:
+        return [], offset
+    offset = max(offset, segments[0])
+    entries: List[Dict[str, Any]] = []
+    for index, base in enumerate(segments):
+        end = segments[index + 1] if index + 1 < len(segments) else None
+        if end is not None and offset >= end:
+            continue
+        with open(os.path.join(directory, segment_name(base)), "rb") as f:
+            f.seek(offset - base)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Gateway가 아직 쓰는 중인 줄은 다음에 읽는다
+                    return entries, offset
+                offset += len(line)
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+                if len(entries) >= max_entries:
+                    return entries, offset
+        if end is not None:
+            offset = end
+    return entries, offset
+
+
+def load_offset(path: str = DECISION_LOG_OFFSET_PATH) -> int:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def save_offset(offset: int, path: str = DECISION_LOG_OFFSET_PATH) -> None:
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(str(offset))
+    except OSError as e:
+        print(f"decision log offset 저장 실패: {e}")
+
+
+def summarize_decisions(entries: List[Dict[str, Any]], top: int = 10) -> Dict[str, Any]:
+    # LLM이 raw 기록을 다시 읽지 않도록 tier / verdict별 집계와 차단이 많은 client를 먼저 정리
+    verdicts = Counter(entry.get("verdict") for entry in entries)
+    tiers = Counter(entry.get("tier") for entry in entries)
+    blocked = Counter(entry.get("client") for entry in entries if entry.get("verdict") in ("block", "reject"))
+    blocked_paths = Counter(entry.get("path") for entry in entries if entry.get("verdict") == "block")
+    return {
+        "count": len(entries),
+        "from_ts": entries[0].get("ts") if entries else None,
+        "to_ts": entries[-1].get("ts") if entries else None,
+        "verdicts": dict(verdicts),
+        "tiers": dict(tiers),
+        "tokens": sum(int(entry.get("tokens") or 0) for entry in entries),
+        "top_blocked_clients": blocked.most_common(top),
+        "top_blocked_paths": blocked_paths.most_common(top),
+    }
@@ -1,3 +1,4 @@
+import json
 import re
 from typing import List
 
@@ -6,7 +7,7 @@ from langchain_community.tools import DuckDuckGoSearchRun
 from langchain_core.tools.retriever import create_retriever_tool
 
 from config.agent_config.agent_config import llm
-from config.db_config.db_config import caching_store, vector_store
+from config.db_config.db_config import get_caching_store, vector_store
 from config.tools import *
 from config.tools.manual_tool.debugging_tool import debug_check_messages
 
@@ -105,6 +106,7 @@ retriever_tool = create_retriever_tool(
 def rate_limit_check_tool(ip: str, log_lines: list[str]) -> str:
     """
     특정 IP의 과도한 요청을 감지합니다.
+    access log 라인 수와 함께 Gateway rate limiter가 export한 상태(sliding window 요청 수, 차단 횟수)를 확인합니다.
 
     Args:
         ip (str): 요청을 보낸 IP 주소
@@ -113,12 +115,48 @@ def rate_limit_check_tool(ip: str, log_lines: list[str]) -> str:
     Returns:
         str: 의심 여부 결과
     """
-    count = sum(1 for line in log_lines if ip in line)
+    # 부분 문자열이 아니라 IP가 정확히 일치하는 라인만 센다 (10.0.0.1이 10.0.0.11 라인에 걸리지 않도록)
+    ip_pattern = re.compile(rf"(?<![\w.:]){re.escape(ip)}(?![\w.:])")
+    count = sum(1 for line in log_lines if ip_pattern.search(line))
+
+    url = "http://localhost:8000/gateway/ratelimit"  # Gateway rate limiter 상태 API
+    try:
+        response = requests.get(url, params={"client": ip}, timeout=3)
+        states = response.json().get("clients", []) if response.status_code == 200 else []
+    except Exception as e:
+        print(f"Gateway rate limit 상태 조회 실패: {e}")
+        states = []
+    limited = [state for state in states if state.get("limited") or state.get("rejected")]
+    if limited:
+        rules = ", ".join(f"{state['rule']} {state['requests']:.0f}/{state['limit']} (차단 {state['rejected']}회)"
+                          for state in limited)
+        return f"{ip}: 과도한 요청 감지됨 (Gateway rate limit 초과: {rules})"
     if count > 100:  # 예: 5분간 100회 이상
         return f"{ip}: 과도한 요청 감지됨 (DoS 의심)"
     return f"{ip}: 정상 요청"
 
 
+@tool(description="Gateway rate limiter가 추적 중인 client별 요청 수 / 차단 횟수 상위 목록을 조회합니다.")
+def fetch_rate_limit_state(top: int = 20) -> str:
+    """
+    Gateway의 client별 sliding window 요청 수와 rate limit 차단 횟수를 많은 순서로 반환합니다.
+
+    Args:
+        top (int): 조회할 client 수
+
+    Returns:
+        str: client별 상태 (JSON) 또는 에러 메시지
+    """
+    url = "http://localhost:8000/gateway/ratelimit"
+    try:
+        response = requests.get(url, params={"top": top}, timeout=3)
+        if response.status_code == 200:
+            return json.dumps(response.json().get("clients", []), ensure_ascii=False)
+        return f"Failed with status {response.status_code}: {response.text}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
 @tool(description="NGINX 로그 중 공격에 해당되는 ip를 차단합니다.")
 def add_to_blacklist(ip: List[str]) -> str:
     """
@@ -291,7 +329,7 @@ def caching_for_few_shot(raw_output: str) -> str:
     BATCH_SIZE = 5000
     for i in range(0, len(split_docs), BATCH_SIZE):
         batch = split_docs[i:i + BATCH_SIZE]
-        caching_store.add_documents(batch)
+        get_caching_store().add_documents(batch)
 
     return f"총 {len(split_docs)}개의 문서를 Qdrant에 저장 완료했습니다."
 
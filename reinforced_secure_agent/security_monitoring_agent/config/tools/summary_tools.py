@@ -9,6 +9,7 @@ import requests
 from config.agent_config.agent_config import llm
 from config.prompts.prompts import build_log_summary_prompt
 from config.tools.manual_tool.debugging_tool import debug_check_messages
+from config.decision.decision_log_reader import read_decisions, load_offset, save_offset, summarize_decisions
 from langchain_community.tools import DuckDuckGoSearchRun
 
 from config.tools import *
@@ -54,6 +55,39 @@ def fetch_logs_from_collector(limit: int = 1000):
         return []
 
 
+@tool(description="Gateway의 판정 기록(decision log)을 마지막으로 읽은 위치부터 이어서 읽고 집계 결과를 반환합니다.")
+def read_gateway_decisions(max_entries: int = 1000, offset: int = -1) -> str:
+    """
+    Gateway가 요청마다 남긴 판정 기록(client, path, 판단 tier, verdict, latency, token 사용량)을 offset 기준으로 읽습니다.
+    raw access log를 다시 분석하지 않고도 어떤 client / path가 차단되었는지 바로 확인할 수 있습니다.
+
+    Args:
+        max_entries (int): 한 번에 읽을 최대 기록 수 (기본값: 1000)
+        offset (int): 읽기 시작할 offset. 음수이면 마지막으로 읽은 위치부터 이어서 읽습니다.
+
+    Returns:
+        str: {"offset", "next_offset", "summary", "blocked"} 형식의 JSON 문자열
+    """
+    debug_check_messages()
+    start = load_offset() if offset < 0 else offset
+    try:
+        entries, next_offset = read_decisions(start, max_entries)
+    except OSError as e:
+        return f"Error: {str(e)}"
+    if offset < 0:
+        save_offset(next_offset)
+
+    # ctx(LLM이 판단한 요청의 직렬화된 context)는 local 분류 model 학습용이므로 prompt에는 넣지 않는다
+    blocked = [{key: value for key, value in entry.items() if key != "ctx"}
+               for entry in entries if entry.get("verdict") == "block"][-20:]
+    return json.dumps({
+        "offset": start,
+        "next_offset": next_offset,
+        "summary": summarize_decisions(entries),
+        "blocked": blocked,
+    }, ensure_ascii=False)
+
+
 @tool(description="Collector의 로그 처리 대기열(queue)에 남아 있는 로그 개수를 반환합니다.")
 def check_collector_queue_size() -> int:
     """
@@ -1,4 +1,6 @@
 # from config.graph.graph_builder import build_graph
+import asyncio
+import threading
 import time
 
 from fastapi import FastAPI
@@ -7,6 +9,7 @@ from langchain_core.messages import HumanMessage, SystemMessage, RemoveMessage
 
 from config.prompts.prompts import build_system_prompt, build_final_secure_prompt
 from config.agent_config.agent_config import agent_graph, config
+from config.models.model_registry import get_model_registry, MODEL_PRELOAD
 
 app = FastAPI()
 
@@ -14,6 +17,7 @@ app = FastAPI()
 
 summary_prompt = build_final_secure_prompt()
 build_system_prompt = build_system_prompt()
+model_registry = get_model_registry()
 
 
 def debugging_stream(secure_prompt: str, system_message: str):
@@ -75,6 +79,16 @@ def debugging_stream_with_retry(secure_prompt: str, system_message: str, max_ret
                 raise e
 
 
+def start_monitoring_resources() -> None:
+    # MODEL_PRELOAD=true이면 embedding model 로드 + warm-up을 background thread로 수행 (import / 첫 cycle을 막지 않음)
+    # 끝나기 전에 tool이 embedding을 쓰면 registry의 model별 lock에서 같은 로드를 기다린다
+    if MODEL_PRELOAD:
+        threading.Thread(target=lambda: asyncio.run(model_registry.preload()), name="model-preload",
+                         daemon=True).start()
+
+
+start_monitoring_resources()
+
 # 실제 호출부에서 기존 debugging_stream 대신 아래 함수 호출하도록 변경
 
 while True: